@@ -1,20 +1,35 @@
 import os
-import re
 import json
-import requests
-from flask import Flask, request, render_template, jsonify, send_file, redirect, url_for, session, flash
+import http_client
+from flask import Flask, Request, request, render_template, jsonify, send_file, redirect, url_for, session, flash, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import PyPDF2
-from docx import Document
 import openai
 from dotenv import load_dotenv
 import tempfile
 import tarfile
+import zipfile
 import time
+import threading
 import traceback
+import concurrent.futures
+import hashlib
+from collections import OrderedDict
 import uuid
-from sheets_integration import save_cv_to_sheets
-import pdfplumber
+from sheets_integration import export_payload, write_payloads, SHEETS_LAYOUTS, credentials as google_credentials
+from sheets_outbox import SheetsOutbox
+from pdf_cache import PDFCompileCache
+from latex_backends import select_backend
+from compile_jobs import CompileJobQueue
+from parse_cache import ParseCache
+from local_parser import PARSE_FIELDS, parse_cv_locally
+from session_store import create_session_store
+from janitor import Janitor, SweepRule
+from text_extraction import PDFTextExtractor, extract_docx_text
+from batch import BatchConverter, BatchJobs, read_zip
+from latex_escape import clean_text_for_latex
+from resume_templates import LatexTemplates, DEFAULT_STYLE as DEFAULT_RESUME_STYLE
+from cv_store import CVStore, SORT_KEYS as CV_SORT_KEYS, encode_cursor, decode_cursor
 import urllib.parse
 
 # Load environment variables
@@ -23,9 +38,18 @@ load_dotenv()
 # Get Google Sheets configuration
 GOOGLE_SHEETS_SPREADSHEET_ID = os.getenv('GOOGLE_SHEETS_SPREADSHEET_ID')
 
-# LaTeX compilation is handled entirely by latexonline.cc - no local installation needed
+# LaTeX compilation uses a local pdflatex/tectonic when installed, otherwise latexonline.cc
+
+# Uploads up to this size stay in memory; larger ones spill to an anonymous temp file
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv('UPLOAD_SPOOL_MAX_BYTES', 5 * 1024 * 1024))
+
+class SpooledUploadRequest(Request):
+    """Request whose uploaded files are buffered in a size-capped SpooledTemporaryFile"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES, mode='rb+')
 
 app = Flask(__name__)
+app.request_class = SpooledUploadRequest
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'output'
@@ -40,14 +64,58 @@ os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 CV_DATA_FOLDER = 'cv_data'
 os.makedirs(CV_DATA_FOLDER, exist_ok=True)
 
-# All LaTeX compilation is handled by latexonline.cc - no local installation needed
+# SQLite databases for state shared between gunicorn workers
+STATE_FOLDER = os.getenv('STATE_FOLDER', 'state')
+os.makedirs(STATE_FOLDER, exist_ok=True)
+
+# Uploaded CVs wait in a SQLite outbox and are written to Google Sheets in batches.
+# 'columnar' writes one row per CV (CVs tab) plus one per education/experience entry (Entries tab);
+# 'blocks' keeps the original multi-row block per CV in Sheet1.
+SHEETS_LAYOUT = os.getenv('SHEETS_LAYOUT', 'blocks')
+if SHEETS_LAYOUT not in SHEETS_LAYOUTS:
+    print(f"⚠️ Unknown SHEETS_LAYOUT {SHEETS_LAYOUT!r}, using 'blocks'")
+    SHEETS_LAYOUT = 'blocks'
+sheets_outbox = SheetsOutbox(
+    os.getenv('SHEETS_OUTBOX_DB', os.path.join(STATE_FOLDER, 'sheets_outbox.sqlite3')),
+    write_payloads,
+    flush_interval=int(os.getenv('SHEETS_FLUSH_INTERVAL', 10)),
+    max_batch=int(os.getenv('SHEETS_MAX_BATCH', 100)),
+    max_attempts=int(os.getenv('SHEETS_MAX_ATTEMPTS', 8)),
+)
+
+@app.before_request
+def start_sheets_outbox():
+    # Exports queued before a restart or a worker recycle must not wait for the next upload
+    sheets_outbox.start()
+
+# Compiled PDFs are cached on disk keyed by a hash of the LaTeX source
+pdf_cache = PDFCompileCache(
+    os.getenv('PDF_CACHE_DIR', 'pdf_cache'),
+    max_bytes=int(os.getenv('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    max_age=int(os.getenv('PDF_CACHE_MAX_AGE', 7 * 24 * 3600)),
+)
+
+# Abandoned preview sessions, uploads and generated resumes expire after their TTL.
+# resume_<cv_id> files belong to saved CVs and are removed with the CV instead.
+janitor = Janitor(
+    [
+        SweepRule('temp_sessions', int(os.getenv('SESSION_FILE_TTL', 24 * 3600)), patterns=['*.json']),
+        SweepRule(app.config['UPLOAD_FOLDER'], int(os.getenv('UPLOAD_FILE_TTL', 3600))),
+        SweepRule(app.config['OUTPUT_FOLDER'], int(os.getenv('OUTPUT_FILE_TTL', 7 * 24 * 3600)),
+                  patterns=['*.tex', '*.pdf', '*.log', '*.aux', '*.zip'], exclude=['resume_*']),
+    ],
+    interval=int(os.getenv('JANITOR_INTERVAL', 600)),
+    max_deletes=int(os.getenv('JANITOR_MAX_DELETES', 200)),
+)
+
+@app.before_request
+def start_janitor():
+    janitor.start()
 
 # Startup message
 print(f"🌍 Environment: {os.getenv('FLASK_ENV', 'development')}")
 print(f"🐍 Python: {os.sys.version.split()[0]}")
 print(f"📁 Working Directory: {os.getcwd()}")
-print("✅ PDF generation enabled via latexonline.cc")
-print("🌐 No local LaTeX installation required")
 
 # API keys
 openai.api_key = os.getenv('OPENAI_API_KEY')
@@ -70,6 +138,9 @@ def get_gemini_key():
 
 GEMINI_API_KEY = get_gemini_key()
 
+# Timeout (seconds) for Gemini calls that previously had none
+GEMINI_TIMEOUT = int(os.getenv('GEMINI_TIMEOUT', 60))
+
 @app.route('/admin', methods=['GET', 'POST'])
 def admin_panel():
     if 'admin_logged_in' not in session:
@@ -122,15 +193,20 @@ ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file using pdfplumber for better accuracy"""
+# PDF text extraction: PyPDF2 text layer first, pdfplumber layout analysis only for pages where
+# that yields garbage. Long documents are split across a process pool and capped.
+pdf_extractor = PDFTextExtractor(
+    workers=int(os.getenv('PDF_EXTRACT_WORKERS', 2)),
+    max_pages=int(os.getenv('PDF_MAX_PAGES', 30)),
+    max_chars=int(os.getenv('PDF_MAX_CHARS', 100000)),
+    timeout=int(os.getenv('PDF_EXTRACT_TIMEOUT', 30)),
+)
+
+def extract_text_from_pdf(source):
+    """Extract text from a PDF path, bytes or binary file page by page (see text_extraction.PDFTextExtractor)"""
     text = ""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        text = pdf_extractor.extract(source)
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
     print("=== Extracted PDF Text Start ===")
@@ -138,13 +214,11 @@ def extract_text_from_pdf(file_path):
     print("=== Extracted PDF Text End ===")
     return text
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
+def extract_text_from_docx(source):
+    """Extract text from a DOCX path or binary file, including tables, text boxes, headers and footers"""
     text = ""
     try:
-        doc = Document(file_path)
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        text = extract_docx_text(source)
     except Exception as e:
         print(f"Error extracting text from DOCX: {e}")
     print("=== Extracted DOCX Text Start ===")
@@ -152,74 +226,100 @@ def extract_text_from_docx(file_path):
     print("=== Extracted DOCX Text End ===")
     return text
 
-def enhance_parsing_with_gemini(text):
-    """Use Gemini AI to parse CV text and extract structured information"""
-    
-    prompt = f"""
-    Parse the following CV/Resume text and extract structured information in JSON format. 
-    IMPORTANT: Only include information that actually exists in the CV text. Do not add placeholder or example data.
-    If a field doesn't exist in the CV, either omit it entirely or set it to null/empty.
-    
-    Required JSON structure (only include fields that have actual data):
-    {{
-        "name": "Full name (only if found)",
-        "email": "Email address (only if found)",
-        "phone": "Phone number (only if found)",
-        "linkedin": "LinkedIn URL (only if found)",
-        "github": "GitHub URL (only if found)",
-        "website": "Personal website (only if found)",
-        "address": "Address/Location (only if found)",
-        "education": [
-            {{
+# Bump whenever the parsing prompt (or the local parser feeding it) changes so cached parses from the old prompt are not reused
+PARSE_PROMPT_VERSION = 2
+
+# Hybrid parsing: fields the local parser is at least this confident about are not asked of Gemini,
+# and only the text behind the remaining fields is sent. HYBRID_PARSE=false sends every CV whole.
+HYBRID_PARSE = os.getenv('HYBRID_PARSE', 'true').lower() == 'true'
+HYBRID_PARSE_MIN_CONFIDENCE = float(os.getenv('HYBRID_PARSE_MIN_CONFIDENCE', 0.8))
+hybrid_parse_stats = {'parses': 0, 'local_only': 0, 'gemini_calls': 0, 'gemini_failures': 0,
+                      'gemini_fields': 0, 'text_chars': 0, 'text_chars_sent': 0}
+_hybrid_parse_stats_lock = threading.Lock()
+
+# Gemini parse results keyed by a hash of the normalized CV text and the prompt version
+parse_cache = ParseCache(
+    os.getenv('PARSE_CACHE_DB', os.path.join(STATE_FOLDER, 'parse_cache.sqlite3')),
+    ttl=int(os.getenv('PARSE_CACHE_TTL', 30 * 24 * 3600)),
+    max_entries=int(os.getenv('PARSE_CACHE_MAX_ENTRIES', 5000)),
+)
+
+# JSON structure Gemini is asked to fill, one entry per field of local_parser.PARSE_FIELDS
+PARSE_SCHEMA = {
+    'name': '"Full name (only if found)"',
+    'email': '"Email address (only if found)"',
+    'phone': '"Phone number (only if found)"',
+    'linkedin': '"LinkedIn URL (only if found)"',
+    'github': '"GitHub URL (only if found)"',
+    'website': '"Personal website (only if found)"',
+    'address': '"Address/Location (only if found)"',
+    'education': """[
+            {
                 "degree": "Degree name",
                 "institution": "Institution name",
                 "date": "Date range",
                 "location": "Location (if mentioned)",
                 "gpa": "GPA (if mentioned)",
                 "details": "Additional details (if any)"
-            }}
-        ],
-        "experience": [
-            {{
+            }
+        ]""",
+    'experience': """[
+            {
                 "title": "Job title",
                 "company": "Company name",
                 "date": "Date range",
                 "location": "Location (if mentioned)",
                 "description": ["List of responsibilities and achievements"]
-            }}
-        ],
-        "projects": [
-            {{
+            }
+        ]""",
+    'projects': """[
+            {
                 "title": "Project name",
                 "description": "Project description",
                 "technologies": "Technologies used",
                 "date": "Date or duration (if mentioned)",
                 "link": "Project link (if mentioned)"
-            }}
-        ],
-        "skills": {{
+            }
+        ]""",
+    'skills': """{
             "languages": ["Programming languages (only if mentioned)"],
             "frameworks": ["Frameworks and libraries (only if mentioned)"],
             "tools": ["Tools and software (only if mentioned)"],
             "libraries": ["Additional libraries (only if mentioned)"],
             "databases": ["Databases (only if mentioned)"],
             "other": ["Other technical skills (only if mentioned)"]
-        }},
-        "certifications": [
-            {{
+        }""",
+    'certifications': """[
+            {
                 "name": "Certification name",
                 "issuer": "Issuing organization",
                 "date": "Date obtained (if mentioned)"
-            }}
-        ],
-        "awards": ["Awards and honors (only if mentioned)"],
-        "languages": ["Spoken languages (only if mentioned)"],
-        "custom_sections": [
-            {{
+            }
+        ]""",
+    'awards': '["Awards and honors (only if mentioned)"]',
+    'languages': '["Spoken languages (only if mentioned)"]',
+    'custom_sections': """[
+            {
                 "title": "Section title",
                 "content": "Section content"
-            }}
-        ]
+            }
+        ]""",
+}
+
+def build_parse_prompt(text, fields=PARSE_FIELDS):
+    """Gemini prompt asking for `fields` of the schema; a partial request says the text is an excerpt"""
+    structure = ',\n        '.join(f'"{field}": {PARSE_SCHEMA[field]}' for field in fields)
+    excerpt_note = '' if len(fields) == len(PARSE_FIELDS) else """
+    The text is an excerpt of the CV: its other fields were already extracted, so only extract the fields below.
+    """
+    return f"""
+    Parse the following CV/Resume text and extract structured information in JSON format. 
+    IMPORTANT: Only include information that actually exists in the CV text. Do not add placeholder or example data.
+    If a field doesn't exist in the CV, either omit it entirely or set it to null/empty.
+    {excerpt_note}
+    Required JSON structure (only include fields that have actual data):
+    {{
+        {structure}
     }}
     
     CV Text:
@@ -227,6 +327,11 @@ def enhance_parsing_with_gemini(text):
     
     Return only the JSON object with actual data from the CV, no additional text:
     """
+
+def enhance_parsing_with_gemini(text, fields=PARSE_FIELDS):
+    """Use Gemini AI to parse CV text and extract the given fields of the structured schema"""
+    
+    prompt = build_parse_prompt(text, fields)
     
     try:
         url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
@@ -247,7 +352,7 @@ def enhance_parsing_with_gemini(text):
             ]
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        response = http_client.post(url, headers=headers, json=data, timeout=GEMINI_TIMEOUT)
         
         if response.status_code == 200:
             result = response.json()
@@ -274,657 +379,147 @@ def enhance_parsing_with_gemini(text):
         return None
 
 def parse_cv_text(text):
-    """Parse CV text and extract structured information with fallback"""
+    """
+    Parse CV text: fields the local parser is sure about are kept, and Gemini
+    only gets the rest of the text with the schema cut down to the missing
+    fields. If Gemini fails, the local best-effort parse is returned.
+    """
     
     print("=== SCRAPED CV TEXT ===")
     print(text[:1000] + "..." if len(text) > 1000 else text)
     print("=== END SCRAPED TEXT ===")
     
-    # First try with Gemini AI
-    gemini_result = enhance_parsing_with_gemini(text)
-    if gemini_result:
+    # Re-uploads of the same CV reuse the earlier Gemini parse
+    cached_result = parse_cache.get(text, PARSE_PROMPT_VERSION)
+    if cached_result:
+        print("⚡ Using cached Gemini parse for this CV text")
+        return cached_result
+    
+    local_parse = parse_cv_locally(text)
+    if HYBRID_PARSE:
+        fields = local_parse.uncertain_fields(HYBRID_PARSE_MIN_CONFIDENCE)
+        excerpt = local_parse.excerpt(fields)
+    else:
+        fields, excerpt = PARSE_FIELDS, text
+    with _hybrid_parse_stats_lock:
+        hybrid_parse_stats['parses'] += 1
+        hybrid_parse_stats['text_chars'] += len(text)
+    
+    if not fields or not excerpt.strip():
+        print("⚡ Parsed locally, nothing left for Gemini")
+        with _hybrid_parse_stats_lock:
+            hybrid_parse_stats['local_only'] += 1
+        parse_cache.put(text, PARSE_PROMPT_VERSION, local_parse.data)
+        return local_parse.data
+    
+    print(f"🤖 Asking Gemini for {len(fields)}/{len(PARSE_FIELDS)} fields from {len(excerpt)}/{len(text)} characters: {', '.join(fields)}")
+    gemini_result = enhance_parsing_with_gemini(excerpt, fields)
+    with _hybrid_parse_stats_lock:
+        hybrid_parse_stats['gemini_calls'] += 1
+        hybrid_parse_stats['gemini_fields'] += len(fields)
+        hybrid_parse_stats['text_chars_sent'] += len(excerpt)
+        if gemini_result is None:
+            hybrid_parse_stats['gemini_failures'] += 1
+    if gemini_result is not None:
+        parsed_data = local_parse.merge(gemini_result, fields)
         print("=== GEMINI PARSED DATA ===")
-        print(json.dumps(gemini_result, indent=2))
+        print(json.dumps(parsed_data, indent=2))
         print("=== END GEMINI DATA ===")
-        return gemini_result
-    
-    # Fallback to regex-based parsing if Gemini fails
-    print("Gemini failed, using fallback parsing...")
-    
-    # Initialize the parsed data structure with only empty containers
-    parsed_data = {
-        'name': '',
-        'email': '',
-        'phone': '',
-        'linkedin': '',
-        'github': '',
-        'website': '',
-        'address': '',
-        'education': [],
-        'experience': [],
-        'projects': [],
-        'skills': {
-            'languages': [],
-            'frameworks': [],
-            'tools': [],
-            'libraries': [],
-            'databases': [],
-            'other': []
-        },
-        'certifications': [],
-        'awards': [],
-        'languages': [],
-        'custom_sections': []
-    }
-    
-    lines = text.split('\n')
-    lines = [line.strip() for line in lines if line.strip()]
-    
-    # Extract basic contact information
-    for line in lines:
-        # Email pattern
-        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', line)
-        if email_match and not parsed_data['email']:
-            parsed_data['email'] = email_match.group()
-        
-        # Phone pattern
-        phone_match = re.search(r'(\+?1?[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})', line)
-        if phone_match and not parsed_data['phone']:
-            parsed_data['phone'] = phone_match.group()
-        
-        # LinkedIn pattern
-        if 'linkedin.com' in line.lower() and not parsed_data['linkedin']:
-            parsed_data['linkedin'] = line.strip()
-        
-        # GitHub pattern
-        if 'github.com' in line.lower() and not parsed_data['github']:
-            parsed_data['github'] = line.strip()
-        
-        # Website pattern (basic)
-        if ('http' in line.lower() or 'www.' in line.lower()) and 'linkedin' not in line.lower() and 'github' not in line.lower() and not parsed_data['website']:
-            parsed_data['website'] = line.strip()
-    
-    # Extract name (usually the first significant line)
-    if lines and not parsed_data['name']:
-        # Look for a line that might be a name (usually at the top, not an email/phone)
-        for line in lines[:5]:
-            if not re.search(r'[@()]', line) and len(line.split()) <= 4 and len(line) > 2:
-                parsed_data['name'] = line
-                break
-    
-    # Extract education, experience, projects, and skills
-    current_section = None
-    current_item = {}
-    
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        
-        # Identify sections
-        if any(keyword in line_lower for keyword in ['education', 'academic']):
-            current_section = 'education'
-            continue
-        elif any(keyword in line_lower for keyword in ['experience', 'work', 'employment', 'professional']):
-            current_section = 'experience'
-            continue
-        elif any(keyword in line_lower for keyword in ['project', 'portfolio']):
-            current_section = 'projects'
-            continue
-        elif any(keyword in line_lower for keyword in ['skill', 'technical', 'programming', 'languages']):
-            current_section = 'skills'
-            continue
-        
-        # Process content based on current section
-        if current_section == 'education' and line:
-            # Look for degree patterns
-            if any(degree in line_lower for degree in ['bachelor', 'master', 'phd', 'associate', 'certificate']):
-                if current_item:
-                    parsed_data['education'].append(current_item)
-                current_item = {'degree': line, 'institution': '', 'date': ''}
-            elif current_item and not current_item['institution']:
-                current_item['institution'] = line
-            elif current_item and re.search(r'\d{4}', line):
-                current_item['date'] = line
-        
-        elif current_section == 'experience' and line:
-            # Look for job titles or company names
-            if any(char in line for char in ['-', '|']) or re.search(r'\d{4}', line):
-                if current_item:
-                    parsed_data['experience'].append(current_item)
-                current_item = {'title': line, 'company': '', 'date': '', 'description': []}
-            elif current_item and not current_item.get('description'):
-                current_item['description'] = [line]
-            elif current_item:
-                current_item['description'].append(line)
-        
-        elif current_section == 'projects' and line:
-            if current_item and 'title' in current_item:
-                parsed_data['projects'].append(current_item)
-                current_item = {}
-            current_item = {'title': line, 'description': '', 'technologies': ''}
-        
-        elif current_section == 'skills' and line:
-            # Parse skills line by line
-            if any(keyword in line_lower for keyword in ['language', 'programming']):
-                skills_text = line.split(':')[-1] if ':' in line else line
-                parsed_data['skills']['languages'] = [s.strip() for s in skills_text.split(',') if s.strip()]
-            elif any(keyword in line_lower for keyword in ['framework']):
-                skills_text = line.split(':')[-1] if ':' in line else line
-                parsed_data['skills']['frameworks'] = [s.strip() for s in skills_text.split(',') if s.strip()]
-            elif any(keyword in line_lower for keyword in ['tool', 'software']):
-                skills_text = line.split(':')[-1] if ':' in line else line
-                parsed_data['skills']['tools'] = [s.strip() for s in skills_text.split(',') if s.strip()]
-    
-    # Add the last item if it exists
-    if current_item:
-        if current_section == 'education':
-            parsed_data['education'].append(current_item)
-        elif current_section == 'experience':
-            parsed_data['experience'].append(current_item)
-        elif current_section == 'projects':
-            parsed_data['projects'].append(current_item)
-    
-    # Clean up empty fields
-    cleaned_data = {}
-    for key, value in parsed_data.items():
-        if key == 'skills':
-            # Only include skill categories that have actual skills
-            skills_cleaned = {k: v for k, v in value.items() if v}
-            if skills_cleaned:
-                cleaned_data[key] = skills_cleaned
-        elif isinstance(value, list):
-            # Only include lists that have items
-            if value:
-                cleaned_data[key] = value
-        elif isinstance(value, str):
-            # Only include strings that are not empty
-            if value:
-                cleaned_data[key] = value
-        else:
-            if value:
-                cleaned_data[key] = value
-    
-    return cleaned_data
-
-def clean_text_for_latex(text):
-    """Clean text to be LaTeX-safe"""
-    if not text:
-        return ""
-    
-    # Handle case where text might be a list
-    if isinstance(text, list):
-        return [clean_text_for_latex(item) for item in text]
-    
-    # Convert to string if not already
-    text = str(text)
-    
-    # First handle backslashes to avoid conflicts
-    text = text.replace('\\', '\\textbackslash{}')
-    
-    # Replace problematic Unicode characters
-    replacements = {
-        '○': '\\textbullet',  # Unicode bullet
-        '●': '\\textbullet',  # Black circle
-        '•': '\\textbullet',  # Bullet
-        '◦': '\\textbullet',  # White bullet
-        '▪': '\\textbullet',  # Black small square
-        '▫': '\\textbullet',  # White small square
-        '–': '--',           # En dash
-        '—': '---',          # Em dash
-        '‘': "'",            # Left single quotation mark
-        '’': "'",            # Right single quotation mark
-        '“': '"',            # Left double quotation mark
-        '”': '"',            # Right double quotation mark
-        '…': '...',          # Horizontal ellipsis
-        '°': '\\textdegree', # Degree symbol
-        '±': '\\textpm',     # Plus-minus
-        '×': '\\texttimes',  # Multiplication sign
-        '÷': '\\textdiv',    # Division sign
-        '€': '\\texteuro',   # Euro sign
-        '£': '\\textsterling', # Pound sign
-        '¥': '\\textyen',    # Yen sign
-        '©': '\\textcopyright', # Copyright
-        '®': '\\textregistered', # Registered trademark
-        '™': '\\texttrademark', # Trademark
-    }
+        parse_cache.put(text, PARSE_PROMPT_VERSION, parsed_data)
+        return parsed_data
     
-    # Apply replacements
-    for unicode_char, latex_replacement in replacements.items():
-        text = text.replace(unicode_char, latex_replacement)
-    
-    # Escape special LaTeX characters (excluding backslash which we handled first)
-    latex_special_chars = {
-        '&': '\\&',
-        '%': '\\%',
-        '$': '\\$',
-        '#': '\\#',
-        '^': '\\textasciicircum{}',
-        '_': '\\_',
-        '{': '\\{',
-        '}': '\\}',
-        '~': '\\textasciitilde{}',
-    }
+    # Fall back to the local parse if Gemini fails
+    print("Gemini failed, using the local parse...")
+    return local_parse.data
+
+# LaTeX resume templates (latex_templates/<style>/*.tex), compiled once at startup.
+# Development servers pick up template edits without a restart.
+LATEX_TEMPLATES_AUTO_RELOAD = os.getenv('LATEX_TEMPLATES_AUTO_RELOAD', 'true' if os.getenv('FLASK_ENV', 'development') == 'development' else 'false').lower() == 'true'
+latex_templates = LatexTemplates(auto_reload=LATEX_TEMPLATES_AUTO_RELOAD)
+RESUME_STYLES = tuple(latex_templates.styles())
+print(f"📝 Loaded {latex_templates.preload()} LaTeX templates for styles: {', '.join(RESUME_STYLES)}")
+
+def resume_preamble(style=DEFAULT_RESUME_STYLE):
+    """Static preamble of a resume style. It is identical for every resume, so local
+    compiles can load it from a precompiled format instead of re-parsing it."""
+    return latex_templates.render(style, 'preamble')
+
+# Fields of parsed_data that feed the heading
+HEADING_FIELDS = ('name', 'phone', 'email', 'linkedin', 'github', 'website')
+
+# Resume sections in document order: (name, parsed_data -> section input).
+# Each is rendered by latex_templates/<style>/<name>.tex with the input bound to <name>;
+# sections whose input is empty are left out of the document.
+RESUME_SECTIONS = (
+    ('heading', lambda data: {key: data[key] for key in HEADING_FIELDS if key in data}),
+    ('summary', lambda data: data.get('summary')),
+    ('education', lambda data: data.get('education')),
+    ('experience', lambda data: data.get('experience')),
+    ('projects', lambda data: data.get('projects')),
+    ('skills', lambda data: data.get('skills')),
+    ('certifications', lambda data: data.get('certifications')),
+    ('awards', lambda data: data.get('awards')),
+    ('languages', lambda data: data.get('languages')),
+    ('custom_sections', lambda data: data.get('custom_sections')),
+)
+
+# Rendered section fragments keyed by (compiled template, hash of the section input), so
+# editing one section of a CV only re-renders that section. A reloaded template is a new
+# object, so its old fragments simply stop being hit.
+LATEX_FRAGMENT_CACHE_SIZE = int(os.getenv('LATEX_FRAGMENT_CACHE_SIZE', 4096))
+_latex_fragments = OrderedDict()
+_latex_fragments_lock = threading.Lock()
+latex_fragment_stats = {'hits': 0, 'misses': 0}
+
+def render_resume_section(style, name, section_input):
+    """Render one section, reusing the cached fragment when its input is unchanged"""
+    template = latex_templates.get(style, name)
+    digest = hashlib.sha1(json.dumps(section_input, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    key = (template, digest)
+    with _latex_fragments_lock:
+        fragment = _latex_fragments.get(key)
+        if fragment is not None:
+            _latex_fragments.move_to_end(key)
+            latex_fragment_stats['hits'] += 1
+            return fragment
+        latex_fragment_stats['misses'] += 1
     
-    for char, replacement in latex_special_chars.items():
-        text = text.replace(char, replacement)
+    fragment = template.render(**{name: section_input})
+    with _latex_fragments_lock:
+        _latex_fragments[key] = fragment
+        while len(_latex_fragments) > LATEX_FRAGMENT_CACHE_SIZE:
+            _latex_fragments.popitem(last=False)
+    return fragment
+
+def iter_latex_resume(parsed_data, style=DEFAULT_RESUME_STYLE):
+    """
+    Yield the LaTeX resume chunk by chunk (preamble, one chunk per section, footer).
     
-    return text
-
-def generate_latex_resume(parsed_data):
-    """Generate LaTeX resume using Jake's Resume template"""
-    
-    # Jake's Resume template with Unicode support
-    latex_template = r"""
-%-------------------------
-% Resume in Latex
-% Author : Jake Gutierrez
-% Based off of: https://github.com/sb2nov/resume
-% License : MIT
-%------------------------
-
-\documentclass[letterpaper,11pt]{article}
-
-\usepackage{latexsym}
-\usepackage[empty]{fullpage}
-\usepackage{titlesec}
-\usepackage{marvosym}
-\usepackage[usenames,dvipsnames]{color}
-\usepackage{verbatim}
-\usepackage{enumitem}
-\usepackage[hidelinks]{hyperref}
-\usepackage{fancyhdr}
-\usepackage[english]{babel}
-\usepackage{tabularx}
-\usepackage[utf8]{inputenc}
-\usepackage[T1]{fontenc}
-\usepackage{textcomp}
-
-%----------FONT OPTIONS----------
-% sans-serif
-% \usepackage[sfdefault]{FiraSans}
-% \usepackage[sfdefault]{roboto}
-% \usepackage[sfdefault]{noto-sans}
-% \usepackage[default]{sourcesanspro}
-
-% serif
-% \usepackage{CormorantGaramond}
-% \usepackage{charter}
-
-\pagestyle{fancy}
-\fancyhf{} % clear all header and footer fields
-\fancyfoot{}
-\renewcommand{\headrulewidth}{0pt}
-\renewcommand{\footrulewidth}{0pt}
-
-% Adjust margins
-\addtolength{\oddsidemargin}{-0.5in}
-\addtolength{\evensidemargin}{-0.5in}
-\addtolength{\textwidth}{1in}
-\addtolength{\topmargin}{-.5in}
-\addtolength{\textheight}{1.0in}
-
-\urlstyle{same}
-
-\raggedbottom
-\raggedright
-\setlength{\tabcolsep}{0in}
-
-% Sections formatting
-\titleformat{\section}{
-  \vspace{-4pt}\raggedright\large\bfseries
-}{}{0em}{}[\color{black}\titlerule \vspace{-5pt}]
-
-% Ensure compatibility with online LaTeX compilers
-
-%-------------------------
-% Custom commands
-\newcommand{\resumeItem}[1]{
-  \item\small{
-    {#1 \vspace{-2pt}}
-  }
-}
-
-\newcommand{\resumeSubheading}[4]{
-  \vspace{-2pt}\item
-    \begin{tabular*}{0.97\textwidth}[t]{l@{\extracolsep{\fill}}r}
-      \textbf{#1} & #2 \\
-      \textit{\small#3} & \textit{\small #4} \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\newcommand{\resumeSubSubheading}[2]{
-    \item
-    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
-      \textit{\small#1} & \textit{\small #2} \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\newcommand{\resumeProjectHeading}[2]{
-    \item
-    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
-      \small#1 & #2 \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\newcommand{\resumeSubItem}[1]{\resumeItem{#1}\vspace{-4pt}}
-
-\renewcommand\labelitemii{$\vcenter{\hbox{\tiny$\bullet$}}$}
-
-\newcommand{\resumeSubHeadingListStart}{\begin{itemize}[leftmargin=0.15in, label={}]}
-\newcommand{\resumeSubHeadingListEnd}{\end{itemize}}
-\newcommand{\resumeItemListStart}{\begin{itemize}}
-\newcommand{\resumeItemListEnd}{\end{itemize}\vspace{-5pt}}
-
-%-------------------------------------------
-%%%%%%  RESUME STARTS HERE  %%%%%%%%%%%%%%%%%%%%%%%%%%%%
-
-\begin{document}
-
-%----------HEADING----------
-\begin{center}
-    \textbf{\Huge """ + clean_text_for_latex(parsed_data.get('name', 'Name Not Found')) + r"""} \\ \vspace{1pt}"""
-
-    # Build contact information dynamically
-    contact_parts = []
-    
-    if parsed_data.get('phone'):
-        contact_parts.append(clean_text_for_latex(parsed_data['phone']))
-    
-    if parsed_data.get('email'):
-        email = clean_text_for_latex(parsed_data['email'])
-        contact_parts.append(f"\\href{{mailto:{email}}}{{\\underline{{{email}}}}}")
-    
-    if parsed_data.get('linkedin'):
-        linkedin_url = parsed_data['linkedin']
-        if not linkedin_url.startswith('http'):
-            linkedin_url = 'https://' + linkedin_url
-        contact_parts.append(f"\\href{{{linkedin_url}}}{{\\underline{{LinkedIn}}}}")
-    
-    if parsed_data.get('github'):
-        github_url = parsed_data['github']
-        if not github_url.startswith('http'):
-            github_url = 'https://' + github_url
-        contact_parts.append(f"\\href{{{github_url}}}{{\\underline{{GitHub}}}}")
-    
-    if parsed_data.get('website'):
-        website_url = parsed_data['website']
-        if not website_url.startswith('http'):
-            website_url = 'https://' + website_url
-        contact_parts.append(f"\\href{{{website_url}}}{{\\underline{{Website}}}}")
-    
-    if contact_parts:
-        latex_template += f"""
-    \\small {' $|$ '.join(contact_parts)}"""
-    
-    latex_template += r"""
-\end{center}"""
-
-    # Add Professional Summary section only if summary data exists
-    if parsed_data.get('summary'):
-        summary = clean_text_for_latex(parsed_data['summary'])
-        latex_template += f"""
-
-%-----------PROFESSIONAL SUMMARY-----------
-\\section{{Professional Summary}}
- \\begin{{itemize}}[leftmargin=0.15in, label={{}}]
-    \\small{{\\item{{
-     {summary}
-    }}}}
- \\end{{itemize}}"""
-
-    # Add Education section only if education data exists
-    if parsed_data.get('education'):
-        latex_template += r"""
-
-%-----------EDUCATION-----------
-\section{Education}
-  \resumeSubHeadingListStart"""
-        
-        for edu in parsed_data['education']:
-            degree = clean_text_for_latex(edu.get('degree', ''))
-            institution = clean_text_for_latex(edu.get('institution', ''))
-            date = clean_text_for_latex(edu.get('date', ''))
-            location = clean_text_for_latex(edu.get('location', ''))
-            gpa = clean_text_for_latex(edu.get('gpa', ''))
-            details = clean_text_for_latex(edu.get('details', ''))
-            
-            # Build the education entry
-            latex_template += f"""
-    \\resumeSubheading
-      {{{degree}}}{{{date}}}
-      {{{institution}}}{{{location}}}"""
-            
-            # Add GPA or details if they exist
-            if gpa or details:
-                latex_template += r"""
-      \resumeItemListStart"""
-                if gpa:
-                    latex_template += f"""
-        \\resumeItem{{GPA: {gpa}}}"""
-                if details:
-                    latex_template += f"""
-        \\resumeItem{{{details}}}"""
-                latex_template += r"""
-      \resumeItemListEnd"""
-        
-        latex_template += r"""
-  \resumeSubHeadingListEnd"""
-
-    # Add Experience section only if experience data exists
-    if parsed_data.get('experience'):
-        latex_template += r"""
-
-%-----------EXPERIENCE-----------
-\section{Experience}
-  \resumeSubHeadingListStart"""
-        
-        for exp in parsed_data['experience']:
-            title = clean_text_for_latex(exp.get('title', ''))
-            company = clean_text_for_latex(exp.get('company', ''))
-            date = clean_text_for_latex(exp.get('date', ''))
-            location = clean_text_for_latex(exp.get('location', ''))
-            description = exp.get('description', [])
-            
-            latex_template += f"""
-    \\resumeSubheading
-      {{{title}}}{{{date}}}
-      {{{company}}}{{{location}}}"""
-            
-            if description:
-                latex_template += r"""
-      \resumeItemListStart"""
-                for desc in description[:4]:  # Limit to 4 bullet points
-                    clean_desc = clean_text_for_latex(desc)
-                    latex_template += f"""
-        \\resumeItem{{{clean_desc}}}"""
-                latex_template += r"""
-      \resumeItemListEnd"""
-        
-        latex_template += r"""
-  \resumeSubHeadingListEnd"""
-
-    # Add Projects section only if projects data exists
-    if parsed_data.get('projects'):
-        latex_template += r"""
-
-%-----------PROJECTS-----------
-\section{Projects}
-    \resumeSubHeadingListStart"""
-        
-        for project in parsed_data['projects']:
-            title = clean_text_for_latex(project.get('title', ''))
-            description = project.get('description', '')
-            if isinstance(description, list):
-                description = clean_text_for_latex(' '.join(description))
-            else:
-                description = clean_text_for_latex(description)
-            technologies = clean_text_for_latex(project.get('technologies', ''))
-            date = clean_text_for_latex(project.get('date', ''))
-            link = project.get('link', '')
-            
-            # Build project title with technologies
-            project_title = title
-            if technologies:
-                project_title += f" $|$ \\emph{{{technologies}}}"
-            
-            latex_template += f"""
-      \\resumeProjectHeading
-          {{\\textbf{{{project_title}}}}}{{{date}}}"""
-            
-            if description:
-                latex_template += f"""
-          \\resumeItemListStart
-            \\resumeItem{{{description}}}"""
-                if link:
-                    latex_template += f"""
-            \\resumeItem{{Link: \\href{{{link}}}{{\\underline{{{link}}}}}}}"""
-                latex_template += r"""
-          \resumeItemListEnd"""
-        
-        latex_template += r"""
-    \resumeSubHeadingListEnd"""
-
-    # Add Technical Skills section only if skills data exists
-    if parsed_data.get('skills'):
-        skills = parsed_data['skills']
-        skill_lines = []
-        
-        if skills.get('languages'):
-            clean_languages = [clean_text_for_latex(lang) for lang in skills['languages']]
-            skill_lines.append(f"\\textbf{{Languages}}: {', '.join(clean_languages)}")
-        
-        if skills.get('frameworks'):
-            clean_frameworks = [clean_text_for_latex(fw) for fw in skills['frameworks']]
-            skill_lines.append(f"\\textbf{{Frameworks}}: {', '.join(clean_frameworks)}")
-        
-        if skills.get('tools'):
-            clean_tools = [clean_text_for_latex(tool) for tool in skills['tools']]
-            skill_lines.append(f"\\textbf{{Developer Tools}}: {', '.join(clean_tools)}")
-        
-        if skills.get('libraries'):
-            clean_libraries = [clean_text_for_latex(lib) for lib in skills['libraries']]
-            skill_lines.append(f"\\textbf{{Libraries}}: {', '.join(clean_libraries)}")
-        
-        if skills.get('databases'):
-            clean_databases = [clean_text_for_latex(db) for db in skills['databases']]
-            skill_lines.append(f"\\textbf{{Databases}}: {', '.join(clean_databases)}")
-        
-        if skills.get('other'):
-            clean_other = [clean_text_for_latex(other) for other in skills['other']]
-            skill_lines.append(f"\\textbf{{Other}}: {', '.join(clean_other)}")
-        
-        if skill_lines:
-            latex_template += r"""
-
-%-----------PROGRAMMING SKILLS-----------
-\section{Technical Skills}
- \begin{itemize}[leftmargin=0.15in, label={}]
-    \small{\item{
-     """ + ' \\\\\n     '.join(skill_lines) + r"""
-    }}
- \end{itemize}"""
-
-    # Add Certifications section only if certifications data exists
-    if parsed_data.get('certifications'):
-        latex_template += r"""
-
-%-----------CERTIFICATIONS-----------
-\section{Certifications}
-  \resumeSubHeadingListStart"""
-        
-        for cert in parsed_data['certifications']:
-            name = clean_text_for_latex(cert.get('name', ''))
-            issuer = clean_text_for_latex(cert.get('issuer', ''))
-            date = clean_text_for_latex(cert.get('date', ''))
-            
-            latex_template += f"""
-    \\resumeSubheading
-      {{{name}}}{{{date}}}
-      {{{issuer}}}{{}}"""
-        
-        latex_template += r"""
-  \resumeSubHeadingListEnd"""
-
-    # Add Awards section only if awards data exists
-    if parsed_data.get('awards'):
-        latex_template += r"""
-
-%-----------AWARDS-----------
-\section{Awards \& Honors}
-  \resumeItemListStart"""
-        
-        for award in parsed_data['awards']:
-            clean_award = clean_text_for_latex(award)
-            latex_template += f"""
-    \\resumeItem{{{clean_award}}}"""
-        
-        latex_template += r"""
-  \resumeItemListEnd"""
-
-    # Add Languages section only if language data exists
-    if parsed_data.get('languages'):
-        latex_template += r"""
-
-%-----------LANGUAGES-----------
-\section{Languages}
-  \resumeItemListStart"""
-        
-        for lang in parsed_data['languages']:
-            clean_lang = clean_text_for_latex(lang)
-            latex_template += f"""
-    \\resumeItem{{{clean_lang}}}"""
-        
-        latex_template += r"""
-  \resumeItemListEnd"""
-
-    # Add Custom Sections
-    if parsed_data.get('custom_sections'):
-        for section in parsed_data['custom_sections']:
-            title = clean_text_for_latex(section.get('title', ''))
-            content = clean_text_for_latex(section.get('content', ''))
-            
-            # Convert title to uppercase for section header
-            title_upper = title.upper()
-            
-            latex_template += f"""
-
-%-----------{title_upper}-----------
-\\section{{{title}}}"""
-            
-            # Check if content contains bullet points or line breaks
-            content_lines = [line.strip() for line in content.split('\n') if line.strip()]
-            
-            if len(content_lines) > 1:
-                # Multiple lines - treat as list
-                latex_template += r"""
-  \resumeItemListStart"""
-                
-                for line in content_lines:
-                    # Remove bullet points if they exist
-                    clean_line = line.lstrip('•*-+ ').strip()
-                    if clean_line:
-                        latex_template += f"""
-    \\resumeItem{{{clean_line}}}"""
-                
-                latex_template += r"""
-  \resumeItemListEnd"""
-            else:
-                # Single line or paragraph - treat as simple text
-                if content:
-                    latex_template += f"""
- \\begin{{itemize}}[leftmargin=0.15in, label={{}}]
-    \\small{{\\item{{
-     {content}
-    }}}}
- \\end{{itemize}}"""
-
-    latex_template += r"""
-
-%-------------------------------------------
-\end{document}
-"""
-
-    return latex_template
-
+    Lets callers stream the document to a file or HTTP response without
+    building it in memory first.
+    """
+    yield resume_preamble(style)
+    for name, select_input in RESUME_SECTIONS:
+        section_input = select_input(parsed_data)
+        if section_input or name == 'heading':
+            yield render_resume_section(style, name, section_input)
+    yield latex_templates.render(style, 'footer')
+
+def generate_latex_resume(parsed_data, style=DEFAULT_RESUME_STYLE):
+    """Generate a LaTeX resume in the given style (Jake's Resume by default)"""
+    return ''.join(iter_latex_resume(parsed_data, style))
+
+def write_output_pdf(output_filename, pdf_bytes):
+    """Atomically write PDF bytes into the output folder and return the path"""
+    output_dir = os.path.abspath(app.config['OUTPUT_FOLDER'])
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_path = os.path.join(output_dir, output_filename)
+    # Write to a temp file and rename so a cached hardlink is replaced, never modified in place
+    tmp_path = f"{pdf_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, pdf_path)
+    return pdf_path
 
 def compile_latex_online(latex_content, output_filename):
     """Compile LaTeX using latexonline.cc service with Pastebin URL-based approach."""
@@ -941,15 +536,11 @@ def compile_latex_online(latex_content, output_filename):
             compile_url = f"https://latexonline.cc/compile?url={urllib.parse.quote(pastebin_url)}"
             print(f"🔗 Calling: {compile_url}")
             
-            resp = requests.get(compile_url, timeout=60)
+            resp = http_client.get(compile_url, timeout=60)
             
             content_type = resp.headers.get('Content-Type', '')
             if resp.status_code == 200 and 'pdf' in content_type:
-                output_dir = os.path.abspath(app.config['OUTPUT_FOLDER'])
-                os.makedirs(output_dir, exist_ok=True)
-                pdf_path = os.path.join(output_dir, output_filename)
-                with open(pdf_path, 'wb') as f:
-                    f.write(resp.content)
+                pdf_path = write_output_pdf(output_filename, resp.content)
                 print(f"✅ Online PDF created at: {pdf_path}")
                 return True
             else:
@@ -967,15 +558,11 @@ def compile_latex_online(latex_content, output_filename):
         if estimated_url_length < 8000:  # Safe URL length limit
             print("📄 Using GET text method for short content")
             url = f"https://latexonline.cc/compile?text={encoded_content}"
-            resp = requests.get(url, timeout=60)
+            resp = http_client.get(url, timeout=60)
             
             content_type = resp.headers.get('Content-Type', '')
             if resp.status_code == 200 and 'pdf' in content_type:
-                output_dir = os.path.abspath(app.config['OUTPUT_FOLDER'])
-                os.makedirs(output_dir, exist_ok=True)
-                pdf_path = os.path.join(output_dir, output_filename)
-                with open(pdf_path, 'wb') as f:
-                    f.write(resp.content)
+                pdf_path = write_output_pdf(output_filename, resp.content)
                 print(f"✅ Fallback PDF created at: {pdf_path}")
                 return True
             else:
@@ -996,8 +583,9 @@ def compile_latex_online(latex_content, output_filename):
                     tar.add(tex_path, arcname='main.tex')
 
                 with open(tar_path, 'rb') as f:
-                    files = {'file': ('texfiles.tar', f, 'application/x-tar')}
-                    resp = requests.post(
+                    # Send bytes rather than the file object so a retry re-sends the whole archive
+                    files = {'file': ('texfiles.tar', f.read(), 'application/x-tar')}
+                    resp = http_client.post(
                         'https://latexonline.cc/data?target=main.tex',
                         files=files,
                         timeout=60
@@ -1005,11 +593,7 @@ def compile_latex_online(latex_content, output_filename):
             
             content_type = resp.headers.get('Content-Type', '')
             if resp.status_code == 200 and 'pdf' in content_type:
-                output_dir = os.path.abspath(app.config['OUTPUT_FOLDER'])
-                os.makedirs(output_dir, exist_ok=True)
-                pdf_path = os.path.join(output_dir, output_filename)
-                with open(pdf_path, 'wb') as f:
-                    f.write(resp.content)
+                pdf_path = write_output_pdf(output_filename, resp.content)
                 print(f"✅ Multipart PDF created at: {pdf_path}")
                 return True
             else:
@@ -1039,7 +623,7 @@ def create_pastebin_paste(latex_content):
         }
         
         # Create the paste
-        response = requests.post(
+        response = http_client.post(
             'https://pastebin.com/api/api_post.php',
             data=api_data,
             timeout=30
@@ -1075,13 +659,106 @@ def create_pastebin_paste(latex_content):
 
 
 
+# Pick the compile backend once per process: a local engine if one is installed, else latexonline.cc
+compile_backend = select_backend(
+    compile_latex_online,
+    app.config['OUTPUT_FOLDER'],
+    preference=os.getenv('LATEX_BACKEND', 'auto'),
+    engine=os.getenv('LATEX_ENGINE') or None,
+    workers=int(os.getenv('LATEX_WORKERS', 2)),
+    timeout=int(os.getenv('LATEX_COMPILE_TIMEOUT', 120)),
+    base_texmf_cache=os.getenv('TEXMFCACHE'),
+    scratch_root=os.getenv('LATEX_SCRATCH_DIR') or None,
+)
+
+if compile_backend.name == 'local':
+    print(f"✅ PDF generation enabled via local {compile_backend.engine} ({compile_backend.workers} workers)")
+    # Dump every style's static preamble into a precompiled format, then warm the workers. With
+    # gunicorn --preload this runs in the master; workers pick the formats up from disk, or dump
+    # them themselves on their first compile if the master had not finished yet.
+    style_preambles = [resume_preamble(style) for style in RESUME_STYLES]
+    compile_backend.expect_preambles(style_preambles)
+    threading.Thread(target=compile_backend.warm_up, args=(style_preambles,), daemon=True).start()
+else:
+    print("✅ PDF generation enabled via latexonline.cc")
+    print("🌐 No local LaTeX installation required")
+
 def compile_latex_to_pdf(latex_content, output_filename):
-    """Compile LaTeX content to PDF using latexonline.cc (hybrid approach: GET for short content, multipart for long content)."""
+    """Compile LaTeX content to PDF with the selected backend (local engine or latexonline.cc)."""
     print(f"🔍 compile_latex_to_pdf called with output_filename: {output_filename}")
-    return compile_latex_online(latex_content, output_filename)
+    
+    # Identical LaTeX compiles to an identical PDF, so reuse a cached copy when we have one
+    pdf_path = os.path.join(os.path.abspath(app.config['OUTPUT_FOLDER']), output_filename)
+    if pdf_cache.fetch(latex_content, pdf_path):
+        print(f"⚡ PDF served from compile cache: {pdf_path}")
+        return True
+    
+    return compile_and_cache_pdf(latex_content, output_filename)
+
+def compile_and_cache_pdf(latex_content, output_filename):
+    """Compile with the selected backend (skipping the cache lookup) and cache the result."""
+    compiled = compile_backend.compile(latex_content, output_filename)
+    if compiled:
+        pdf_path = os.path.join(os.path.abspath(app.config['OUTPUT_FOLDER']), output_filename)
+        pdf_cache.store(latex_content, pdf_path)
+    return compiled
+
+# PDF compiles run in a background job queue so requests never hold a gunicorn worker
+compile_jobs = CompileJobQueue(
+    os.getenv('COMPILE_JOBS_DB', os.path.join(STATE_FOLDER, 'compile_jobs.sqlite3')),
+    compile_and_cache_pdf,
+    concurrency=int(os.getenv('COMPILE_JOB_CONCURRENCY', 2)),
+    stale_after=3 * int(os.getenv('LATEX_COMPILE_TIMEOUT', 120)),
+)
+
+@app.before_request
+def start_compile_workers():
+    # Jobs queued before a restart or a worker recycle must not wait for the next submit
+    compile_jobs.start()
+
+def queue_pdf_compile(latex_content, pdf_filename):
+    """Queue a background PDF compile and return the response fields describing it"""
+    # Unchanged documents are served straight from the compile cache
+    pdf_path = os.path.join(os.path.abspath(app.config['OUTPUT_FOLDER']), pdf_filename)
+    if pdf_cache.fetch(latex_content, pdf_path):
+        print(f"⚡ PDF served from compile cache: {pdf_path}")
+        return {
+            'pdf_compiled': True,
+            'pdf_pending': False,
+            'compile_job_id': None,
+            'compile_status_url': None,
+        }
+    
+    job_id = compile_jobs.submit(latex_content, pdf_filename)
+    print(f"📥 Queued compile job {job_id} for {pdf_filename}")
+    return {
+        'pdf_compiled': False,
+        'pdf_pending': True,
+        'compile_job_id': job_id,
+        'compile_status_url': f'/api/compile-jobs/{job_id}',
+    }
+
+# Shared pool for the compile and scoring branches of the improved-resume pipeline.
+# Threads start on first use, so none exist yet when gunicorn forks its workers.
+improve_pipeline_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('IMPROVE_PIPELINE_WORKERS', 8)),
+    thread_name_prefix='improve-pipeline',
+)
+# Overall time budget for /api/generate-improved-resume; slower branches are returned as pending
+IMPROVE_RESUME_DEADLINE = int(os.getenv('IMPROVE_RESUME_DEADLINE', 120))
+
+# Saved CVs live in SQLite; the cv_data/*.json files are only read by the one-shot migration
+cv_store = CVStore(os.getenv('CV_STORE_DB', os.path.join(STATE_FOLDER, 'cv_store.sqlite3')))
+if not cv_store.is_migrated():
+    migrated, skipped, failed = cv_store.migrate_folder(CV_DATA_FOLDER)
+    print(f"📦 Migrated {migrated} saved CVs from {CV_DATA_FOLDER}/ into the CV store")
+
+# Page sizes for /api/cvs
+CV_PAGE_SIZE = 50
+CV_MAX_PAGE_SIZE = 200
 
 def save_cv_data(cv_id, cv_data, metadata=None):
-    """Save CV data to JSON file for future editing"""
+    """Save CV data to the CV store for future editing"""
     try:
         cv_data_with_meta = {
             'id': cv_id,
@@ -1091,27 +768,18 @@ def save_cv_data(cv_id, cv_data, metadata=None):
             'data': cv_data
         }
         
-        cv_file_path = os.path.join(CV_DATA_FOLDER, f"{cv_id}.json")
-        with open(cv_file_path, 'w', encoding='utf-8') as f:
-            json.dump(cv_data_with_meta, f, indent=2, ensure_ascii=False)
+        cv_store.save(cv_data_with_meta)
         
-        print(f"✅ CV data saved: {cv_file_path}")
+        print(f"✅ CV data saved: {cv_id}")
         return True
     except Exception as e:
         print(f"❌ Error saving CV data: {e}")
         return False
 
 def load_cv_data(cv_id):
-    """Load CV data from JSON file"""
+    """Load CV data from the CV store"""
     try:
-        cv_file_path = os.path.join(CV_DATA_FOLDER, f"{cv_id}.json")
-        if not os.path.exists(cv_file_path):
-            return None
-        
-        with open(cv_file_path, 'r', encoding='utf-8') as f:
-            cv_data = json.load(f)
-        
-        return cv_data
+        return cv_store.load(cv_id)
     except Exception as e:
         print(f"❌ Error loading CV data: {e}")
         return None
@@ -1119,52 +787,45 @@ def load_cv_data(cv_id):
 def update_cv_data(cv_id, cv_data):
     """Update existing CV data"""
     try:
-        existing_data = load_cv_data(cv_id)
-        if not existing_data:
+        if not cv_store.update(cv_id, cv_data, time.strftime('%Y-%m-%d %H:%M:%S')):
             return False
         
-        existing_data['data'] = cv_data
-        existing_data['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
-        
-        cv_file_path = os.path.join(CV_DATA_FOLDER, f"{cv_id}.json")
-        with open(cv_file_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ CV data updated: {cv_file_path}")
+        print(f"✅ CV data updated: {cv_id}")
         return True
     except Exception as e:
         print(f"❌ Error updating CV data: {e}")
         return False
 
-def list_cv_data():
-    """List all saved CV data"""
+def list_cv_data(limit=None, sort='updated_at', descending=True, after=None,
+                 name_prefix=None, email_prefix=None):
+    """
+    List saved CVs one page at a time, most recently updated first by default.
+    
+    Returns:
+        tuple: (cv summaries, cursor for the next page or None)
+    """
     try:
-        cv_list = []
-        for filename in os.listdir(CV_DATA_FOLDER):
-            if filename.endswith('.json'):
-                cv_id = filename[:-5]  # Remove .json extension
-                cv_data = load_cv_data(cv_id)
-                if cv_data:
-                    cv_summary = {
-                        'id': cv_id,
-                        'name': cv_data.get('data', {}).get('name', 'Unnamed CV'),
-                        'email': cv_data.get('data', {}).get('email', ''),
-                        'created_at': cv_data.get('created_at', ''),
-                        'updated_at': cv_data.get('updated_at', ''),
-                    }
-                    cv_list.append(cv_summary)
-        
-        # Sort by updated_at (most recent first)
-        cv_list.sort(key=lambda x: x['updated_at'], reverse=True)
-        return cv_list
+        # Fetch one extra row to learn whether another page follows
+        cv_list = cv_store.list(limit=limit + 1 if limit else None, sort=sort, descending=descending,
+                                after=after, name_prefix=name_prefix, email_prefix=email_prefix)
+        next_cursor = None
+        if limit and len(cv_list) > limit:
+            cv_list = cv_list[:limit]
+            last = cv_list[-1]
+            next_cursor = encode_cursor(sort, descending, last[sort], last['id'])
+        for cv_summary in cv_list:
+            cv_summary['name'] = cv_summary['name'] or 'Unnamed CV'
+        return cv_list, next_cursor
     except Exception as e:
         print(f"❌ Error listing CV data: {e}")
-        return []
+        return [], None
 
 def delete_cv_data(cv_id):
     """Delete CV data and associated files"""
     try:
-        # Delete JSON data file
+        cv_store.delete(cv_id)
+        
+        # Delete the pre-SQLite JSON copy too, so the CV's data does not outlive it (or come back with a re-run migration)
         cv_file_path = os.path.join(CV_DATA_FOLDER, f"{cv_id}.json")
         if os.path.exists(cv_file_path):
             os.remove(cv_file_path)
@@ -1181,6 +842,24 @@ def delete_cv_data(cv_id):
         print(f"❌ Error deleting CV data: {e}")
         return False
 
+# Bulk conversion for /api/batch and `python -m batch`; each pipeline stage has its own bounded pool
+batch_converter = BatchConverter(
+    parse_cv_text,
+    generate_latex_resume,
+    save_cv_data,
+    compile_latex_to_pdf,
+    app.config['OUTPUT_FOLDER'],
+    extract_workers=int(os.getenv('BATCH_EXTRACT_WORKERS', 2)),
+    gemini_workers=int(os.getenv('BATCH_GEMINI_WORKERS', 4)),
+    compile_workers=int(os.getenv('BATCH_COMPILE_WORKERS', 2)),
+    max_pages=int(os.getenv('PDF_MAX_PAGES', 30)),
+    max_chars=int(os.getenv('PDF_MAX_CHARS', 100000)),
+    result_timeout=int(os.getenv('BATCH_RESULT_TIMEOUT', 600)),
+)
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 500))
+# Uploads return at once; the zip is built in the background and fetched from /api/batch/<id>/download
+batch_jobs = BatchJobs(os.getenv('BATCH_JOBS_DB', os.path.join(STATE_FOLDER, 'batch_jobs.sqlite3')), batch_converter)
+
 def enhance_cv_for_job(parsed_data, job_description):
     """Use Gemini AI to enhance CV content for a specific job description"""
     
@@ -1292,7 +971,7 @@ Skills:
             ]
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        response = http_client.post(url, headers=headers, json=data, timeout=GEMINI_TIMEOUT)
         
         if response.status_code == 200:
             result = response.json()
@@ -1329,86 +1008,200 @@ def index():
 def upload_page():
     return render_template('upload.html')
 
-@app.route('/api/upload', methods=['POST'])
-def upload_file():
+def read_uploaded_cv():
+    """
+    Validate the uploaded CV and extract its text straight from the spooled upload
+    (nothing is written to uploads/).
+    
+    Returns:
+        tuple: (filename, extracted_text, None) on success, or (None, None, error response)
+    """
     if 'file' not in request.files:
-        return jsonify({'error': 'No file selected'}), 400
+        return None, None, (jsonify({'error': 'No file selected'}), 400)
     
     file = request.files['file']
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return None, None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not (file and allowed_file(file.filename)):
+        return None, None, (jsonify({'error': 'Invalid file type. Please upload PDF or DOCX files only.'}), 400)
+    
+    filename = secure_filename(file.filename)
+    file.stream.seek(0)
+    if filename.lower().endswith('.pdf'):
+        extracted_text = extract_text_from_pdf(file.stream)
+    elif filename.lower().endswith('.docx'):
+        extracted_text = extract_text_from_docx(file.stream)
+    else:
+        return None, None, (jsonify({'error': 'Unsupported file type'}), 400)
+    if not extracted_text.strip():
+        return None, None, (jsonify({'error': 'Could not extract text from your file. Please upload a text-based PDF or DOCX.'}), 400)
+    return filename, extracted_text, None
+
+def parse_uploaded_cv(extracted_text, mode, job_description):
+    """Parse CV text with Gemini, tailor it in tailored mode and record it in Google Sheets"""
+    parsed_data = parse_cv_text(extracted_text)
+    
+    # Enhance CV for job if in tailored mode
+    if mode == 'tailored' and job_description:
+        print(f"=== TAILORING CV FOR JOB ===")
+        print(f"Job Description (first 200 chars): {job_description[:200]}...")
+        parsed_data = enhance_cv_for_job(parsed_data, job_description)
+    
+    # Queue the CV for Google Sheets if configured; the outbox flusher sends it in the background
+    if GOOGLE_SHEETS_SPREADSHEET_ID:
+        try:
+            sheets_outbox.enqueue(GOOGLE_SHEETS_SPREADSHEET_ID, export_payload(parsed_data, SHEETS_LAYOUT))
+        except Exception as e:
+            print(f"⚠️ Failed to queue CV data for Google Sheets: {e}")
+            # Continue with the process even if sheets save fails
+    return parsed_data
+
+def save_preview_session(parsed_data, mode, job_description, filename):
+    """Store parsed CV data for /preview-cv/<session_id> and return the new session ID"""
+    session_id = str(uuid.uuid4())
+    cv_data = {
+        'parsed_data': parsed_data,
+        'mode': mode,
+        'job_description': job_description,
+        'original_filename': filename
+    }
+    
+    # Save to temporary storage (using file system for simplicity)
+    session_file = os.path.join('temp_sessions', f'{session_id}.json')
+    os.makedirs('temp_sessions', exist_ok=True)
+    with open(session_file, 'w', encoding='utf-8') as f:
+        json.dump(cv_data, f, ensure_ascii=False, indent=2)
+    return session_id
+
+@app.route('/api/upload', methods=['POST'])
+def upload_file():
+    filename, extracted_text, error = read_uploaded_cv()
+    if error:
+        return error
     
     # Get mode and job description from form data
     mode = request.form.get('mode', 'professional')
     job_description = request.form.get('job_description', '')
     
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        # Extract text based on file type
-        if filename.lower().endswith('.pdf'):
-            extracted_text = extract_text_from_pdf(file_path)
-        elif filename.lower().endswith('.docx'):
-            extracted_text = extract_text_from_docx(file_path)
-        else:
-            return jsonify({'error': 'Unsupported file type'}), 400
-        if not extracted_text.strip():
-            return jsonify({'error': 'Could not extract text from your file. Please upload a text-based PDF or DOCX.'}), 400
-        
-        # Parse the extracted text using Gemini AI
-        parsed_data = parse_cv_text(extracted_text)
-        
-        # Enhance CV for job if in tailored mode
-        if mode == 'tailored' and job_description:
-            print(f"=== TAILORING CV FOR JOB ===")
-            print(f"Job Description (first 200 chars): {job_description[:200]}...")
-            parsed_data = enhance_cv_for_job(parsed_data, job_description)
-        
-        # Save CV data to Google Sheets if configured
-        if GOOGLE_SHEETS_SPREADSHEET_ID:
-            try:
-                save_cv_to_sheets(parsed_data, GOOGLE_SHEETS_SPREADSHEET_ID)
-            except Exception as e:
-                print(f"⚠️ Failed to save CV data to Google Sheets: {e}")
-                # Continue with the process even if sheets save fails
-        
-        # Clean up uploaded file (with error handling)
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"✅ Cleaned up uploaded file: {file_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ Could not clean up uploaded file: {cleanup_error}")
-            # Don't let cleanup errors affect the main process
-        
-        # Generate unique session ID for this CV data
-        session_id = str(uuid.uuid4())
-        
-        # Save CV data to session storage (you could also use database)
-        cv_data = {
-            'parsed_data': parsed_data,
-            'mode': mode,
-            'job_description': job_description,
-            'original_filename': filename
-        }
-        
-        # Save to temporary storage (using file system for simplicity)
-        import json
-        session_file = os.path.join('temp_sessions', f'{session_id}.json')
-        os.makedirs('temp_sessions', exist_ok=True)
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(cv_data, f, ensure_ascii=False, indent=2)
-        
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'redirect_url': f'/preview-cv/{session_id}',
-            'extracted_text': extracted_text
-        })
+    parsed_data = parse_uploaded_cv(extracted_text, mode, job_description)
+    session_id = save_preview_session(parsed_data, mode, job_description, filename)
+    
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'redirect_url': f'/preview-cv/{session_id}',
+        'extracted_text': extracted_text
+    })
+
+# Runs the Gemini review of /api/analyze alongside the parse in the request thread.
+# Threads start on first use, so none exist yet when gunicorn forks its workers.
+analysis_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYSIS_WORKERS', 8)),
+    thread_name_prefix='analysis',
+)
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze_cv():
+    """
+    Upload a CV once and get both its parsed data and its review.
+    
+    Combines /api/upload and /api/review-cv: the text is extracted once and
+    the Gemini parse and review requests run concurrently, so the response
+    takes about as long as the slower of the two.
+    """
+    filename, extracted_text, error = read_uploaded_cv()
+    if error:
+        return error
+    
+    mode = request.form.get('mode', 'professional')
+    job_description = request.form.get('job_description', '')
+    
+    if 'session_id' not in session:
+        session['session_id'] = str(uuid.uuid4())
+    session_id = session['session_id']
     
-    return jsonify({'error': 'Invalid file type. Please upload PDF or DOCX files only.'}), 400
+    # The review only needs the extracted text, so it does not wait for the parse
+    review_future = analysis_pool.submit(review_cv_with_gemini, extracted_text)
+    parsed_data = parse_uploaded_cv(extracted_text, mode, job_description)
+    preview_session_id = save_preview_session(parsed_data, mode, job_description, filename)
+    review_data = review_future.result()
+    
+    # Store review data and CV text for improved resume generation
+    stored_review_data.set(session_id, review_data)
+    stored_cv_text.set(session_id, extracted_text)
+    print(f"📝 Analyzed CV for session: {session_id} (preview session {preview_session_id})")
+    
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'review_data': review_data,
+        'redirect_url': f'/review/{session_id}',
+        'preview_session_id': preview_session_id,
+        'preview_url': f'/preview-cv/{preview_session_id}',
+        'parsed_data': parsed_data,
+        'extracted_text': extracted_text
+    })
+
+@app.route('/api/batch', methods=['POST'])
+def batch_convert():
+    """
+    Start converting a zip of PDF/DOCX CVs in the background.
+    
+    Every CV is parsed, saved like any other CV and rendered. The response
+    (202) carries the batch id with its status and download URLs; the
+    download is a zip with a .tex and .pdf per CV and manifest.json with
+    each file's status. Form fields: file (the zip), style and pdf=0 to
+    skip compiling.
+    """
+    file = request.files.get('file')
+    if not file or not file.filename.lower().endswith('.zip'):
+        return jsonify({'error': 'Please upload a .zip of PDF or DOCX files'}), 400
+    
+    style = request.form.get('style') or DEFAULT_RESUME_STYLE
+    if style not in RESUME_STYLES:
+        return jsonify({'error': f'Unknown resume style: {style}'}), 400
+    
+    try:
+        file.stream.seek(0)
+        documents, skipped = read_zip(file.stream, max_files=BATCH_MAX_FILES)
+    except zipfile.BadZipFile:
+        return jsonify({'error': 'The uploaded file is not a valid zip archive'}), 400
+    if not documents:
+        return jsonify({'error': 'The zip contains no PDF or DOCX files', 'skipped': skipped}), 400
+    
+    print(f"📦 Batch upload {secure_filename(file.filename)}: {len(documents)} CVs, {len(skipped)} skipped")
+    batch_id = batch_jobs.submit(documents, style, compile_pdf=request.form.get('pdf') != '0', skipped=skipped)
+    return jsonify({
+        'batch_id': batch_id,
+        'status': 'running',
+        'total': len(documents),
+        'skipped': len(skipped),
+        'status_url': f'/api/batch/{batch_id}',
+        'download_url': f'/api/batch/{batch_id}/download',
+    }), 202
+
+@app.route('/api/batch/<batch_id>')
+def batch_status(batch_id):
+    """Progress of a batch: status (running, done or failed) and per-status counts"""
+    job = batch_jobs.get(batch_id)
+    if job is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    job.pop('owner_pid')
+    job['download_url'] = f'/api/batch/{batch_id}/download' if job['status'] == 'done' else None
+    return jsonify(job)
+
+@app.route('/api/batch/<batch_id>/download')
+def batch_download(batch_id):
+    job = batch_jobs.get(batch_id)
+    if job is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'error': f"Batch is {job['status']}", 'status': job['status']}), 409
+    zip_path = os.path.join(app.config['OUTPUT_FOLDER'], job['zip_filename'])
+    if not os.path.exists(zip_path):
+        return jsonify({'error': 'Batch results have expired'}), 410
+    return send_file(zip_path, as_attachment=True, download_name='batch_results.zip')
 
 @app.route('/download/<filename>')
 def download_file(filename):
@@ -1428,6 +1221,37 @@ def preview_pdf(filename):
 def result_page():
     return render_template('result.html')
 
+@app.route('/processing')
+def processing_page():
+    return render_template('processing.html')
+
+@app.route('/api/compile-jobs/<job_id>', methods=['GET'])
+def compile_job_status(job_id):
+    """Report the state of a background PDF compile job"""
+    job = compile_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Compile job not found'}), 404
+    
+    response_data = {
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'pdf_filename': job['pdf_filename'],
+        'attempts': job['attempts'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
+    if 'queue_position' in job:
+        response_data['queue_position'] = job['queue_position']
+    if job['status'] == 'done':
+        response_data.update({
+            'pdf_download_url': f"/download/{job['pdf_filename']}",
+            'pdf_preview_url': f"/preview/{job['pdf_filename']}"
+        })
+    return jsonify(response_data)
+
 @app.route('/preview-cv/<session_id>')
 def preview_cv_page(session_id):
     """Display extracted/enhanced CV data for preview and editing"""
@@ -1465,6 +1289,10 @@ def create_cv():
         if not data.get('name') or not data.get('email'):
             return jsonify({'success': False, 'error': 'Name and email are required fields'})
         
+        style = data.get('style') or DEFAULT_RESUME_STYLE
+        if style not in RESUME_STYLES:
+            return jsonify({'success': False, 'error': f'Unknown resume style: {style}'})
+        
         # Process the data to match our existing structure
         parsed_data = {
             'name': data.get('name', ''),
@@ -1551,7 +1379,7 @@ def create_cv():
                     })
         
         # Generate LaTeX
-        latex_content = generate_latex_resume(parsed_data)
+        latex_content = generate_latex_resume(parsed_data, style)
         
         # Save LaTeX file
         timestamp = int(time.time())
@@ -1565,25 +1393,25 @@ def create_cv():
         print("=== GENERATED LATEX CONTENT (first 500 chars) ===")
         print(latex_content[:500] + "..." if len(latex_content) > 500 else latex_content)
         
-        # Compile to PDF
+        # Queue the PDF compile; the client polls compile_status_url for the result
         pdf_filename = f"cv_{timestamp}.pdf"
-        pdf_compiled = compile_latex_to_pdf(latex_content, pdf_filename)
+        compile_state = queue_pdf_compile(latex_content, pdf_filename)
         
         response_data = {
             'success': True,
             'latex_content': latex_content,
             'latex_download_url': f'/download/{latex_filename}',
-            'pdf_compiled': pdf_compiled,
-            'latex_available': True
+            'latex_file': latex_filename,
+            'pdf_file': pdf_filename,
+            'latex_available': True,
+            **compile_state
         }
         
-        if pdf_compiled:
+        if compile_state['pdf_compiled']:
             response_data.update({
                 'pdf_download_url': f'/download/{pdf_filename}',
                 'pdf_preview_url': f'/preview/{pdf_filename}'
             })
-        else:
-            response_data['warning'] = 'PDF compilation failed via latexonline.cc. LaTeX source is still available for download.'
         
         return jsonify(response_data)
         
@@ -1617,10 +1445,39 @@ def manage_cvs_page():
 
 @app.route('/api/cvs', methods=['GET'])
 def list_cvs():
-    """API endpoint to list all saved CVs"""
+    """
+    API endpoint to list saved CVs one page at a time.
+    
+    Query parameters: limit (default 50, max 200), cursor (next_cursor from
+    the previous page), sort (updated_at, created_at, name or email), order
+    (asc or desc), name and email (case-insensitive prefix filters).
+    """
     try:
-        cv_list = list_cv_data()
-        return jsonify({'success': True, 'cvs': cv_list})
+        sort = request.args.get('sort', 'updated_at')
+        if sort not in CV_SORT_KEYS:
+            return jsonify({'success': False, 'error': f'sort must be one of: {", ".join(CV_SORT_KEYS)}'}), 400
+        # Dates default to newest first, names and emails to A-Z
+        order = request.args.get('order', 'desc' if sort.endswith('_at') else 'asc')
+        if order not in ('asc', 'desc'):
+            return jsonify({'success': False, 'error': 'order must be asc or desc'}), 400
+        limit = max(1, min(request.args.get('limit', CV_PAGE_SIZE, type=int), CV_MAX_PAGE_SIZE))
+        
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor, sort, order == 'desc') if cursor else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        cv_list, next_cursor = list_cv_data(limit=limit, sort=sort, descending=order == 'desc', after=after,
+                                            name_prefix=request.args.get('name', '').strip(),
+                                            email_prefix=request.args.get('email', '').strip())
+        
+        return jsonify({
+            'success': True,
+            'cvs': cv_list,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -1645,6 +1502,25 @@ def get_cv_data(cv_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/resume-styles', methods=['GET'])
+def list_resume_styles():
+    """Resume styles that create/update/generate requests can pass as `style`"""
+    return jsonify({'styles': list(RESUME_STYLES), 'default': DEFAULT_RESUME_STYLE})
+
+@app.route('/api/cv/<cv_id>/latex', methods=['GET'])
+def stream_cv_latex(cv_id):
+    """Stream freshly generated LaTeX for a saved CV, section by section"""
+    style = request.args.get('style', DEFAULT_RESUME_STYLE)
+    if style not in RESUME_STYLES:
+        return jsonify({'success': False, 'error': f'Unknown resume style: {style}'}), 400
+    
+    cv_data = load_cv_data(cv_id)
+    if not cv_data:
+        return jsonify({'success': False, 'error': 'CV not found'}), 404
+    
+    return Response(iter_latex_resume(cv_data.get('data', {}), style), mimetype='application/x-tex',
+                    headers={'Content-Disposition': f'attachment; filename=resume_{cv_id}.tex'})
+
 @app.route('/api/cv/<cv_id>', methods=['PUT'])
 def update_cv(cv_id):
     """API endpoint to update an existing CV"""
@@ -1658,6 +1534,10 @@ def update_cv(cv_id):
         if not data.get('name') or not data.get('email'):
             return jsonify({'success': False, 'error': 'Name and email are required fields'})
         
+        style = data.get('style') or DEFAULT_RESUME_STYLE
+        if style not in RESUME_STYLES:
+            return jsonify({'success': False, 'error': f'Unknown resume style: {style}'})
+        
         # Process the data same as create_cv
         parsed_data = {
             'name': data.get('name', ''),
@@ -1743,7 +1623,7 @@ def update_cv(cv_id):
             return jsonify({'success': False, 'error': 'Failed to update CV data'})
         
         # Generate new LaTeX content
-        latex_content = generate_latex_resume(parsed_data)
+        latex_content = generate_latex_resume(parsed_data, style)
         
         # Update files
         latex_filename = f"resume_{cv_id}.tex"
@@ -1754,22 +1634,18 @@ def update_cv(cv_id):
         with open(latex_path, 'w', encoding='utf-8') as f:
             f.write(latex_content)
         
-        # Compile to PDF
-        pdf_success = compile_latex_to_pdf(latex_content, pdf_filename)
+        # Queue the PDF compile; the client polls compile_status_url for the result
+        compile_state = queue_pdf_compile(latex_content, pdf_filename)
         
         response_data = {
             'success': True,
             'cv_id': cv_id,
             'latex_file': latex_filename,
-            'latex_available': True
+            'pdf_file': pdf_filename,
+            'latex_available': True,
+            **compile_state
         }
         
-        if pdf_success:
-            response_data['pdf_file'] = pdf_filename
-        else:
-            response_data['pdf_file'] = None
-            response_data['warning'] = 'PDF compilation failed. LaTeX source is still available.'
-        
         return jsonify(response_data)
         
     except Exception as e:
@@ -1812,7 +1688,7 @@ def debug_system():
             'current_dir': os.getcwd(),
             'output_folder': app.config.get('OUTPUT_FOLDER', 'Not set'),
             'upload_folder': app.config.get('UPLOAD_FOLDER', 'Not set'),
-            'latex_compilation': 'latexonline.cc'
+            'latex_compilation': compile_backend.name
         }
         
         # Check if directories exist
@@ -1823,11 +1699,21 @@ def debug_system():
         
         # LaTeX compilation info
         debug_info['latex'] = {
-            'compilation_method': 'latexonline.cc',
+            'compilation_method': compile_backend.name,
+            'backend': compile_backend.describe(),
             'local_installation_required': False,
             'pdf_generation_available': True
         }
         
+        debug_info['compile_jobs'] = compile_jobs.stats()
+        debug_info['pdf_extraction'] = pdf_extractor.stats()
+        debug_info['latex_fragment_cache'] = dict(latex_fragment_stats, entries=len(_latex_fragments), max_entries=LATEX_FRAGMENT_CACHE_SIZE)
+        debug_info['batch'] = dict(batch_converter.stats(), jobs=batch_jobs.stats())
+        debug_info['janitor'] = {key: value for key, value in janitor.stats().items() if key != 'last_sweep'}
+        debug_info['session_store'] = {'backend': SESSION_STORE_BACKEND, 'ttl_seconds': SESSION_TTL,
+                                       'max_entries': SESSION_MAX_ENTRIES, 'max_bytes': SESSION_MAX_BYTES}
+        debug_info['resume_styles'] = {'styles': list(RESUME_STYLES), 'auto_reload': LATEX_TEMPLATES_AUTO_RELOAD}
+        
         # List files in output directory
         try:
             output_dir = app.config.get('OUTPUT_FOLDER', '')
@@ -1850,6 +1736,69 @@ def debug_system():
     except Exception as e:
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
 
+@app.route('/debug/pdf-cache')
+def debug_pdf_cache():
+    """Report PDF compile cache hit/miss counters and disk usage"""
+    try:
+        return jsonify(pdf_cache.stats())
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/parse-cache')
+def debug_parse_cache():
+    """Report Gemini parse cache hit/miss counters and size, and how much of each CV hybrid parsing sent to Gemini"""
+    try:
+        with _hybrid_parse_stats_lock:
+            hybrid = dict(hybrid_parse_stats)
+        return jsonify(dict(parse_cache.stats(), hybrid=hybrid, hybrid_enabled=HYBRID_PARSE,
+                            hybrid_min_confidence=HYBRID_PARSE_MIN_CONFIDENCE))
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/session-store')
+def debug_session_store():
+    """Report session store hit/miss/eviction counters and memory use per namespace"""
+    try:
+        return jsonify({store.namespace: store.stats() for store in SESSION_STORES})
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/janitor')
+def debug_janitor():
+    """Report expired-file sweeps and directory sizes; ?sweep=1 runs a sweep now"""
+    try:
+        if request.args.get('sweep'):
+            janitor.sweep()
+        return jsonify(janitor.stats())
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/sheets-outbox')
+def debug_sheets_outbox():
+    """Report queued, sent and failed Google Sheets exports; ?flush=1 sends due entries now"""
+    try:
+        if request.args.get('flush'):
+            sheets_outbox.flush()
+        return jsonify(sheets_outbox.stats())
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/google-credentials')
+def debug_google_credentials():
+    """Report the Google token source, expiry, refresh latency and refresh failures"""
+    try:
+        return jsonify(google_credentials.stats())
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
+@app.route('/debug/http-client')
+def debug_http_client():
+    """Report outbound HTTP pool utilization and per-host latency histograms"""
+    try:
+        return jsonify(http_client.stats())
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()})
+
 @app.route('/debug/test-latex')
 def debug_test_latex():
     """Test LaTeX compilation with a simple document"""
@@ -1898,7 +1847,8 @@ def debug_test_latex_comprehensive():
         debug_info = {
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'compilation': {
-                'method': 'latexonline.cc',
+                'method': compile_backend.name,
+                'backend': compile_backend.describe(),
                 'local_installation_required': False,
                 'pdf_generation_available': True,
             },
@@ -1910,8 +1860,8 @@ def debug_test_latex_comprehensive():
                 'home': os.getenv('HOME', 'unknown'),
             },
             'latex': {
-                'compilation_method': 'latexonline.cc',
-                'online_service': True,
+                'compilation_method': compile_backend.name,
+                'online_service': compile_backend.name == 'online',
                 'local_installation': 'not required',
             },
             'directories': {
@@ -1950,10 +1900,11 @@ def debug_latex_warning():
     try:
         info = {
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-            'compilation_method': 'latexonline.cc',
+            'compilation_method': compile_backend.name,
             'latex_available': True,
             'local_installation_required': False,
-            'status': 'PDF generation available via latexonline.cc'
+            'backend': compile_backend.describe(),
+            'status': 'PDF generation available via ' + ('latexonline.cc' if compile_backend.name == 'online' else f'local {compile_backend.engine}')
         }
         
         return jsonify(info)
@@ -2010,6 +1961,10 @@ def generate_from_preview():
         if not session_id or not updated_cv_data:
             return jsonify({'error': 'Missing session ID or CV data'}), 400
         
+        style = data.get('style') or DEFAULT_RESUME_STYLE
+        if style not in RESUME_STYLES:
+            return jsonify({'error': f'Unknown resume style: {style}'}), 400
+        
         # Load original session data for metadata
         import json
         import os
@@ -2025,7 +1980,7 @@ def generate_from_preview():
         original_filename = original_data.get('original_filename', 'resume')
         
         # Generate LaTeX
-        latex_content = generate_latex_resume(updated_cv_data)
+        latex_content = generate_latex_resume(updated_cv_data, style)
         
         # Save LaTeX file
         base_filename = original_filename.rsplit('.', 1)[0] if '.' in original_filename else original_filename
@@ -2040,9 +1995,9 @@ def generate_from_preview():
         print("=== GENERATED LATEX CONTENT (first 500 chars) ===")
         print(latex_content[:500] + "..." if len(latex_content) > 500 else latex_content)
         
-        # Compile to PDF
+        # Queue the PDF compile; the client polls compile_status_url for the result
         pdf_filename = f"{base_filename}{mode_suffix}_resume.pdf"
-        pdf_compiled = compile_latex_to_pdf(latex_content, pdf_filename)
+        compile_state = queue_pdf_compile(latex_content, pdf_filename)
         
         # Clean up session file
         try:
@@ -2058,19 +2013,17 @@ def generate_from_preview():
             'mode': mode,
             'latex_content': latex_content,
             'latex_download_url': f'/download/{latex_filename}',
-            'pdf_compiled': pdf_compiled,
             'latex_available': True,
             'latex_filename': latex_filename,
-            'pdf_filename': pdf_filename if pdf_compiled else None
+            'pdf_filename': pdf_filename,
+            **compile_state
         }
         
-        if pdf_compiled:
+        if compile_state['pdf_compiled']:
             response_data.update({
                 'pdf_download_url': f'/download/{pdf_filename}',
                 'pdf_preview_url': f'/preview/{pdf_filename}'
             })
-        else:
-            response_data['warning'] = 'PDF compilation failed via latexonline.cc. LaTeX source is still available for download.'
         
         return jsonify(response_data)
         
@@ -2091,9 +2044,10 @@ def generate_job_desc():
     cache_key = hashlib.md5(role.lower().encode()).hexdigest()
     
     # Check if we have cached JD for this role
-    if cache_key in jd_cache:
+    cached_desc = jd_cache.get(cache_key)
+    if cached_desc is not None:
         print(f"🎯 Using cached job description for role: {role}")
-        return jsonify({'description': jd_cache[cache_key]})
+        return jsonify({'description': cached_desc})
     
     print(f"🔄 Generating new job description for role: {role}")
     
@@ -2110,13 +2064,13 @@ Write a professional job description for the role of '{role}'. The description s
         ]
     }
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = http_client.post(url, headers=headers, json=payload, timeout=GEMINI_TIMEOUT)
         if response.status_code == 200:
             result = response.json()
             desc = result['candidates'][0]['content']['parts'][0]['text']
             
             # Cache the result
-            jd_cache[cache_key] = desc
+            jd_cache.set(cache_key, desc)
             print(f"💾 Cached job description for role: {role}")
             
             return jsonify({'description': desc})
@@ -2143,8 +2097,8 @@ def review_cv():
     review_data = review_cv_with_gemini(cv_text)
     
     # Store review data and CV text for improved resume generation
-    stored_review_data[session_id] = review_data
-    stored_cv_text[session_id] = cv_text
+    stored_review_data.set(session_id, review_data)
+    stored_cv_text.set(session_id, cv_text)
     
     print(f"📝 Stored review data for session: {session_id}")
     print(f"🔗 Redirect URL: /review/{session_id}")
@@ -2152,6 +2106,7 @@ def review_cv():
     # Return success with redirect URL
     return jsonify({
         'success': True,
+        'session_id': session_id,
         'review_data': review_data,
         'redirect_url': f'/review/{session_id}'
     })
@@ -2210,7 +2165,7 @@ Return only the JSON object, no additional text or formatting:
     }
     
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = http_client.post(url, headers=headers, json=data, timeout=30)
         if response.status_code == 200:
             result = response.json()
             generated_text = result['candidates'][0]['content']['parts'][0]['text'].strip()
@@ -2278,10 +2233,257 @@ Return only the JSON object, no additional text or formatting:
         "rating": 68
     }
 
-# Global storage for session data (in production, use Redis or database)
-stored_review_data = {}
-stored_cv_text = {}
-jd_cache = {}  # Cache for job descriptions
+# Per-session review state. The SQLite backend is shared by all gunicorn workers,
+# so /review/<session_id> works whichever worker answers; 'memory' keeps it per process.
+SESSION_STORE_BACKEND = os.getenv('SESSION_STORE_BACKEND', 'sqlite')
+SESSION_STORE_DB = os.getenv('SESSION_STORE_DB', os.path.join(STATE_FOLDER, 'session_store.sqlite3'))
+SESSION_TTL = int(os.getenv('SESSION_TTL', 24 * 3600))
+SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', 10000))
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', 64 * 1024 * 1024))
+
+def _session_store(namespace, ttl=SESSION_TTL):
+    return create_session_store(SESSION_STORE_BACKEND, namespace, db_path=SESSION_STORE_DB, ttl=ttl,
+                                max_entries=SESSION_MAX_ENTRIES, max_bytes=SESSION_MAX_BYTES)
+
+stored_review_data = _session_store('review_data')
+stored_cv_text = _session_store('cv_text')
+stored_improved_data = _session_store('improved_data')
+jd_cache = _session_store('job_descriptions', ttl=int(os.getenv('JD_CACHE_TTL', 7 * 24 * 3600)))
+SESSION_STORES = (stored_review_data, stored_cv_text, stored_improved_data, jd_cache)
+
+# Jake's Resume source Gemini rewrites CVs into
+IMPROVEMENT_TEMPLATE_PATH = '1.tex'
+
+def build_improvement_prompt(cv_text, review_data, template_content):
+    """Build the Gemini prompt that rewrites a CV into the 1.tex template"""
+    suggestions_text = '\n'.join([f"- {suggestion}" for suggestion in review_data.get('suggestions', [])])
+    weaknesses_text = '\n'.join([f"- {weakness}" for weakness in review_data.get('weaknesses', [])])
+    
+    return f"""
+You are an expert resume writer. I need you to create an improved LaTeX resume based on the following:
+
+ORIGINAL CV TEXT:
+{cv_text}
+
+REVIEW SUGGESTIONS:
+{suggestions_text}
+
+WEAKNESSES TO ADDRESS:
+{weaknesses_text}
+
+LATEX TEMPLATE TO FOLLOW:
+{template_content}
+
+INSTRUCTIONS:
+1. Use the provided LaTeX template structure and formatting
+2. Improve the CV content based on the suggestions and weaknesses identified
+3. DO NOT make up fake information - only enhance and reorganize existing content
+4. Improve wording, structure, and presentation while keeping all information truthful
+5. Follow the exact LaTeX structure from the template
+6. Return ONLY the complete LaTeX code, no explanations
+
+Generate the improved LaTeX resume:
+"""
+
+def stream_gemini_text(prompt):
+    """
+    Stream text from Gemini's streamGenerateContent endpoint as it is generated.
+    
+    GEMINI_TIMEOUT applies between chunks rather than to the whole response,
+    so long documents are not cut off as long as Gemini keeps producing output.
+    """
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    payload = {
+        "contents": [
+            {"parts": [{"text": prompt}]}
+        ]
+    }
+    
+    response = http_client.post(url, headers={'Content-Type': 'application/json'}, json=payload,
+                                stream=True, timeout=GEMINI_TIMEOUT)
+    try:
+        if response.status_code != 200:
+            print(f"❌ Gemini API error: {response.status_code} - {response.text}")
+            raise RuntimeError(f'Gemini API error: {response.status_code}')
+        
+        # text/event-stream carries no charset, so requests would otherwise assume latin-1
+        response.encoding = 'utf-8'
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            event = json.loads(line[len('data:'):].strip())
+            for candidate in event.get('candidates', []):
+                for part in candidate.get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+    finally:
+        response.close()
+
+def iter_streamed_latex(chunks):
+    """
+    Turn streamed Gemini text into clean LaTeX pieces.
+    
+    Drops a leading markdown code fence and stops right after \\end{document},
+    so trailing fences or commentary never reach the .tex file.
+    """
+    end_marker = r'\end{document}'
+    # Hold back enough characters to spot the end marker across chunk boundaries
+    keep = len(end_marker) - 1
+    head = ''
+    tail = ''
+    started = False
+    
+    for chunk in chunks:
+        if not started:
+            head += chunk
+            stripped = head.lstrip()
+            if not stripped or '```'.startswith(stripped):
+                continue
+            if stripped.startswith('```'):
+                if '\n' not in stripped:
+                    continue
+                stripped = stripped.split('\n', 1)[1]
+            started = True
+            chunk = stripped
+        
+        text = tail + chunk
+        index = text.find(end_marker)
+        if index != -1:
+            yield text[:index + len(end_marker)] + '\n'
+            return
+        if len(text) > keep:
+            yield text[:-keep]
+            tail = text[-keep:]
+        else:
+            tail = text
+    
+    # Stream ended without \end{document}; flush what is left minus any closing fence
+    rest = tail.rstrip()
+    if rest.endswith('```'):
+        rest = rest[:-3].rstrip()
+    if rest:
+        yield rest
+
+def score_resume_with_gemini(latex_content):
+    """Rate a resume 0-100 with Gemini, returning None if the score could not be obtained"""
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+    score_prompt = f"""
+Rate this improved resume on a scale of 0-100 based on professional standards, clarity, and impact.
+Consider: formatting, content quality, relevance, and overall presentation.
+Return only the numeric score (e.g., 85).
+
+Resume content:
+{latex_content}
+"""
+    
+    score_payload = {
+        "contents": [
+            {"parts": [{"text": score_prompt}]}
+        ]
+    }
+    
+    try:
+        score_response = http_client.post(url, headers={'Content-Type': 'application/json'}, json=score_payload, timeout=30)
+        if score_response.status_code != 200:
+            print(f"❌ Gemini score API error: {score_response.status_code}")
+            return None
+        score_result = score_response.json()
+        score_text = score_result['candidates'][0]['content']['parts'][0]['text'].strip()
+        return max(0, min(100, int(''.join(filter(str.isdigit, score_text)))))
+    except Exception as e:
+        print(f"❌ Error scoring resume: {e}")
+        return None
+
+def _finish_improved_branch(session_id, future, pending_key, to_fields):
+    """Merge a pipeline branch that finished after the response into the stored preview data"""
+    try:
+        result = future.result() if future.exception() is None else None
+        fields = dict(to_fields(result), **{pending_key: False})
+        if not stored_improved_data.update(session_id, fields):
+            print(f"⚠️ Preview data for session {session_id} expired before its late {pending_key.replace('_pending', '')} result")
+            return
+        print(f"✅ Late {pending_key.replace('_pending', '')} result stored for session {session_id}")
+    except Exception as e:
+        print(f"❌ Error storing late result for session {session_id}: {e}")
+
+def finish_improved_resume(session_id, review_data, improved_latex, deadline):
+    """
+    Compile and score the improved LaTeX concurrently, store the preview data
+    and return the response fields.
+    
+    Branches still running at `deadline` are reported as pending and fill in
+    the stored preview data when they finish.
+    """
+    latex_filename = f"improved_resume_{session_id}.tex"
+    pdf_filename = f"improved_resume_{session_id}.pdf"
+    
+    # Compile and score concurrently; neither depends on the other
+    print("🔨 Compiling LaTeX to PDF and 📊 calculating improved score in parallel...")
+    compile_future = improve_pipeline_pool.submit(compile_latex_to_pdf, improved_latex, pdf_filename)
+    score_future = improve_pipeline_pool.submit(score_resume_with_gemini, improved_latex)
+    
+    remaining = max(0, deadline - time.time())
+    concurrent.futures.wait([compile_future, score_future], timeout=remaining)
+    
+    pdf_pending = not compile_future.done()
+    score_pending = not score_future.done()
+    pdf_compiled = False
+    if not pdf_pending and compile_future.exception() is None:
+        pdf_compiled = bool(compile_future.result())
+    new_score = None
+    if not score_pending and score_future.exception() is None:
+        new_score = score_future.result()
+    if new_score is None:
+        new_score = 85  # Default score
+    
+    if pdf_pending:
+        print("⏱️ PDF compilation still running at the deadline, returning without it")
+    elif pdf_compiled:
+        print("✅ PDF compilation successful")
+    else:
+        print("⚠️ PDF compilation failed, but LaTeX is available")
+    
+    if score_pending:
+        print("⏱️ Score still pending at the deadline, using default score")
+    print(f"📈 New score calculated: {new_score}")
+    
+    # Store improved resume data
+    improved_data = {
+        'latex_content': improved_latex,
+        'latex_filename': latex_filename,
+        'pdf_filename': pdf_filename if pdf_compiled else None,
+        'pdf_compiled': pdf_compiled,
+        'original_score': review_data.get('rating', 0),
+        'new_score': new_score,
+        'improvements': review_data.get('suggestions', [])[:5],  # Top 5 improvements
+        'session_id': session_id,
+        'pdf_pending': pdf_pending,
+        'score_pending': score_pending
+    }
+    
+    # Store for the preview page
+    stored_improved_data.set(session_id, improved_data)
+    
+    if pdf_pending:
+        compile_future.add_done_callback(
+            lambda f: _finish_improved_branch(session_id, f, 'pdf_pending',
+                                              lambda ok: {'pdf_compiled': bool(ok), 'pdf_filename': pdf_filename if ok else None}))
+    if score_pending:
+        score_future.add_done_callback(
+            lambda f: _finish_improved_branch(session_id, f, 'score_pending',
+                                              lambda score: {'new_score': score} if score is not None else {}))
+    
+    return {
+        'success': True,
+        'session_id': session_id,
+        'latex_filename': latex_filename,
+        'pdf_filename': pdf_filename if pdf_compiled else None,
+        'pdf_compiled': pdf_compiled,
+        'pdf_pending': pdf_pending,
+        'original_score': review_data.get('rating', 0),
+        'new_score': new_score,
+        'score_pending': score_pending
+    }
 
 @app.route('/api/generate-improved-resume', methods=['POST'])
 def generate_improved_resume():
@@ -2307,44 +2509,15 @@ def generate_improved_resume():
             }), 400
         
         print(f"🔄 Generating improved resume for session: {session_id}")
+        deadline = time.time() + IMPROVE_RESUME_DEADLINE
         
-        # Read the 1.tex template
-        template_path = '1.tex'
-        if not os.path.exists(template_path):
+        # The 1.tex template, read once and kept in memory
+        template_content = latex_templates.static_source(IMPROVEMENT_TEMPLATE_PATH)
+        if template_content is None:
             return jsonify({'error': '1.tex template file not found'}), 500
         
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        
         # Create improvement prompt for Gemini
-        suggestions_text = '\n'.join([f"- {suggestion}" for suggestion in review_data.get('suggestions', [])])
-        weaknesses_text = '\n'.join([f"- {weakness}" for weakness in review_data.get('weaknesses', [])])
-        
-        prompt = f"""
-You are an expert resume writer. I need you to create an improved LaTeX resume based on the following:
-
-ORIGINAL CV TEXT:
-{cv_text}
-
-REVIEW SUGGESTIONS:
-{suggestions_text}
-
-WEAKNESSES TO ADDRESS:
-{weaknesses_text}
-
-LATEX TEMPLATE TO FOLLOW:
-{template_content}
-
-INSTRUCTIONS:
-1. Use the provided LaTeX template structure and formatting
-2. Improve the CV content based on the suggestions and weaknesses identified
-3. DO NOT make up fake information - only enhance and reorganize existing content
-4. Improve wording, structure, and presentation while keeping all information truthful
-5. Follow the exact LaTeX structure from the template
-6. Return ONLY the complete LaTeX code, no explanations
-
-Generate the improved LaTeX resume:
-"""
+        prompt = build_improvement_prompt(cv_text, review_data, template_content)
 
         # Call Gemini API
         url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
@@ -2356,7 +2529,8 @@ Generate the improved LaTeX resume:
         }
         
         print("🤖 Calling Gemini API for improved resume generation...")
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+        response = http_client.post(url, headers=headers, json=payload,
+                                    timeout=max(1, min(GEMINI_TIMEOUT, deadline - time.time())))
         
         if response.status_code != 200:
             print(f"❌ Gemini API error: {response.status_code} - {response.text}")
@@ -2373,98 +2547,99 @@ Generate the improved LaTeX resume:
         
         print("✅ Improved LaTeX generated successfully")
         
-        # Generate unique filename using session_id
-        latex_filename = f"improved_resume_{session_id}.tex"
-        pdf_filename = f"improved_resume_{session_id}.pdf"
-        
         # Save LaTeX file
-        latex_path = os.path.join(app.config['OUTPUT_FOLDER'], latex_filename)
+        latex_path = os.path.join(app.config['OUTPUT_FOLDER'], f"improved_resume_{session_id}.tex")
         with open(latex_path, 'w', encoding='utf-8') as f:
             f.write(improved_latex)
         
         print(f"💾 Saved improved LaTeX to: {latex_path}")
         
-        # Compile to PDF
-        print("🔨 Compiling LaTeX to PDF...")
-        pdf_compiled = compile_latex_to_pdf(improved_latex, pdf_filename)
-        
-        if pdf_compiled:
-            print("✅ PDF compilation successful")
-        else:
-            print("⚠️ PDF compilation failed, but LaTeX is available")
-        
-        # Calculate new score using Gemini
-        print("📊 Calculating improved score...")
-        score_prompt = f"""
-Rate this improved resume on a scale of 0-100 based on professional standards, clarity, and impact.
-Consider: formatting, content quality, relevance, and overall presentation.
-Return only the numeric score (e.g., 85).
-
-Resume content:
-{improved_latex}
-"""
-        
-        score_payload = {
-            "contents": [
-                {"parts": [{"text": score_prompt}]}
-            ]
-        }
-        
-        score_response = requests.post(url, headers=headers, json=score_payload, timeout=30)
-        new_score = 85  # Default score
-        
-        if score_response.status_code == 200:
-            try:
-                score_result = score_response.json()
-                score_text = score_result['candidates'][0]['content']['parts'][0]['text'].strip()
-                new_score = int(''.join(filter(str.isdigit, score_text)))
-                if new_score > 100:
-                    new_score = 100
-                elif new_score < 0:
-                    new_score = 0
-            except:
-                new_score = 85
-        
-        print(f"📈 New score calculated: {new_score}")
-        
-        # Store improved resume data
-        improved_data = {
-            'latex_content': improved_latex,
-            'latex_filename': latex_filename,
-            'pdf_filename': pdf_filename if pdf_compiled else None,
-            'pdf_compiled': pdf_compiled,
-            'original_score': review_data.get('rating', 0),
-            'new_score': new_score,
-            'improvements': review_data.get('suggestions', [])[:5],  # Top 5 improvements
-            'session_id': session_id
-        }
-        
-        # Store in session for the preview page
-        stored_improved_data = getattr(app, '_stored_improved_data', {})
-        stored_improved_data[session_id] = improved_data
-        app._stored_improved_data = stored_improved_data
-        
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'latex_filename': latex_filename,
-            'pdf_filename': pdf_filename if pdf_compiled else None,
-            'pdf_compiled': pdf_compiled,
-            'original_score': review_data.get('rating', 0),
-            'new_score': new_score
-        })
+        return jsonify(finish_improved_resume(session_id, review_data, improved_latex, deadline))
         
     except Exception as e:
         print(f"❌ Error in generate_improved_resume: {str(e)}")
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/generate-improved-resume/stream')
+def generate_improved_resume_stream():
+    """
+    Streaming variant of generate_improved_resume for EventSource clients.
+    
+    Emits `chunk` events with LaTeX as Gemini writes it (also appended to the
+    .tex in output/), `compiling` as soon as \\end{document} arrives, then
+    `done` with the same fields as the JSON endpoint, or `failed` on error.
+    """
+    session_id = session.get('session_id')
+    review_data = stored_review_data.get(session_id) if session_id else None
+    cv_text = stored_cv_text.get(session_id) if session_id else None
+    
+    def events():
+        if not review_data or not cv_text:
+            yield _sse('failed', {
+                'error': 'No review data found. Please upload and review a CV first.',
+                'redirect': '/upload'
+            })
+            return
+        
+        template_content = latex_templates.static_source(IMPROVEMENT_TEMPLATE_PATH)
+        if template_content is None:
+            yield _sse('failed', {'error': '1.tex template file not found'})
+            return
+        
+        print(f"🔄 Streaming improved resume for session: {session_id}")
+        prompt = build_improvement_prompt(cv_text, review_data, template_content)
+        latex_path = os.path.join(app.config['OUTPUT_FOLDER'], f"improved_resume_{session_id}.tex")
+        
+        gemini_chunks = stream_gemini_text(prompt)
+        try:
+            parts = []
+            with open(latex_path, 'w', encoding='utf-8') as f:
+                for piece in iter_streamed_latex(gemini_chunks):
+                    parts.append(piece)
+                    f.write(piece)
+                    f.flush()
+                    yield _sse('chunk', {'text': piece})
+            improved_latex = ''.join(parts)
+            print(f"💾 Streamed improved LaTeX to: {latex_path}")
+            
+            yield _sse('compiling', {'latex_filename': os.path.basename(latex_path)})
+            result = finish_improved_resume(session_id, review_data, improved_latex,
+                                            time.time() + IMPROVE_RESUME_DEADLINE)
+            yield _sse('done', result)
+        except Exception as e:
+            print(f"❌ Error in generate_improved_resume_stream: {str(e)}")
+            traceback.print_exc()
+            yield _sse('failed', {'error': str(e)})
+        finally:
+            gemini_chunks.close()
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/improved-resume-preview/<session_id>')
 def improved_resume_preview(session_id):
     """Show the improved resume preview page"""
     try:
-        # Try to get data from app storage first
-        stored_improved_data = getattr(app, '_stored_improved_data', {})
+        # Streaming mode: render an empty preview that fills in from the SSE endpoint
+        review_data = stored_review_data.get(session_id) if request.args.get('stream') else None
+        if review_data and session.get('session_id') == session_id:
+            return render_template('improved_resume_preview.html',
+                                   session_id=session_id,
+                                   streaming=True,
+                                   latex_content='',
+                                   latex_filename=f"improved_resume_{session_id}.tex",
+                                   pdf_filename=None,
+                                   pdf_available=False,
+                                   original_score=review_data.get('rating', 0),
+                                   new_score='…',
+                                   improvements=review_data.get('suggestions', [])[:5])
+        
+        # Try to get data from the session store first
         improved_data = stored_improved_data.get(session_id)
         
         if not improved_data:
@@ -2610,8 +2785,8 @@ def debug_test_improved_resume():
         """
         
         # Store test data
-        stored_review_data[test_session_id] = test_review_data
-        stored_cv_text[test_session_id] = test_cv_text
+        stored_review_data.set(test_session_id, test_review_data)
+        stored_cv_text.set(test_session_id, test_cv_text)
         
         return f"""
         <html>
@@ -0,0 +1,455 @@
+"""
+Bulk CV conversion: a zip or directory of PDF/DOCX CVs in, a zip of LaTeX
+and PDF resumes plus a manifest.json out.
+
+Every CV goes through extract -> parse -> render -> save -> compile. Each
+stage has its own bounded pool: text extraction in processes (it is CPU
+bound), the Gemini parse in `gemini_workers` threads (the cap that keeps a
+batch under the Gemini rate limit) and compiles in `compile_workers`
+threads, so a slow stage never starves the others.
+
+Usage: python -m batch CV_FOLDER [--out results.zip] [--gemini-workers N] [--compile-workers N] [--no-pdf]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+import zipfile
+
+from compile_jobs import _pid_alive
+from db import connect
+from text_extraction import PDFTextExtractor, extract_docx_text
+
+
+BATCH_EXTENSIONS = ('.pdf', '.docx')
+
+
+def extract_document(filename, data, max_pages=30, max_chars=100000):
+    """Text of one uploaded CV; runs in the batch extraction process pool"""
+    if filename.lower().endswith('.pdf'):
+        return PDFTextExtractor(workers=1, max_pages=max_pages, max_chars=max_chars).extract(data)
+    return extract_docx_text(data)
+
+
+def _stem(filename):
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', stem).strip('._') or 'cv'
+
+
+def read_zip(source, max_files=500, max_file_bytes=16 * 1024 * 1024):
+    """
+    Read the CVs in a zip archive (a path, bytes or binary file).
+
+    Returns:
+        tuple: ([(filename, bytes)], [manifest entries for skipped members])
+    """
+    documents = []
+    skipped = []
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    with zipfile.ZipFile(stream) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                continue
+            if not name.lower().endswith(BATCH_EXTENSIONS):
+                skipped.append({'file': name, 'status': 'skipped', 'error': 'Not a PDF or DOCX file'})
+            elif len(documents) >= max_files:
+                skipped.append({'file': name, 'status': 'skipped', 'error': f'Batch limit of {max_files} files reached'})
+            elif info.file_size > max_file_bytes:
+                skipped.append({'file': name, 'status': 'skipped', 'error': 'File too large'})
+            else:
+                # The declared size can lie, so never decompress more than the cap
+                with archive.open(info) as member:
+                    data = member.read(max_file_bytes + 1)
+                if len(data) > max_file_bytes:
+                    skipped.append({'file': name, 'status': 'skipped', 'error': 'File too large'})
+                else:
+                    documents.append((name, data))
+    return documents, skipped
+
+
+def read_directory(folder, max_files=None):
+    """(filename, bytes) for every PDF/DOCX directly inside `folder`, in name order"""
+    documents = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path) and name.lower().endswith(BATCH_EXTENSIONS):
+            with open(path, 'rb') as f:
+                documents.append((name, f.read()))
+            if max_files and len(documents) >= max_files:
+                break
+    return documents
+
+
+class _ZipStream:
+    """Write-only file object collecting what zipfile writes so it can be streamed out"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class BatchConverter:
+    """
+    Converts many CVs concurrently with the app's own parse, render, save and compile functions.
+
+    `parse_fn(text)` returns parsed CV data, `render_fn(parsed_data, style)`
+    its LaTeX, `save_fn(cv_id, parsed_data, metadata)` persists it and
+    `compile_fn(latex, pdf_filename)` compiles into `output_folder`. Results
+    are written there as resume_<cv_id>.tex/.pdf, like every saved CV. If no
+    document finishes for `result_timeout` seconds, the ones still
+    outstanding are reported as failed instead of waiting forever.
+    """
+
+    def __init__(self, parse_fn, render_fn, save_fn, compile_fn, output_folder,
+                 extract_workers=2, gemini_workers=4, compile_workers=2, max_pages=30, max_chars=100000,
+                 result_timeout=600):
+        self.parse_fn = parse_fn
+        self.render_fn = render_fn
+        self.save_fn = save_fn
+        self.compile_fn = compile_fn
+        self.output_folder = output_folder
+        self.extract_workers = extract_workers
+        self.gemini_workers = gemini_workers
+        self.compile_workers = compile_workers
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.result_timeout = result_timeout
+
+        # Threads start on first use, so none exist yet when gunicorn forks its workers
+        self._gemini_pool = concurrent.futures.ThreadPoolExecutor(max_workers=gemini_workers, thread_name_prefix='batch-gemini')
+        self._compile_pool = concurrent.futures.ThreadPoolExecutor(max_workers=compile_workers, thread_name_prefix='batch-compile')
+        self._extract_pool = None
+        self._extract_pool_pid = None
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'documents': 0, 'ok': 0, 'no_pdf': 0, 'failed': 0, 'seconds': 0.0}
+
+    def _get_extract_pool(self):
+        # Same lazy per-process pool as PDFTextExtractor: the forkserver only imports the extraction code
+        with self._lock:
+            if self._extract_pool is None or self._extract_pool_pid != os.getpid():
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload(['text_extraction'])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._extract_pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.extract_workers, mp_context=context)
+                self._extract_pool_pid = os.getpid()
+            return self._extract_pool
+
+    def close(self, pool=None):
+        """Shut down this process's extraction pool, or only `pool` if it is still current (a new one starts on demand)"""
+        with self._lock:
+            if pool is not None and pool is not self._extract_pool:
+                return
+            if self._extract_pool is not None and self._extract_pool_pid == os.getpid():
+                self._extract_pool.shutdown(wait=False, cancel_futures=True)
+            self._extract_pool = None
+
+    def _process(self, filename, data, text, style, compile_pdf, cancelled, done):
+        """Parse, render and save one CV (in the Gemini pool), then hand it to the compile pool"""
+        result = {'file': filename, 'status': 'failed', 'stage': 'extract', 'error': None}
+        try:
+            if cancelled.is_set():
+                result['error'] = 'Batch cancelled'
+                return done(result)
+            if text is None:
+                # The extraction pool could not run it; extract in this thread instead
+                text = extract_document(filename, data, self.max_pages, self.max_chars)
+            if not text.strip():
+                result['error'] = 'Could not extract text'
+                return done(result)
+
+            result['stage'] = 'parse'
+            parsed_data = self.parse_fn(text)
+            result['stage'] = 'render'
+            latex_content = self.render_fn(parsed_data, style)
+
+            result['stage'] = 'save'
+            cv_id = str(uuid.uuid4())
+            metadata = {'source': 'batch', 'original_filename': filename, 'style': style}
+            if not self.save_fn(cv_id, parsed_data, metadata):
+                result['error'] = 'Could not save CV data'
+                return done(result)
+            latex_filename = f"resume_{cv_id}.tex"
+            with open(os.path.join(self.output_folder, latex_filename), 'w', encoding='utf-8') as f:
+                f.write(latex_content)
+            result.update(cv_id=cv_id, name=parsed_data.get('name') or '', latex_filename=latex_filename,
+                          pdf_filename=None, status='no_pdf', stage='compile' if compile_pdf else 'done')
+        except Exception as e:
+            result['error'] = str(e)
+            return done(result)
+
+        if not compile_pdf:
+            return done(result)
+        self._compile_pool.submit(self._compile, result, latex_content, cancelled, done)
+
+    def _compile(self, result, latex_content, cancelled, done):
+        try:
+            pdf_filename = f"resume_{result['cv_id']}.pdf"
+            if cancelled.is_set():
+                result['error'] = 'Batch cancelled'
+            elif self.compile_fn(latex_content, pdf_filename):
+                result.update(status='ok', stage='done', pdf_filename=pdf_filename)
+            else:
+                result['error'] = 'PDF compilation failed'
+        except Exception as e:
+            result['error'] = str(e)
+        done(result)
+
+    def convert(self, documents, style, compile_pdf=True):
+        """
+        Run every (filename, bytes) document through the pipeline.
+
+        Yields one manifest entry per document as it finishes (not in input
+        order); `seconds` is the time since the batch started. Closing the
+        generator early cancels the work that has not started yet.
+        """
+        started = time.monotonic()
+        finished = queue.Queue()
+        cancelled = threading.Event()
+        counts = {'ok': 0, 'no_pdf': 0, 'failed': 0}
+        outstanding = collections.Counter(filename for filename, _ in documents)
+
+        def done(result):
+            result['seconds'] = round(time.monotonic() - started, 3)
+            finished.put(result)
+
+        def process(filename, data, text):
+            self._gemini_pool.submit(self._process, filename, data, text, style, compile_pdf, cancelled, done)
+
+        def extracted(filename, data, pool, future):
+            try:
+                text = future.result()
+            except concurrent.futures.process.BrokenProcessPool as e:
+                print(f"❌ Batch extraction worker died, extracting {filename} in-thread: {e}")
+                self.close(pool)
+                text = None
+            except concurrent.futures.CancelledError:
+                return done({'file': filename, 'status': 'failed', 'stage': 'extract', 'error': 'Batch cancelled'})
+            except Exception as e:
+                return done({'file': filename, 'status': 'failed', 'stage': 'extract', 'error': str(e)})
+            process(filename, data, text)
+
+        try:
+            for filename, data in documents:
+                pool = self._get_extract_pool()
+                try:
+                    future = pool.submit(extract_document, filename, data, self.max_pages, self.max_chars)
+                except concurrent.futures.process.BrokenProcessPool:
+                    self.close(pool)
+                    process(filename, data, None)
+                    continue
+                future.add_done_callback(lambda f, filename=filename, data=data, pool=pool: extracted(filename, data, pool, f))
+
+            for _ in range(len(documents)):
+                try:
+                    result = finished.get(timeout=self.result_timeout)
+                except queue.Empty:
+                    break
+                outstanding[result['file']] -= 1
+                counts[result['status']] += 1
+                yield result
+
+            # A stage that hangs (or a lost completion) must not hold the batch open forever
+            for filename in outstanding.elements():
+                counts['failed'] += 1
+                yield {'file': filename, 'status': 'failed', 'stage': 'timeout',
+                       'error': f'No result within {self.result_timeout}s',
+                       'seconds': round(time.monotonic() - started, 3)}
+        finally:
+            cancelled.set()
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._stats['batches'] += 1
+                self._stats['documents'] += len(documents)
+                self._stats['seconds'] += elapsed
+                for status, count in counts.items():
+                    self._stats[status] += count
+            print(f"📦 Batch of {len(documents)} CVs: {counts['ok']} ok, {counts['no_pdf']} without PDF, "
+                  f"{counts['failed']} failed in {elapsed:.1f}s")
+
+    def stream_zip(self, documents, style, compile_pdf=True, skipped=(), on_result=None):
+        """
+        Convert `documents` and yield a zip of the results as they finish.
+
+        Each CV adds <name>.tex and <name>.pdf; manifest.json, written last,
+        lists every input file with its status ('ok', 'no_pdf', 'failed' or
+        'skipped'), the failing stage and error, and the saved cv_id.
+        `on_result(entry)` is called as each document finishes.
+        """
+        out = _ZipStream()
+        manifest = list(skipped)
+        used_names = set()
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for result in self.convert(documents, style, compile_pdf):
+                if result.get('latex_filename'):
+                    name = _stem(result['file'])
+                    while name in used_names:
+                        name += '_'
+                    used_names.add(name)
+                    for key, extension, member_key in (('latex_filename', '.tex', 'tex_file'), ('pdf_filename', '.pdf', 'pdf_file')):
+                        if result.get(key):
+                            archive.write(os.path.join(self.output_folder, result[key]), name + extension)
+                            result[member_key] = name + extension
+                manifest.append(result)
+                if on_result:
+                    on_result(result)
+                yield out.take()
+            archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+        yield out.take()
+
+    def stats(self):
+        with self._lock:
+            minutes = self._stats['seconds'] / 60
+            return dict(self._stats, seconds=round(self._stats['seconds'], 3),
+                        cvs_per_minute=round(self._stats['documents'] / minutes, 1) if minutes else 0.0,
+                        extract_workers=self.extract_workers, gemini_workers=self.gemini_workers,
+                        compile_workers=self.compile_workers)
+
+
+class BatchJobs:
+    """
+    Runs uploaded batches in the background and keeps their progress in SQLite.
+
+    A batch is converted by a thread of the process that received the upload
+    and its zip is written to output_folder/batch_<id>.zip, so the request
+    returns at once and no gunicorn worker is held for the whole cohort.
+    Any process can report a batch's progress and serve the finished zip; a
+    batch whose process died is reported as failed.
+    """
+
+    def __init__(self, db_path, converter):
+        self.db_path = db_path
+        self.converter = converter
+        connect(self.db_path).execute("""
+            CREATE TABLE IF NOT EXISTS batch_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                owner_pid INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                ok INTEGER NOT NULL DEFAULT 0,
+                no_pdf INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                zip_filename TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+
+    def submit(self, documents, style, compile_pdf=True, skipped=()):
+        """Start converting `documents` in the background; returns the batch id"""
+        job_id = uuid.uuid4().hex
+        connect(self.db_path).execute(
+            'INSERT INTO batch_jobs (id, status, owner_pid, total, skipped, zip_filename, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (job_id, 'running', os.getpid(), len(documents), len(skipped), f'batch_{job_id}.zip', time.time()),
+        )
+        threading.Thread(target=self._run, args=(job_id, documents, style, compile_pdf, list(skipped)),
+                         name=f'batch-{job_id[:8]}', daemon=True).start()
+        return job_id
+
+    def _run(self, job_id, documents, style, compile_pdf, skipped):
+        zip_path = os.path.join(self.converter.output_folder, f'batch_{job_id}.zip')
+        tmp_path = f'{zip_path}.tmp'
+
+        def on_result(result):
+            connect(self.db_path).execute(
+                f"UPDATE batch_jobs SET completed = completed + 1, {result['status']} = {result['status']} + 1 WHERE id = ?",
+                (job_id,),
+            )
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in self.converter.stream_zip(documents, style, compile_pdf, skipped, on_result=on_result):
+                    f.write(chunk)
+            os.replace(tmp_path, zip_path)
+            status, error = 'done', None
+        except Exception as e:
+            print(f"❌ Batch {job_id} failed: {e}")
+            status, error = 'failed', str(e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+        connect(self.db_path).execute(
+            'UPDATE batch_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+            (status, error, time.time(), job_id),
+        )
+
+    def get(self, job_id):
+        """Return the state of a batch, or None if it does not exist"""
+        conn = connect(self.db_path)
+        row = conn.execute('SELECT * FROM batch_jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job['status'] == 'running' and job['owner_pid'] != os.getpid() and not _pid_alive(job['owner_pid']):
+            job.update(status='failed', error='Batch worker stopped before finishing', finished_at=time.time())
+            conn.execute('UPDATE batch_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?',
+                         (job['status'], job['error'], job['finished_at'], job_id, 'running'))
+        return job
+
+    def stats(self):
+        rows = connect(self.db_path).execute('SELECT status, COUNT(*) AS count FROM batch_jobs GROUP BY status').fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a folder of PDF/DOCX CVs into LaTeX and PDF resumes')
+    parser.add_argument('folder', help='folder holding the CVs')
+    parser.add_argument('--out', default='batch_results.zip', help='zip to write the resumes and manifest.json to')
+    parser.add_argument('--style', default=None, help='resume style (default: the app default)')
+    parser.add_argument('--extract-workers', type=int, default=int(os.getenv('BATCH_EXTRACT_WORKERS', 2)))
+    parser.add_argument('--gemini-workers', type=int, default=int(os.getenv('BATCH_GEMINI_WORKERS', 4)))
+    parser.add_argument('--compile-workers', type=int, default=int(os.getenv('BATCH_COMPILE_WORKERS', 2)))
+    parser.add_argument('--no-pdf', action='store_true', help='only write LaTeX')
+    args = parser.parse_args()
+
+    # The app supplies the parse cache, templates, CV store and compile backend
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    style = args.style or app.DEFAULT_RESUME_STYLE
+    if style not in app.RESUME_STYLES:
+        parser.error(f"unknown style {style}; choose from {', '.join(app.RESUME_STYLES)}")
+
+    converter = BatchConverter(app.parse_cv_text, app.generate_latex_resume, app.save_cv_data, app.compile_latex_to_pdf,
+                               app.app.config['OUTPUT_FOLDER'], extract_workers=args.extract_workers,
+                               gemini_workers=args.gemini_workers, compile_workers=args.compile_workers)
+    documents = read_directory(args.folder)
+    print(f"📄 Converting {len(documents)} CVs from {args.folder}")
+    try:
+        with open(args.out, 'wb') as f:
+            for chunk in converter.stream_zip(documents, style, compile_pdf=not args.no_pdf):
+                f.write(chunk)
+    finally:
+        converter.close()
+
+    stats = converter.stats()
+    print(f"✅ Wrote {args.out}: {stats['ok']} ok, {stats['no_pdf']} without PDF, {stats['failed']} failed "
+          f"({stats['cvs_per_minute']} CVs/minute)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch conversion throughput against Gemini concurrency.
+
+Runs a cohort of generated PDF/DOCX CVs through BatchConverter with the
+real extraction and LaTeX templates, but with the Gemini parse and the PDF
+compile replaced by sleeps of the given latency, and reports CVs/minute for
+each --gemini-workers value. Throughput should grow with the worker count
+until the compile stage (or, in production, the Gemini rate limit) becomes
+the bottleneck.
+
+Usage: python benchmarks/bench_batch.py [--cvs 40] [--workers 1,2,4,8] [--parse-latency 2.0] [--compile-latency 0.5]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch import BatchConverter
+from resume_templates import LatexTemplates, DEFAULT_STYLE
+from test_text_extraction import cv_pages, make_docx, make_pdf
+
+
+def cohort(count):
+    documents = []
+    for index in range(count):
+        if index % 2:
+            documents.append((f'cv{index}.pdf', make_pdf(cv_pages(2))))
+        else:
+            documents.append((f'cv{index}.docx', make_docx([f'Candidate {index}'] + cv_pages(1)[0])))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cvs', type=int, default=40)
+    parser.add_argument('--workers', default='1,2,4,8', help='Gemini worker counts to compare')
+    parser.add_argument('--compile-workers', type=int, default=4)
+    parser.add_argument('--parse-latency', type=float, default=2.0, help='simulated Gemini parse seconds')
+    parser.add_argument('--compile-latency', type=float, default=0.5, help='simulated compile seconds')
+    args = parser.parse_args()
+
+    templates = LatexTemplates()
+
+    def parse(text):
+        time.sleep(args.parse_latency)
+        return {'name': text.split('\n')[0], 'summary': text[:300]}
+
+    def render(parsed_data, style):
+        return (templates.render(style, 'heading', heading=parsed_data)
+                + templates.render(style, 'summary', summary=parsed_data['summary']))
+
+    def compile_pdf(latex, pdf_filename):
+        time.sleep(args.compile_latency)
+        return True
+
+    documents = cohort(args.cvs)
+    print(f"📄 {len(documents)} CVs, parse {args.parse_latency}s, compile {args.compile_latency}s "
+          f"x {args.compile_workers} workers")
+    print(f"{'gemini workers':<16}{'seconds':>10}{'CVs/minute':>14}")
+    with tempfile.TemporaryDirectory() as output_folder:
+        for workers in (int(value) for value in args.workers.split(',')):
+            converter = BatchConverter(parse, render, lambda *_: True, compile_pdf, output_folder,
+                                       gemini_workers=workers, compile_workers=args.compile_workers)
+            try:
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = list(converter.convert(documents, DEFAULT_STYLE))
+                elapsed = time.perf_counter() - started
+            finally:
+                converter.close()
+            assert all(result['status'] == 'ok' for result in results), results
+            print(f"{workers:<16}{elapsed:>10.2f}{len(documents) / elapsed * 60:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
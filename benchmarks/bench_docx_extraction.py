@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark DOCX text extraction on generated CV fixtures.
+
+Builds DOCX files with python-docx (a header, N body paragraphs and a
+skills table of N/10 rows) and times the python-docx paragraph loop
+app.extract_text_from_docx used before against the streaming
+extract_docx_text, which also returns the header and table text.
+
+Usage: python benchmarks/bench_docx_extraction.py [--paragraphs 20,200,2000] [--repeat N]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx import Document
+
+from test_text_extraction import make_docx
+from text_extraction import extract_docx_text
+
+
+def legacy_extract(docx_bytes):
+    """The python-docx loop app.extract_text_from_docx used before"""
+    text = ""
+    doc = Document(io.BytesIO(docx_bytes))
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text
+
+
+def median_seconds(extract, docx_bytes, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extract(docx_bytes)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paragraphs', default='20,200,2000', help='comma separated body paragraph counts')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'paragraphs':>10}{'python-docx':>14}{'streaming':>14}{'speedup':>10}{'chars old/new':>18}")
+    for count in (int(size) for size in args.paragraphs.split(',')):
+        docx_bytes = make_docx(
+            [f'Led project {i}: migrated billing to Python & PostgreSQL, cutting costs by {i % 40}%.' for i in range(count)],
+            table_rows=[(f'Skill {i}', 'Python, SQL, Docker', f'{i % 9 + 1} years') for i in range(max(1, count // 10))],
+            header='Jane Doe | jane@example.com | +1 555 0100',
+        )
+        legacy = median_seconds(legacy_extract, docx_bytes, args.repeat)
+        streaming = median_seconds(extract_docx_text, docx_bytes, args.repeat)
+        chars = f'{len(legacy_extract(docx_bytes))}/{len(extract_docx_text(docx_bytes))}'
+        print(f"{count:>10}{legacy * 1000:>12.2f}ms{streaming * 1000:>12.2f}ms{legacy / streaming:>9.1f}x{chars:>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Measure how much of each CV hybrid parsing still sends to Gemini.
+
+The benchmarks/samples/ corpus of saved preview sessions holds Gemini
+parses, not the uploaded text, so each parse is first written back out as
+plain CV text (contact header, headed sections, "Category: a, b" skill
+lines). Every CV then goes through
+the local parser, and the report compares the full-schema prompt with the
+hybrid prompt (excerpt plus reduced schema). It also compares the JSON Gemini
+has to generate for all fields with the JSON for only the uncertain
+fields. Output tokens dominate Gemini latency. Fields kept locally are
+checked against Gemini's values so the savings are not bought with
+accuracy.
+
+Usage: python benchmarks/bench_hybrid_parse.py [--sessions benchmarks/samples] [--min-confidence 0.8] [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from local_parser import PARSE_FIELDS, parse_cv_locally
+
+HEADINGS = {'education': 'EDUCATION', 'experience': 'EXPERIENCE', 'projects': 'PROJECTS', 'skills': 'TECHNICAL SKILLS',
+            'certifications': 'CERTIFICATIONS', 'awards': 'AWARDS', 'languages': 'LANGUAGES'}
+
+
+def _lines(value):
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+def cv_text(parsed):
+    """Plain text of a CV laid out the way the parse describes it"""
+    lines = [parsed.get('name', '')]
+    lines.append(' | '.join(parsed[key] for key in ('email', 'phone', 'linkedin', 'github', 'website') if parsed.get(key)))
+    lines.append(parsed.get('address', ''))
+    for field, heading in HEADINGS.items():
+        value = parsed.get(field)
+        if not value:
+            continue
+        lines.append(heading)
+        if field == 'skills':
+            lines += [f"{category.title()}: {', '.join(items)}" for category, items in value.items() if items]
+        elif field in ('awards', 'languages'):
+            lines += [f'• {item}' for item in _lines(value)]
+        else:
+            for entry in value:
+                if not isinstance(entry, dict):
+                    lines.append(str(entry))
+                    continue
+                title_keys = ('title', 'name', 'degree')
+                lines.append(' - '.join(str(entry[key]) for key in title_keys + ('date',) if entry.get(key)))
+                lines += [str(entry[key]) for key in ('company', 'institution', 'issuer', 'location', 'gpa', 'technologies') if entry.get(key)]
+                lines += [f'• {item}' for item in _lines(entry.get('description') or entry.get('details'))]
+    for section in parsed.get('custom_sections') or []:
+        lines += [section.get('title', '').upper(), section.get('content', '')]
+    return '\n'.join(line for line in lines if line)
+
+
+def _normalize(value):
+    if not value:
+        return ''  # an empty list or null means the same as a missing field
+    if isinstance(value, dict):
+        # Skills are compared as one set of items, whatever category they landed in
+        return sorted(_normalize(item) for items in value.values() for item in _lines(items))
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return str(value).strip().lower().rstrip('/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    parser.add_argument('--min-confidence', type=float, default=app.HYBRID_PARSE_MIN_CONFIDENCE)
+    parser.add_argument('--repeat', type=int, default=20, help='local parses per CV for timing')
+    args = parser.parse_args()
+
+    corpus = [json.load(open(path))['parsed_data'] for path in sorted(glob.glob(os.path.join(args.sessions, '*.json')))]
+    totals = {'full_prompt': 0, 'hybrid_prompt': 0, 'full_output': 0, 'hybrid_output': 0, 'local_only': 0}
+    kept = {field: [0, 0] for field in PARSE_FIELDS}  # field -> [kept locally, agrees with Gemini]
+    parse_ms = []
+    for parsed in corpus:
+        text = cv_text(parsed)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            local = parse_cv_locally(text)
+        parse_ms.append((time.perf_counter() - started) * 1000 / args.repeat)
+
+        fields = local.uncertain_fields(args.min_confidence)
+        totals['full_prompt'] += len(app.build_parse_prompt(text))
+        totals['full_output'] += len(json.dumps(parsed))
+        if fields:
+            totals['hybrid_prompt'] += len(app.build_parse_prompt(local.excerpt(fields), fields))
+            totals['hybrid_output'] += len(json.dumps({field: parsed[field] for field in fields if field in parsed}))
+        else:
+            totals['local_only'] += 1
+        for field in PARSE_FIELDS:
+            if field not in fields and (field in local.data or field in parsed):
+                kept[field][0] += 1
+                kept[field][1] += _normalize(local.data.get(field, '')) == _normalize(parsed.get(field, ''))
+
+    print(f"📄 {len(corpus)} CVs from {args.sessions}, min confidence {args.min_confidence}")
+    print(f"{'':<22}{'full':>10}{'hybrid':>10}{'saved':>8}")
+    for label, key in (('prompt chars', 'prompt'), ('output JSON chars', 'output')):
+        full, hybrid = totals[f'full_{key}'], totals[f'hybrid_{key}']
+        print(f"{label:<22}{full:>10}{hybrid:>10}{(1 - hybrid / full) * 100:>7.1f}%")
+    print(f"CVs parsed with no Gemini call: {totals['local_only']}")
+    print(f"local parse: median {statistics.median(parse_ms):.3f} ms, max {max(parse_ms):.3f} ms per CV")
+    print(f"{'field kept locally':<22}{'CVs':>6}{'agree':>8}")
+    for field, (count, agree) in kept.items():
+        if count:
+            print(f"{field:<22}{count:>6}{agree:>8}")
+
+
+if __name__ == '__main__':
+    main()
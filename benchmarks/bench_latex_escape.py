@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the translate-table LaTeX escaper against the original replace chain.
+
+Builds a bullet corpus from every string in the benchmarks/samples/ sessions,
+repeated up to --bullets entries, escapes it with both implementations and
+checks that the outputs are identical.
+
+Usage: python benchmarks/bench_latex_escape.py [--bullets N] [--repeat N]
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latex_escape import clean_text_for_latex
+from test_latex_escape import legacy_clean_text_for_latex
+
+
+def collect_strings(value, out):
+    if isinstance(value, str):
+        if value.strip():
+            out.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            collect_strings(item, out)
+    return out
+
+
+def time_escaper(escape, corpus, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            escape(text)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bullets', type=int, default=100000, help='strings in the corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the corpus per escaper')
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    args = parser.parse_args()
+
+    samples = []
+    for path in sorted(glob.glob(os.path.join(args.sessions, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            collect_strings(json.load(f)['parsed_data'], samples)
+    corpus = (samples * (args.bullets // len(samples) + 1))[:args.bullets]
+    chars = sum(len(text) for text in corpus)
+    print(f"📄 {len(corpus)} strings ({chars / 1e6:.1f}M chars) from {len(samples)} unique samples")
+
+    mismatches = sum(clean_text_for_latex(text) != legacy_clean_text_for_latex(text) for text in samples)
+    if mismatches:
+        raise SystemExit(f'❌ {mismatches} samples escape differently')
+
+    legacy = time_escaper(legacy_clean_text_for_latex, corpus, args.repeat)
+    table = time_escaper(clean_text_for_latex, corpus, args.repeat)
+
+    print(f"{'escaper':<16}{'median':>10}{'per string':>14}")
+    for label, timings in (('replace chain', legacy), ('translate table', table)):
+        median = statistics.median(timings)
+        print(f"{label:<16}{median:>9.3f}s{median / len(corpus) * 1e6:>12.2f}us")
+    print(f"speedup (median): {statistics.median(legacy) / statistics.median(table):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
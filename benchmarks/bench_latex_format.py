@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark local pdflatex compiles with and without the precompiled resume format.
+
+Renders every sample session in benchmarks/samples/ with generate_latex_resume and
+compiles each document through LocalLatexBackend twice: once as a plain
+pdflatex run and once using the format dumped from the default style's preamble.
+
+Usage: python benchmarks/bench_latex_format.py [--repeat N] [--sessions DIR]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from latex_backends import LocalLatexBackend, find_local_engine
+
+
+def time_compiles(backend, documents, repeat):
+    timings = []
+    for latex_content in documents:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok = backend.compile(latex_content, 'bench.pdf')
+            if not ok:
+                raise SystemExit('❌ Compilation failed, check the LaTeX installation')
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='compiles per document and mode')
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    args = parser.parse_args()
+
+    engine, executable = find_local_engine('pdflatex')
+    if not executable:
+        raise SystemExit('pdflatex is not installed; this benchmark needs a local TeX distribution')
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(args.sessions, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(app.generate_latex_resume(json.load(f)['parsed_data']))
+    print(f"📄 {len(documents)} sample resumes, {args.repeat} compile(s) each per mode")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        backend = LocalLatexBackend(engine, executable, workdir, workers=1,
+                                    scratch_root=os.path.join(workdir, 'scratch'))
+        # Warm the TeX file caches first so neither mode pays for a cold start
+        time_compiles(backend, documents[:1], 1)
+        plain = time_compiles(backend, documents, args.repeat)
+
+        started = time.perf_counter()
+        if not backend.register_preamble(app.resume_preamble()):
+            raise SystemExit('❌ Could not dump the format (is mylatexformat installed?)')
+        dump_seconds = time.perf_counter() - started
+        with_format = time_compiles(backend, documents, args.repeat)
+
+    print(f"{'mode':<16}{'mean':>10}{'median':>10}{'p95':>10}")
+    for label, timings in (('full preamble', plain), ('precompiled fmt', with_format)):
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"{label:<16}{statistics.mean(timings):>9.3f}s{statistics.median(timings):>9.3f}s{p95:>9.3f}s")
+    print(f"one-off format dump: {dump_seconds:.3f}s")
+    print(f"speedup (median): {statistics.median(plain) / statistics.median(with_format):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark how generate_latex_resume scales with the number of CV entries.
+
+Takes the largest sample in benchmarks/samples/ and grows its experience,
+projects and a publications custom section to N entries each, rendering
+with an empty fragment cache. With chunk-list assembly the time per entry
+should stay flat as N grows into the thousands.
+
+Usage: python benchmarks/bench_latex_scaling.py [--sizes 10,100,1000,5000] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+
+def grow(parsed_data, entries):
+    """Copy of parsed_data with `entries` experience, project and publication entries"""
+    experience = parsed_data.get('experience') or [{'title': 'Engineer', 'company': 'Acme', 'description': ['Built things']}]
+    projects = parsed_data.get('projects') or [{'title': 'Project', 'description': 'Did things', 'technologies': 'Python'}]
+    grown = dict(parsed_data)
+    grown['experience'] = [dict(experience[i % len(experience)], title=f'Role {i}') for i in range(entries)]
+    grown['projects'] = [dict(projects[i % len(projects)], title=f'Project {i}') for i in range(entries)]
+    grown['custom_sections'] = [{
+        'title': 'Publications',
+        'content': '\n'.join(f'• Author A, Author B. Paper {i} on topic_{i} & more. Journal {i % 7}, 2020.' for i in range(entries)),
+    }]
+    return grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000,5000', help='comma separated entry counts')
+    parser.add_argument('--repeat', type=int, default=5, help='renders per size')
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    args = parser.parse_args()
+
+    samples = []
+    for path in glob.glob(os.path.join(args.sessions, '*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            samples.append(json.load(f)['parsed_data'])
+    base = max(samples, key=lambda data: len(json.dumps(data)))
+
+    print(f"{'entries':>8}{'median':>12}{'per entry':>14}{'output':>12}")
+    for entries in (int(size) for size in args.sizes.split(',')):
+        parsed_data = grow(base, entries)
+        timings = []
+        for _ in range(args.repeat):
+            app._latex_fragments.clear()
+            started = time.perf_counter()
+            latex_content = app.generate_latex_resume(parsed_data)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        print(f"{entries:>8}{median * 1e3:>10.2f}ms{median / entries * 1e6:>12.2f}us{len(latex_content) / 1024:>10.0f}KB")
+
+
+if __name__ == '__main__':
+    main()
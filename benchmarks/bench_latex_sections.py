@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_latex_resume for full renders vs. single-section edits.
+
+For every sample session in benchmarks/samples/ this times a cold render (empty
+fragment cache, every section rendered) and an edit render (one experience
+bullet changed on a warm cache, so only that section is re-rendered), which
+is what update_cv does when a user edits one entry in edit_cv.html.
+
+Usage: python benchmarks/bench_latex_sections.py [--repeat N] [--sessions DIR]
+"""
+
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+
+def edit_one_bullet(parsed_data, counter):
+    """Copy of parsed_data with a single experience bullet (or the summary) changed"""
+    edited = copy.deepcopy(parsed_data)
+    for exp in edited.get('experience') or []:
+        if exp.get('description'):
+            exp['description'][0] = f"{exp['description'][0]} (edit {counter})"
+            return edited
+    edited['summary'] = f"{edited.get('summary', '')} (edit {counter})"
+    return edited
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='renders per document and mode')
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    args = parser.parse_args()
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(args.sessions, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(json.load(f)['parsed_data'])
+    print(f"📄 {len(documents)} sample resumes, {args.repeat} render(s) each per mode")
+
+    full, edit = [], []
+    counter = 0
+    for parsed_data in documents:
+        for _ in range(args.repeat):
+            app._latex_fragments.clear()
+            started = time.perf_counter()
+            app.generate_latex_resume(parsed_data)
+            full.append(time.perf_counter() - started)
+
+        app.generate_latex_resume(parsed_data)
+        for _ in range(args.repeat):
+            counter += 1
+            # Copying the document is part of the request handling, not the render
+            edited = edit_one_bullet(parsed_data, counter)
+            started = time.perf_counter()
+            app.generate_latex_resume(edited)
+            edit.append(time.perf_counter() - started)
+
+    print(f"{'mode':<22}{'mean':>11}{'median':>11}{'p95':>11}")
+    for label, timings in (('full render', full), ('single-section edit', edit)):
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"{label:<22}{statistics.mean(timings) * 1e6:>9.1f}us"
+              f"{statistics.median(timings) * 1e6:>9.1f}us{p95 * 1e6:>9.1f}us")
+    print(f"speedup (median): {statistics.median(full) / statistics.median(edit):.2f}x")
+    print(f"fragment cache: {app.latex_fragment_stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark resume rendering with precompiled LaTeX templates.
+
+Renders every sample session in benchmarks/samples/ with an empty fragment
+cache, once through the shared LatexTemplates (templates compiled at
+startup) and once through a fresh environment per resume, which has to
+parse and compile every template again - the cost the compiled-template
+cache removes.
+
+Usage: python benchmarks/bench_latex_templates.py [--repeat N] [--style STYLE]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from resume_templates import LatexTemplates
+
+
+def time_renders(documents, repeat, style, fresh_templates):
+    timings = []
+    for _ in range(repeat):
+        for parsed_data in documents:
+            app._latex_fragments.clear()
+            started = time.perf_counter()
+            if fresh_templates:
+                app.latex_templates = LatexTemplates()
+            app.generate_latex_resume(parsed_data, style)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='renders per sample resume')
+    parser.add_argument('--style', default=app.DEFAULT_RESUME_STYLE, choices=app.RESUME_STYLES)
+    parser.add_argument('--sessions', default=os.path.join(ROOT, 'benchmarks', 'samples'))
+    args = parser.parse_args()
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(args.sessions, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(json.load(f)['parsed_data'])
+    print(f"📄 {len(documents)} sample resumes, {args.repeat} render(s) each, style {args.style}")
+
+    shared = app.latex_templates
+    compiled = time_renders(documents, args.repeat, args.style, fresh_templates=False)
+    recompiled = time_renders(documents, args.repeat, args.style, fresh_templates=True)
+    app.latex_templates = shared
+
+    print(f"{'mode':<20}{'mean':>12}{'median':>12}")
+    for label, timings in (('precompiled', compiled), ('compile per render', recompiled)):
+        print(f"{label:<20}{statistics.mean(timings) * 1e3:>10.3f}ms{statistics.median(timings) * 1e3:>10.3f}ms")
+    print(f"speedup (median): {statistics.median(recompiled) / statistics.median(compiled):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction on generated multi-page CV fixtures.
+
+Builds PDFs of increasing length (every fourth page with a broken font
+resource, so the pdfplumber fallback is exercised too) and times the old
+sequential pdfplumber loop against PDFTextExtractor in-thread and with its
+process pool. The pool only pays off with more than one CPU core.
+
+Usage: python benchmarks/bench_pdf_extraction.py [--pages 2,10,40,200] [--repeat N] [--workers N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pdfplumber
+
+from test_text_extraction import cv_pages, make_pdf
+from text_extraction import PDFTextExtractor
+
+
+def legacy_extract(pdf_bytes):
+    """The pdfplumber loop app.extract_text_from_pdf used before"""
+    text = ""
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def median_seconds(extract, pdf_bytes, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            extract(pdf_bytes)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', default='2,10,40,200', help='comma separated page counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    # No page cap here, so all modes extract the same pages
+    serial = PDFTextExtractor(workers=1, max_pages=10 ** 6, max_chars=10 ** 9)
+    parallel = PDFTextExtractor(workers=max(2, args.workers), max_pages=10 ** 6, max_chars=10 ** 9)
+    capped = PDFTextExtractor(workers=max(2, args.workers))
+    modes = (('pdfplumber loop', legacy_extract), ('fast path', serial.extract),
+             ('fast path + pool', parallel.extract), ('default caps', capped.extract))
+    try:
+        # Start the pools outside the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            parallel.extract(make_pdf(cv_pages(8)))
+            capped.extract(make_pdf(cv_pages(8)))
+
+        print(f"{'pages':>6}" + ''.join(f'{label:>20}' for label, _ in modes))
+        for page_count in (int(size) for size in args.pages.split(',')):
+            pdf_bytes = make_pdf(cv_pages(page_count), broken_pages=set(range(3, page_count, 4)))
+            timings = [median_seconds(extract, pdf_bytes, args.repeat) for _, extract in modes]
+            print(f"{page_count:>6}" + ''.join(f'{seconds * 1000:>18.1f}ms' for seconds in timings))
+    finally:
+        parallel.close()
+        capped.close()
+
+
+if __name__ == '__main__':
+    main()
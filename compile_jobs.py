@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from db import connect
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CompileJobQueue:
+    """
+    Background LaTeX -> PDF compile queue with job state persisted in SQLite.
+
+    Every process (gunicorn worker) runs its own worker threads, but jobs are
+    claimed from the shared database and the `concurrency` limit is enforced
+    across all processes. A running job's heartbeat is refreshed while it
+    compiles; jobs left 'running' by a recycled or crashed worker are requeued
+    once their owner is gone or their heartbeat goes stale. Worker threads
+    start on the first submit, status poll or stats call in each process, so
+    jobs queued before a restart are picked up without a new submit.
+    """
+
+    def __init__(self, db_path, compile_fn, concurrency=2, stale_after=300,
+                 max_attempts=3, poll_interval=1.0, retention=24 * 3600):
+        self.db_path = db_path
+        self.compile_fn = compile_fn
+        self.concurrency = concurrency
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention = retention
+
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._workers_pid = None
+        self._last_prune = 0
+        self._init_db()
+
+    def _init_db(self):
+        conn = connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS compile_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                latex_content TEXT NOT NULL,
+                pdf_filename TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner_pid INTEGER,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_compile_jobs_status ON compile_jobs (status, created_at)')
+
+    def submit(self, latex_content, pdf_filename):
+        """Queue a compile and return its job id"""
+        job_id = uuid.uuid4().hex
+        connect(self.db_path).execute(
+            'INSERT INTO compile_jobs (id, status, latex_content, pdf_filename, created_at) VALUES (?, ?, ?, ?, ?)',
+            (job_id, QUEUED, latex_content, pdf_filename, time.time()),
+        )
+        self._ensure_workers()
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return the public state of a job, or None if it does not exist"""
+        self._ensure_workers()
+        row = connect(self.db_path).execute(
+            'SELECT id, status, pdf_filename, attempts, error, created_at, started_at, finished_at '
+            'FROM compile_jobs WHERE id = ?',
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job['status'] == QUEUED:
+            job['queue_position'] = connect(self.db_path).execute(
+                'SELECT COUNT(*) FROM compile_jobs WHERE status = ? AND created_at < ?',
+                (QUEUED, job['created_at']),
+            ).fetchone()[0]
+        return job
+
+    def stats(self):
+        self._ensure_workers()
+        rows = connect(self.db_path).execute(
+            'SELECT status, COUNT(*) AS count FROM compile_jobs GROUP BY status'
+        ).fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({row['status']: row['count'] for row in rows})
+        return {'concurrency': self.concurrency, 'jobs': counts}
+
+    def start(self):
+        """Start this process's worker threads if they are not running yet"""
+        self._ensure_workers()
+
+    def _ensure_workers(self):
+        # Threads do not survive fork, so start them lazily in each process
+        if self._workers_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._workers_pid = os.getpid()
+            for index in range(self.concurrency):
+                threading.Thread(target=self._worker_loop, name=f'compile-job-{index}', daemon=True).start()
+
+    def _requeue_orphans(self, conn, now):
+        rows = conn.execute(
+            'SELECT id, owner_pid, heartbeat_at, attempts FROM compile_jobs WHERE status = ?', (RUNNING,)
+        ).fetchall()
+        for row in rows:
+            orphaned = row['owner_pid'] != os.getpid() and not _pid_alive(row['owner_pid'])
+            stale = now - (row['heartbeat_at'] or 0) > self.stale_after
+            if not (orphaned or stale):
+                continue
+            if row['attempts'] >= self.max_attempts:
+                conn.execute(
+                    'UPDATE compile_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                    (FAILED, 'Compile worker stopped before finishing', now, row['id']),
+                )
+            else:
+                conn.execute('UPDATE compile_jobs SET status = ?, owner_pid = NULL WHERE id = ?', (QUEUED, row['id']))
+
+    def _claim(self):
+        conn = connect(self.db_path)
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._requeue_orphans(conn, now)
+            running = conn.execute('SELECT COUNT(*) FROM compile_jobs WHERE status = ?', (RUNNING,)).fetchone()[0]
+            row = None
+            if running < self.concurrency:
+                row = conn.execute(
+                    'SELECT id, latex_content, pdf_filename, attempts + 1 AS attempt FROM compile_jobs WHERE status = ? ORDER BY created_at LIMIT 1',
+                    (QUEUED,),
+                ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE compile_jobs SET status = ?, owner_pid = ?, attempts = attempts + 1, '
+                    'started_at = ?, heartbeat_at = ? WHERE id = ?',
+                    (RUNNING, os.getpid(), now, now, row['id']),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return dict(row) if row is not None else None
+
+    def _finish(self, job, status, error=None):
+        # A run that was requeued meanwhile must not overwrite the newer attempt's status
+        connect(self.db_path).execute(
+            'UPDATE compile_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND attempts = ? AND status = ?',
+            (status, error, time.time(), job['id'], job['attempt'], RUNNING),
+        )
+
+    def _heartbeat(self, job, done):
+        """Keep a running job's heartbeat fresh until `done` is set"""
+        interval = max(0.05, self.stale_after / 3)
+        while not done.wait(interval):
+            try:
+                connect(self.db_path).execute(
+                    'UPDATE compile_jobs SET heartbeat_at = ? WHERE id = ? AND attempts = ? AND status = ?',
+                    (time.time(), job['id'], job['attempt'], RUNNING),
+                )
+            except Exception as e:
+                print(f"⚠️ Could not refresh heartbeat of compile job {job['id']}: {e}")
+
+    def _prune(self):
+        now = time.time()
+        if now - self._last_prune < 600:
+            return
+        self._last_prune = now
+        connect(self.db_path).execute(
+            'DELETE FROM compile_jobs WHERE status IN (?, ?) AND finished_at < ?',
+            (DONE, FAILED, now - self.retention),
+        )
+
+    def _worker_loop(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"❌ Error claiming compile job: {e}")
+                job = None
+
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                self._prune()
+                continue
+
+            print(f"🔨 Compile job {job['id']} started: {job['pdf_filename']}")
+            # Waiting for a backend slot plus a retry without the precompiled format can outlast stale_after
+            done = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(job, done), name=f"compile-heartbeat-{job['id'][:8]}", daemon=True).start()
+            try:
+                compiled = self.compile_fn(job['latex_content'], job['pdf_filename'])
+                if compiled:
+                    self._finish(job, DONE)
+                else:
+                    self._finish(job, FAILED, 'PDF compilation failed')
+                print(f"{'✅' if compiled else '❌'} Compile job {job['id']} finished")
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(job, FAILED, str(e))
+            finally:
+                done.set()
+            # Another job may be waiting for the slot we just freed
+            self._wake.set()
@@ -0,0 +1,202 @@
+import argparse
+import base64
+import json
+import os
+
+from db import connect
+
+
+# Columns /api/cvs can sort by; each has an index ending in id for keyset pagination
+SORT_KEYS = ('updated_at', 'created_at', 'name', 'email')
+
+# Sorts after every real character, so `col >= p AND col < p + PREFIX_END` matches prefix p
+PREFIX_END = '\U0010ffff'
+
+
+def encode_cursor(sort, descending, value, cv_id):
+    """Opaque page cursor pointing just past the row (value, cv_id)"""
+    raw = json.dumps([sort, descending, value, cv_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor, sort, descending):
+    """Return the (value, cv_id) position of a cursor; raises ValueError if it is invalid for this sort"""
+    try:
+        cursor_sort, cursor_descending, value, cv_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError('Cursor does not match the requested sort order')
+    return value, cv_id
+
+
+def _summary_fields(document):
+    data = document.get('data') or {}
+    return data.get('name') or '', data.get('email') or ''
+
+
+class CVStore:
+    """
+    Saved CVs in SQLite.
+
+    Each row keeps the full CV document (id, timestamps, metadata, data) as a
+    JSON blob, with name, email and updated_at copied into indexed columns so
+    listing and searching never have to decode the blobs.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cvs (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL COLLATE NOCASE,
+                email TEXT NOT NULL COLLATE NOCASE,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                document BLOB NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cvs_updated_at ON cvs (updated_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cvs_created_at ON cvs (created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cvs_name ON cvs (name, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cvs_email ON cvs (email, id)')
+        conn.execute('CREATE TABLE IF NOT EXISTS cv_store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _write(self, conn, document):
+        name, email = _summary_fields(document)
+        conn.execute(
+            'INSERT OR REPLACE INTO cvs (id, name, email, created_at, updated_at, document) VALUES (?, ?, ?, ?, ?, ?)',
+            (document['id'], name, email, document.get('created_at', ''), document.get('updated_at', ''),
+             json.dumps(document, ensure_ascii=False).encode('utf-8')),
+        )
+
+    def save(self, document):
+        """Insert or replace a full CV document"""
+        self._write(connect(self.db_path), document)
+
+    def load(self, cv_id):
+        row = connect(self.db_path).execute('SELECT document FROM cvs WHERE id = ?', (cv_id,)).fetchone()
+        return json.loads(row['document']) if row is not None else None
+
+    def update(self, cv_id, cv_data, updated_at):
+        """Replace the data of an existing CV; returns False if it does not exist"""
+        conn = connect(self.db_path)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT document FROM cvs WHERE id = ?', (cv_id,)).fetchone()
+            if row is not None:
+                document = json.loads(row['document'])
+                document['data'] = cv_data
+                document['updated_at'] = updated_at
+                self._write(conn, document)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row is not None
+
+    def delete(self, cv_id):
+        return connect(self.db_path).execute('DELETE FROM cvs WHERE id = ?', (cv_id,)).rowcount > 0
+
+    def list(self, limit=None, sort='updated_at', descending=True, after=None,
+             name_prefix=None, email_prefix=None):
+        """
+        Return CV summaries in `sort` order (ties broken by id).
+
+        Pagination is keyset based: pass the (value, id) of the last row of
+        the previous page as `after`, so every page is an index range scan no
+        matter how deep it is. Prefix filters are case-insensitive.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f'Unsupported sort key: {sort}')
+
+        clauses = []
+        params = []
+        for column, prefix in (('name', name_prefix), ('email', email_prefix)):
+            if prefix:
+                clauses.append(f'{column} >= ? AND {column} < ?')
+                params += [prefix, prefix + PREFIX_END]
+        if after is not None:
+            clauses.append(f"({sort}, id) {'<' if descending else '>'} (?, ?)")
+            params += list(after)
+
+        direction = 'DESC' if descending else 'ASC'
+        rows = connect(self.db_path).execute(
+            'SELECT id, name, email, created_at, updated_at FROM cvs '
+            + (f"WHERE {' AND '.join(clauses)} " if clauses else '')
+            + f'ORDER BY {sort} {direction}, id {direction} LIMIT ?',
+            params + [-1 if limit is None else limit],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return connect(self.db_path).execute('SELECT COUNT(*) FROM cvs').fetchone()[0]
+
+    def is_migrated(self):
+        return connect(self.db_path).execute(
+            "SELECT 1 FROM cv_store_meta WHERE key = 'json_migrated'"
+        ).fetchone() is not None
+
+    def migrate_folder(self, folder):
+        """
+        Import every <cv_id>.json document from `folder`.
+
+        CVs already in the store are left untouched, so the migration can be
+        re-run safely. The JSON files themselves are not modified.
+
+        Returns:
+            tuple: (migrated, skipped, failed) counts
+        """
+        migrated = skipped = failed = 0
+        conn = connect(self.db_path)
+        filenames = sorted(f for f in os.listdir(folder) if f.endswith('.json')) if os.path.isdir(folder) else []
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for filename in filenames:
+                try:
+                    with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                        document = json.load(f)
+                except Exception as e:
+                    print(f"❌ Skipping unreadable CV file {filename}: {e}")
+                    failed += 1
+                    continue
+
+                document.setdefault('id', filename[:-5])
+                if conn.execute('SELECT 1 FROM cvs WHERE id = ?', (document['id'],)).fetchone():
+                    skipped += 1
+                    continue
+                self._write(conn, document)
+                migrated += 1
+
+            conn.execute("INSERT OR REPLACE INTO cv_store_meta (key, value) VALUES ('json_migrated', ?)",
+                         (os.path.abspath(folder),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return migrated, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the SQLite CV store')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    migrate = subcommands.add_parser('migrate', help='Import cv_data/*.json files into the store')
+    migrate.add_argument('--folder', default='cv_data', help='folder holding the <cv_id>.json files')
+    migrate.add_argument('--db', default=os.getenv('CV_STORE_DB', os.path.join(os.getenv('STATE_FOLDER', 'state'), 'cv_store.sqlite3')),
+                         help='path of the SQLite store')
+    migrate.add_argument('--force', action='store_true',
+                         help='import again even though the store was already migrated (brings back files of CVs deleted since)')
+    args = parser.parse_args()
+
+    store = CVStore(args.db)
+    if store.is_migrated() and not args.force:
+        print(f"✅ {args.db} was already migrated; pass --force to import {args.folder} again")
+        return
+    migrated, skipped, failed = store.migrate_folder(args.folder)
+    print(f"✅ Migrated {migrated} CVs from {args.folder} ({skipped} already present, {failed} unreadable)")
+
+
+if __name__ == '__main__':
+    main()
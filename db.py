@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import threading
+
+_local = threading.local()
+
+
+def connect(path):
+    """
+    Return this thread's connection to the SQLite database at `path`.
+
+    Connections are cached per thread and per process (gunicorn forks after
+    import with --preload), use WAL so readers never block the writer, and
+    run in autocommit mode; use `BEGIN IMMEDIATE` for multi-statement writes.
+    """
+    path = os.path.abspath(path)
+    connections = getattr(_local, 'connections', None)
+    if connections is None or _local.pid != os.getpid():
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+
+    conn = connections.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        connections[path] = conn
+    return conn
@@ -0,0 +1,221 @@
+import argparse
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import http_client
+
+TOKEN_URI = 'https://oauth2.googleapis.com/token'
+
+
+class CredentialsUnavailable(Exception):
+    """No valid Google credentials are loaded (yet); callers should retry later"""
+
+
+def _default_request():
+    from google.auth.transport.requests import Request
+    # Refresh through the shared keep-alive pool
+    return Request(session=http_client.session_for(TOKEN_URI))
+
+
+class GoogleCredentials:
+    """
+    Non-interactive Google credentials kept fresh by a background thread.
+
+    Credentials come from a service-account JSON file when one is configured,
+    otherwise from a cached user token (token.pickle) created once with
+    `python -m google_credentials login`. A daemon thread, started lazily in
+    each process, loads them and refreshes the access token `refresh_margin`
+    seconds before it expires, so `get()` only hands out the current token:
+    it never refreshes, never opens a browser and raises
+    CredentialsUnavailable while no valid token exists. The margin has to
+    exceed google-auth's own refresh threshold (about four minutes), or
+    API clients will refresh inline before the thread gets to it. Failed
+    refreshes are retried with exponential backoff; a replaced token file is
+    picked up on the next check.
+    """
+
+    def __init__(self, scopes, service_account_file=None, token_file='token.pickle', refresh_margin=300,
+                 check_interval=300, retry_base=5, retry_max=300, request_factory=_default_request):
+        self.scopes = list(scopes)
+        self.service_account_file = service_account_file
+        self.token_file = token_file
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.request_factory = request_factory
+
+        self._creds = None
+        self._source = None
+        self._token_mtime = None
+        self._ready = threading.Event()
+        self._thread_pid = None
+        self._start_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {'refreshes': 0, 'refresh_failures': 0, 'consecutive_failures': 0, 'last_refresh_ms': None,
+                       'max_refresh_ms': 0, 'total_refresh_ms': 0, 'last_refresh_at': None, 'last_error': None}
+
+    def get(self, wait=0):
+        """
+        Current valid credentials; raises CredentialsUnavailable when there are none.
+
+        `wait` seconds may be spent waiting for the first load in this process,
+        for background callers that start right after a worker boots.
+        """
+        self._ensure_refresher()
+        if wait and not self._ready.is_set():
+            self._ready.wait(wait)
+        creds = self._creds
+        if creds is None or not creds.valid:
+            with self._lock:
+                error = self._stats['last_error']
+            raise CredentialsUnavailable(error or 'Google credentials are not loaded yet')
+        return creds
+
+    def _ensure_refresher(self):
+        # Threads do not survive fork, so start them lazily in each process
+        if self._thread_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._ready.clear()
+            threading.Thread(target=self._refresh_loop, name='google-credentials', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                delay = self.refresh_if_due()
+            except Exception as e:
+                print(f"❌ Google credentials check failed: {e}")
+                delay = self.retry_max
+            finally:
+                self._ready.set()
+            time.sleep(delay)
+
+    def _load(self):
+        if self.service_account_file:
+            from google.oauth2 import service_account
+            return service_account.Credentials.from_service_account_file(self.service_account_file, scopes=self.scopes), 'service_account'
+        if self.token_file and os.path.exists(self.token_file):
+            with open(self.token_file, 'rb') as token:
+                return pickle.load(token), 'user_token'
+        return None, None
+
+    def _token_file_changed(self):
+        if self._source == 'service_account' or not self.token_file:
+            return False
+        try:
+            return os.path.getmtime(self.token_file) != self._token_mtime
+        except OSError:
+            return False
+
+    def _save_token(self, creds):
+        tmp_path = f'{self.token_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as token:
+            pickle.dump(creds, token)
+        os.replace(tmp_path, self.token_file)
+        self._token_mtime = os.path.getmtime(self.token_file)
+
+    def _expires_in(self, creds):
+        if creds is None or creds.expiry is None:
+            return None
+        # google-auth keeps expiry as a naive UTC datetime
+        return (creds.expiry - datetime.utcnow()).total_seconds()
+
+    def refresh_if_due(self):
+        """Load and refresh the credentials if they are missing or close to expiry; returns seconds until the next check"""
+        with self._refresh_lock:
+            if self._creds is None or self._token_file_changed():
+                self._creds, self._source = self._load()
+                if self._source == 'user_token':
+                    self._token_mtime = os.path.getmtime(self.token_file)
+                if self._creds is None:
+                    self._record_failure('No Google credentials: set GOOGLE_SERVICE_ACCOUNT_FILE or run `python -m google_credentials login`')
+                    return self.check_interval
+
+            creds = self._creds
+            expires_in = self._expires_in(creds)
+            if creds.valid and (expires_in is None or expires_in > self.refresh_margin):
+                with self._lock:
+                    # e.g. a new token file replaced one that could not be refreshed
+                    self._stats['consecutive_failures'] = 0
+                    self._stats['last_error'] = None
+                return self.check_interval if expires_in is None else min(self.check_interval, expires_in - self.refresh_margin)
+            if self._source == 'user_token' and not creds.refresh_token:
+                self._record_failure('Cached user token has expired and has no refresh token; run `python -m google_credentials login`')
+                return self.check_interval
+
+            started = time.perf_counter()
+            try:
+                creds.refresh(self.request_factory())
+            except Exception as e:
+                failures = self._record_failure(f'Token refresh failed: {e}')
+                print(f"⚠️ Google token refresh failed (attempt {failures}): {e}")
+                return min(self.retry_max, self.retry_base * 2 ** (failures - 1))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if self._source == 'user_token':
+                self._save_token(creds)
+            with self._lock:
+                self._stats['refreshes'] += 1
+                self._stats['consecutive_failures'] = 0
+                self._stats['last_refresh_ms'] = round(elapsed_ms, 1)
+                self._stats['max_refresh_ms'] = round(max(self._stats['max_refresh_ms'], elapsed_ms), 1)
+                self._stats['total_refresh_ms'] += elapsed_ms
+                self._stats['last_refresh_at'] = time.time()
+                self._stats['last_error'] = None
+            expires_in = self._expires_in(creds)
+            return self.check_interval if expires_in is None else max(1, min(self.check_interval, expires_in - self.refresh_margin))
+
+    def _record_failure(self, error):
+        with self._lock:
+            self._stats['refresh_failures'] += 1
+            self._stats['consecutive_failures'] += 1
+            self._stats['last_error'] = error
+            return self._stats['consecutive_failures']
+
+    def stats(self):
+        creds = self._creds
+        expires_in = self._expires_in(creds)
+        with self._lock:
+            stats = dict(self._stats)
+        total_ms = stats.pop('total_refresh_ms')
+        last_refresh_at = stats.pop('last_refresh_at')
+        return dict(stats,
+                    source=self._source,
+                    valid=bool(creds is not None and creds.valid),
+                    expires_in_seconds=round(expires_in, 1) if expires_in is not None else None,
+                    last_refresh_age_seconds=round(time.time() - last_refresh_at, 1) if last_refresh_at else None,
+                    avg_refresh_ms=round(total_ms / stats['refreshes'], 1) if stats['refreshes'] else None,
+                    refresh_margin=self.refresh_margin)
+
+
+def login(client_secrets='credentials.json', token_file='token.pickle', scopes=('https://www.googleapis.com/auth/spreadsheets',)):
+    """Run the interactive OAuth browser flow once and cache the user token for the server"""
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(client_secrets, list(scopes))
+    creds = flow.run_local_server(port=0)
+    with open(token_file, 'wb') as token:
+        pickle.dump(creds, token)
+    print(f"✅ Saved Google user token to {token_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the Google credentials used for the Sheets export')
+    commands = parser.add_subparsers(dest='command', required=True)
+    login_parser = commands.add_parser('login', help='authorize a Google account in the browser and cache its token')
+    login_parser.add_argument('--client-secrets', default='credentials.json')
+    login_parser.add_argument('--token-file', default=os.getenv('GOOGLE_TOKEN_FILE', 'token.pickle'))
+    args = parser.parse_args()
+
+    if args.command == 'login':
+        login(args.client_secrets, args.token_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+
+class _HostStats:
+    def __init__(self, pool_maxsize):
+        self.pool_maxsize = pool_maxsize
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.status_codes = {}
+
+    def observe(self, seconds):
+        self.latency_sum += seconds
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_buckets[index] += 1
+                break
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'status_codes': dict(self.status_codes),
+            'pool': {
+                'maxsize': self.pool_maxsize,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'utilization': round(self.in_flight / self.pool_maxsize, 3),
+            },
+            'latency_seconds': {
+                'count': self.requests,
+                'sum': round(self.latency_sum, 3),
+                'avg': round(self.latency_sum / self.requests, 3) if self.requests else None,
+                'buckets': {
+                    ('+Inf' if bound == float('inf') else str(bound)): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets)
+                },
+            },
+        }
+
+
+class HTTPClient:
+    """
+    Shared outbound HTTP client.
+
+    Keeps one keep-alive requests.Session (with its own connection pool) per
+    host, applies a default timeout to every call, retries 429/5xx responses
+    and connection failures with exponential backoff (honouring Retry-After),
+    and records per-host pool utilization and latency histograms.
+    """
+
+    def __init__(self, pool_maxsize=10, max_retries=3, backoff_factor=0.5,
+                 timeout=30, max_backoff=30):
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        """Return the pooled session used for the host of `url`"""
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled in request() so they show up in the metrics
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize,
+                                      max_retries=0, pool_block=False)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+                self._stats[host] = _HostStats(self.pool_maxsize)
+            return session
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), self.max_backoff)
+        return min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+
+    def request(self, method, url, timeout=None, retry=True, **kwargs):
+        """
+        Send a request through the host's pooled session.
+
+        Args:
+            timeout: per-call timeout in seconds (defaults to the client timeout)
+            retry (bool): retry 429/5xx responses and connection errors
+
+        Returns:
+            requests.Response: the final response (possibly still a 429/5xx)
+        """
+        session = self.session_for(url)
+        host = urlparse(url).netloc
+        stats = self._stats[host]
+        attempts = 1 + (self.max_retries if retry else 0)
+
+        for attempt in range(attempts):
+            with self._lock:
+                stats.requests += 1
+                stats.in_flight += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+                if attempt:
+                    stats.retries += 1
+
+            started = time.time()
+            response = None
+            try:
+                response = session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.exceptions.ConnectionError:
+                # Covers connect timeouts too; read timeouts are not retried
+                with self._lock:
+                    stats.errors += 1
+                if attempt == attempts - 1:
+                    raise
+            except requests.exceptions.RequestException:
+                with self._lock:
+                    stats.errors += 1
+                raise
+            finally:
+                with self._lock:
+                    stats.in_flight -= 1
+                    stats.observe(time.time() - started)
+                    if response is not None:
+                        stats.status_codes[response.status_code] = stats.status_codes.get(response.status_code, 0) + 1
+
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt == attempts - 1):
+                return response
+
+            delay = self._backoff(attempt, response)
+            print(f"🔁 Retrying {method} {host} in {delay:.1f}s "
+                  f"({response.status_code if response is not None else 'connection error'})")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Return per-host request counts, pool utilization and latency histograms"""
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+
+# Process-wide client shared by every outbound call site
+client = HTTPClient(
+    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+    max_retries=int(os.getenv('HTTP_MAX_RETRIES', 3)),
+    backoff_factor=float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5)),
+    timeout=float(os.getenv('HTTP_TIMEOUT', 30)),
+)
+
+
+def get(url, **kwargs):
+    return client.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return client.post(url, **kwargs)
+
+
+def session_for(url):
+    return client.session_for(url)
+
+
+def stats():
+    return client.stats()
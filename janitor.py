@@ -0,0 +1,131 @@
+import fnmatch
+import os
+import threading
+import time
+
+
+class SweepRule:
+    """Files in `directory` matching one of `patterns` (and none of `exclude`) expire `ttl` seconds after they were last written"""
+
+    def __init__(self, directory, ttl, patterns=('*',), exclude=()):
+        self.directory = directory
+        self.ttl = ttl
+        self.patterns = tuple(patterns)
+        self.exclude = tuple(exclude)
+
+    def matches(self, name):
+        return (any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+                and not any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude))
+
+
+class Janitor:
+    """
+    Expires abandoned preview sessions, uploads and generated artifacts.
+
+    A file's modification time is its creation record: session JSON and
+    generated .tex/.pdf files are written once (or rewritten when they are
+    regenerated). A sweep deletes at most `max_deletes` expired files,
+    oldest first, so a large backlog is worked off over several sweeps
+    instead of holding up a worker. Sweeps run every `interval` seconds in a
+    daemon thread started on first use in each process; every gunicorn
+    worker sweeps, and a file another worker removed first is skipped.
+    """
+
+    def __init__(self, rules, interval=600, max_deletes=200):
+        self.rules = list(rules)
+        self.interval = interval
+        self.max_deletes = max_deletes
+
+        self._thread_pid = None
+        self._start_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stats = {'sweeps': 0, 'deleted': 0, 'deleted_bytes': 0, 'errors': 0, 'last_sweep': None}
+
+    def start(self):
+        """Start this process's sweeper thread if it is not running (cheap to call on every request)"""
+        if self.interval <= 0 or self._thread_pid == os.getpid():
+            return
+        # Threads do not survive fork, so start them lazily in each process
+        with self._start_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._loop, name='janitor', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"❌ Janitor sweep failed: {e}")
+            time.sleep(self.interval)
+
+    def _expired_files(self, now):
+        """(mtime, path, size, directory) of every expired file, and per-directory usage"""
+        expired = []
+        usage = {}
+        for rule in self.rules:
+            files = size = 0
+            try:
+                entries = list(os.scandir(rule.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    info = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                files += 1
+                size += info.st_size
+                if rule.matches(entry.name) and now - info.st_mtime > rule.ttl:
+                    expired.append((info.st_mtime, entry.path, info.st_size, rule.directory))
+            usage[rule.directory] = {'files': files, 'bytes': size, 'ttl_seconds': rule.ttl}
+        return expired, usage
+
+    def sweep(self):
+        """Delete up to max_deletes expired files and return a report of the sweep"""
+        with self._sweep_lock:
+            started_at, started = time.time(), time.monotonic()
+            expired, usage = self._expired_files(started_at)
+            expired.sort()
+
+            deleted = deleted_bytes = errors = 0
+            for _, path, size, directory in expired[:self.max_deletes]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"⚠️ Janitor could not remove {path}: {e}")
+                    errors += 1
+                    continue
+                deleted += 1
+                deleted_bytes += size
+                usage[directory]['files'] -= 1
+                usage[directory]['bytes'] -= size
+
+            report = {
+                'started_at': started_at,
+                'duration_ms': round((time.monotonic() - started) * 1000, 1),
+                'deleted': deleted,
+                'deleted_bytes': deleted_bytes,
+                'errors': errors,
+                'backlog': max(0, len(expired) - self.max_deletes),
+                'directories': usage,
+            }
+            self._stats['sweeps'] += 1
+            self._stats['deleted'] += deleted
+            self._stats['deleted_bytes'] += deleted_bytes
+            self._stats['errors'] += errors
+            self._stats['last_sweep'] = report
+        if deleted or errors:
+            print(f"🧹 Janitor removed {deleted} expired files ({deleted_bytes / 1024:.0f} KB) "
+                  f"in {report['duration_ms']}ms, {report['backlog']} left for later sweeps")
+        return report
+
+    def stats(self):
+        with self._sweep_lock:
+            return dict(self._stats, interval_seconds=self.interval, max_deletes=self.max_deletes,
+                        running=self._thread_pid == os.getpid())
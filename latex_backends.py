@@ -0,0 +1,471 @@
+import atexit
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+WARMUP_DOCUMENT = r"""
+\documentclass[letterpaper,11pt]{article}
+\usepackage[T1]{fontenc}
+\usepackage[hidelinks]{hyperref}
+\begin{document}
+Warm-up
+\end{document}
+"""
+
+
+def split_preamble(latex_content):
+    """Return everything before \\begin{document}, or None if the document has no body"""
+    index = latex_content.find('\\begin{document}')
+    if index == -1:
+        return None
+    return latex_content[:index]
+
+
+def preamble_key(preamble):
+    return hashlib.sha256(preamble.encode('utf-8')).hexdigest()[:16]
+
+
+def find_local_engine(preferred=None):
+    """
+    Locate a local LaTeX engine on PATH.
+
+    Args:
+        preferred (str): 'pdflatex' or 'tectonic' to only look for that engine
+
+    Returns:
+        tuple: (engine name, executable path) or (None, None) if nothing is installed
+    """
+    candidates = [preferred] if preferred else ['pdflatex', 'tectonic']
+    for engine in candidates:
+        path = shutil.which(engine)
+        if path:
+            return engine, path
+    return None, None
+
+
+class OnlineCompileBackend:
+    """Compile through latexonline.cc (wraps app.compile_latex_online)"""
+
+    name = 'online'
+
+    def __init__(self, compile_fn):
+        self.compile_fn = compile_fn
+
+    def compile(self, latex_content, output_filename):
+        return self.compile_fn(latex_content, output_filename)
+
+    def describe(self):
+        return {'backend': self.name, 'service': 'latexonline.cc'}
+
+
+class _WorkerSlot:
+    """A dedicated scratch directory and TeX cache used by one compile at a time"""
+
+    def __init__(self, root, index, base_texmf_cache=None):
+        self.index = index
+        self.scratch_dir = os.path.join(root, f"worker-{index}")
+        self.texmf_cache = os.path.join(self.scratch_dir, 'texmf-cache')
+        self.texmf_var = os.path.join(self.scratch_dir, 'texmf-var')
+        os.makedirs(self.texmf_var, exist_ok=True)
+
+        # Seed the worker's cache from the shared one so fonts/formats are not regenerated
+        if base_texmf_cache and os.path.isdir(base_texmf_cache) and not os.path.isdir(self.texmf_cache):
+            shutil.copytree(base_texmf_cache, self.texmf_cache, dirs_exist_ok=True)
+        os.makedirs(self.texmf_cache, exist_ok=True)
+
+        self.job_dir = os.path.join(self.scratch_dir, 'job')
+
+    def reset_job_dir(self):
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+        os.makedirs(self.job_dir)
+
+
+class LocalLatexBackend:
+    """
+    Compile with a locally installed pdflatex or tectonic.
+
+    Compiles run in a bounded pool of worker slots. Each slot owns a scratch
+    directory (below a per-process directory in scratch_root, created after
+    fork) and a pre-populated TEXMFCACHE/TEXMFVAR, and every compile is a
+    sandboxed subprocess (no shell escape, paranoid file access, CPU and
+    memory limits, wall-clock timeout).
+
+    Preambles registered with register_preamble() are dumped once into a
+    precompiled format (mylatexformat), so documents sharing that preamble
+    only have their body processed.
+    """
+
+    name = 'local'
+
+    def __init__(self, engine, executable, output_dir, workers=2, timeout=120,
+                 scratch_root=None, base_texmf_cache=None, acquire_timeout=None):
+        self.engine = engine
+        self.executable = executable
+        self.output_dir = os.path.abspath(output_dir)
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else timeout
+        self.scratch_root = scratch_root or os.path.join(tempfile.gettempdir(), 'cvlatex-compile')
+        self.base_texmf_cache = base_texmf_cache
+
+        self.workers = workers
+        # Slots are created lazily in each process, see _slot_queue()
+        self._slots = None
+        self._slots_pid = None
+        self._slots_lock = threading.Lock()
+        self.scratch_dir = None
+
+        self.formats_dir = os.path.join(self.scratch_root, 'formats')
+        self._formats = {}
+        self._expected = {}
+        self._dumping = set()
+        self._dropped = set()
+
+        self._lock = threading.Lock()
+        self.compiles = 0
+        self.format_compiles = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+    def _slot_queue(self):
+        """This process's worker slots, created on first use after fork"""
+        if self._slots_pid == os.getpid():
+            return self._slots
+        with self._slots_lock:
+            if self._slots_pid != os.getpid():
+                # gunicorn workers share scratch_root, so each process gets its own slot directories
+                os.makedirs(self.scratch_root, exist_ok=True)
+                scratch_dir = tempfile.mkdtemp(prefix=f'cvlatex-{os.getpid()}-', dir=self.scratch_root)
+                atexit.register(shutil.rmtree, scratch_dir, True)
+                slots = queue.Queue()
+                for index in range(self.workers):
+                    slots.put(_WorkerSlot(scratch_dir, index, self.base_texmf_cache))
+                self.scratch_dir = scratch_dir
+                self._slots = slots
+                self._slots_pid = os.getpid()
+            return self._slots
+
+    def warm_up(self, preambles=()):
+        """Dump formats for the given preambles, then run a throwaway compile in every slot"""
+        for preamble in preambles:
+            self.register_preamble(preamble)
+
+        slot_queue = self._slot_queue()
+        slots = [slot_queue.get() for _ in range(self.workers)]
+        try:
+            for slot in slots:
+                pdf_bytes, _ = self._run(slot, WARMUP_DOCUMENT)
+                status = '✅' if pdf_bytes else '⚠️'
+                print(f"{status} Warmed LaTeX worker {slot.index} ({self.engine})")
+        finally:
+            for slot in slots:
+                slot_queue.put(slot)
+
+    def expect_preambles(self, latex_contents):
+        """
+        Remember preambles worth a precompiled format.
+
+        Call this before gunicorn forks: whichever process first compiles one
+        of them without a format on disk dumps it in the background, so the
+        workers do not depend on the master's warm-up finishing before fork.
+        """
+        for latex_content in latex_contents:
+            preamble = split_preamble(latex_content)
+            if preamble is not None:
+                self._expected[preamble_key(preamble)] = preamble
+
+    def _fmt_path(self, key):
+        return os.path.join(self.formats_dir, f"preamble-{key}.fmt")
+
+    def register_preamble(self, latex_content):
+        """
+        Precompile the preamble of `latex_content` into a format file.
+
+        Only pdflatex needs this; tectonic already caches its formats.
+
+        Returns:
+            bool: True if a format for this preamble is available
+        """
+        if self.engine != 'pdflatex':
+            return False
+        preamble = split_preamble(latex_content)
+        if preamble is None:
+            return False
+        return self._dump_format(preamble_key(preamble), preamble)
+
+    def _dump_format(self, key, preamble):
+        with self._lock:
+            if key in self._formats:
+                return True
+        fmt_path = self._fmt_path(key)
+        if os.path.exists(fmt_path):
+            with self._lock:
+                self._formats[key] = fmt_path
+            return True
+
+        # Every process may dump the same format, so dump under a private jobname and move it into place
+        jobname = f"preamble-{key}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.formats_dir, exist_ok=True)
+        source_name = f"{jobname}-src.tex"
+        with open(os.path.join(self.formats_dir, source_name), 'w', encoding='utf-8') as f:
+            f.write(preamble + '\\begin{document}\n\\end{document}\n')
+
+        slot_queue = self._slot_queue()
+        slot = slot_queue.get()
+        started = time.time()
+        try:
+            proc = subprocess.run(
+                [self.executable, '-ini', '-interaction=nonstopmode', '-halt-on-error',
+                 f'-jobname={jobname}', '&pdflatex', 'mylatexformat.ltx', source_name],
+                cwd=self.formats_dir,
+                env=self._environment(slot),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=self.timeout,
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            print(f"⚠️ Could not dump LaTeX format preamble-{key}: {e}")
+            return False
+        finally:
+            slot_queue.put(slot)
+            for suffix in ('-src.tex', '.log'):
+                try:
+                    os.remove(os.path.join(self.formats_dir, jobname + suffix))
+                except OSError:
+                    pass
+
+        tmp_fmt_path = os.path.join(self.formats_dir, f"{jobname}.fmt")
+        if proc.returncode != 0 or not os.path.exists(tmp_fmt_path):
+            print(f"⚠️ Could not dump LaTeX format preamble-{key} (is mylatexformat installed?)")
+            print(proc.stdout.decode('utf-8', errors='replace')[-1000:])
+            return False
+        os.replace(tmp_fmt_path, fmt_path)
+
+        with self._lock:
+            self._formats[key] = fmt_path
+        print(f"✅ Precompiled LaTeX format preamble-{key} in {time.time() - started:.2f}s")
+        return True
+
+    def _dump_in_background(self, key):
+        with self._lock:
+            if key in self._dumping:
+                return
+            self._dumping.add(key)
+
+        def dump():
+            try:
+                self._dump_format(key, self._expected[key])
+            finally:
+                with self._lock:
+                    self._dumping.discard(key)
+
+        threading.Thread(target=dump, name=f'latex-format-{key}', daemon=True).start()
+
+    def _format_for(self, latex_content):
+        if self.engine != 'pdflatex':
+            return None
+        preamble = split_preamble(latex_content)
+        if preamble is None:
+            return None
+        key = preamble_key(preamble)
+        with self._lock:
+            if key in self._formats or key in self._dropped:
+                return self._formats.get(key)
+        fmt_path = self._fmt_path(key)
+        if os.path.exists(fmt_path):
+            # Dumped by another process, e.g. the preloading gunicorn master
+            with self._lock:
+                self._formats[key] = fmt_path
+            return fmt_path
+        if key in self._expected:
+            self._dump_in_background(key)
+        return None
+
+    def _drop_format(self, fmt_path):
+        with self._lock:
+            self._dropped.update(key for key, path in self._formats.items() if path == fmt_path)
+            self._formats = {key: path for key, path in self._formats.items() if path != fmt_path}
+
+    def compile(self, latex_content, output_filename):
+        """Compile LaTeX into output_dir/output_filename, returning True on success"""
+        slot_queue = self._slot_queue()
+        try:
+            slot = slot_queue.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            print(f"❌ No free LaTeX worker after {self.acquire_timeout}s")
+            with self._lock:
+                self.failures += 1
+            return False
+
+        started = time.time()
+        fmt_path = self._format_for(latex_content)
+        try:
+            pdf_bytes, log_tail = self._run(slot, latex_content, fmt_path=fmt_path)
+            if not pdf_bytes and fmt_path:
+                # A stale or broken format must not cost the user their PDF
+                print("⚠️ Compile with precompiled format failed, retrying without it")
+                self._drop_format(fmt_path)
+                fmt_path = None
+                pdf_bytes, log_tail = self._run(slot, latex_content)
+        finally:
+            slot_queue.put(slot)
+        elapsed = time.time() - started
+
+        with self._lock:
+            self.compiles += 1
+            if fmt_path:
+                self.format_compiles += 1
+            self.total_seconds += elapsed
+            if not pdf_bytes:
+                self.failures += 1
+
+        if not pdf_bytes:
+            print(f"❌ Local {self.engine} compilation failed after {elapsed:.2f}s")
+            if log_tail:
+                print(log_tail)
+            return False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        pdf_path = os.path.join(self.output_dir, output_filename)
+        tmp_path = f"{pdf_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, pdf_path)
+        print(f"✅ Local PDF created at: {pdf_path} ({elapsed:.2f}s)")
+        return True
+
+    def _command(self, tex_filename, fmt_name=None):
+        if self.engine == 'tectonic':
+            return [self.executable, '--untrusted', '--outdir', '.', tex_filename]
+        command = [
+            self.executable,
+            '-interaction=nonstopmode',
+            '-halt-on-error',
+            '-no-shell-escape',
+            '-file-line-error',
+        ]
+        if fmt_name:
+            command.append(f'-fmt={fmt_name}')
+        return command + [tex_filename]
+
+    def _environment(self, slot):
+        env = {
+            'PATH': os.environ.get('PATH', ''),
+            'HOME': slot.scratch_dir,
+            'TEXMFCACHE': slot.texmf_cache,
+            'TEXMFVAR': slot.texmf_var,
+            'TECTONIC_CACHE_DIR': slot.texmf_cache,
+            # kpathsea sandboxing: only read/write files below the job directory
+            'openout_any': 'p',
+            'openin_any': 'p',
+            'shell_escape': 'f',
+        }
+        for key in ('TEXMFHOME', 'TEXINPUTS', 'TEXFORMATS', 'LANG', 'LC_ALL'):
+            if os.environ.get(key):
+                env[key] = os.environ[key]
+        return env
+
+    def _limit_resources(self):
+        if resource is None:
+            return
+        cpu_seconds = int(self.timeout) + 5
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        memory = 1024 * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+    def _run(self, slot, latex_content, tex_filename='main.tex', fmt_path=None):
+        """Run the engine in a slot's job directory, returning (pdf bytes or None, log tail)"""
+        slot.reset_job_dir()
+        with open(os.path.join(slot.job_dir, tex_filename), 'w', encoding='utf-8') as f:
+            f.write(latex_content)
+
+        fmt_name = None
+        if fmt_path:
+            # kpathsea finds formats in the current directory, so link it next to the job
+            fmt_name = 'preamble'
+            try:
+                os.link(fmt_path, os.path.join(slot.job_dir, 'preamble.fmt'))
+            except OSError:
+                shutil.copyfile(fmt_path, os.path.join(slot.job_dir, 'preamble.fmt'))
+
+        try:
+            proc = subprocess.run(
+                self._command(tex_filename, fmt_name),
+                cwd=slot.job_dir,
+                env=self._environment(slot),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=self.timeout,
+                preexec_fn=self._limit_resources if resource else None,
+            )
+        except subprocess.TimeoutExpired:
+            return None, f"⏱️ {self.engine} timed out after {self.timeout}s"
+        except OSError as e:
+            return None, f"❌ Could not start {self.engine}: {e}"
+
+        log_tail = proc.stdout.decode('utf-8', errors='replace')[-2000:]
+        pdf_path = os.path.join(slot.job_dir, tex_filename[:-4] + '.pdf')
+        if proc.returncode != 0 or not os.path.exists(pdf_path):
+            return None, log_tail
+
+        with open(pdf_path, 'rb') as f:
+            return f.read(), log_tail
+
+    def describe(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'engine': self.engine,
+                'executable': self.executable,
+                'workers': self.workers,
+                'idle_workers': self._slots.qsize() if self._slots_pid == os.getpid() else self.workers,
+                'scratch_dir': self.scratch_dir if self._slots_pid == os.getpid() else None,
+                'timeout_seconds': self.timeout,
+                'compiles': self.compiles,
+                'format_compiles': self.format_compiles,
+                'precompiled_formats': len(self._formats),
+                'failures': self.failures,
+                'avg_seconds': round(self.total_seconds / self.compiles, 3) if self.compiles else None,
+            }
+
+
+def select_backend(online_compile, output_dir, preference='auto', engine=None,
+                   workers=2, timeout=120, base_texmf_cache=None, scratch_root=None):
+    """
+    Pick the compile backend for this process.
+
+    A local engine is used whenever one is installed (unless preference is
+    'online'); latexonline.cc is only the fallback when nothing local exists.
+    """
+    online = OnlineCompileBackend(online_compile)
+    if preference == 'online':
+        return online
+
+    engine_name, executable = find_local_engine(engine)
+    if not executable:
+        if preference == 'local':
+            print("⚠️ LATEX_BACKEND=local but no pdflatex/tectonic found, using latexonline.cc")
+        return online
+
+    return LocalLatexBackend(
+        engine_name,
+        executable,
+        output_dir,
+        workers=workers,
+        timeout=timeout,
+        scratch_root=scratch_root,
+        base_texmf_cache=base_texmf_cache,
+    )
@@ -0,0 +1,118 @@
+"""
+Single-pass LaTeX escaping for CV text.
+
+Every character is looked up once in a str.translate table. The table
+reproduces what the original chain of str.replace calls produced, including
+its cascades: the backslash and caret replacements were escaped again by the
+later brace replacements, which is why they map to `\\{\\}` here while the
+tilde (replaced last) keeps plain braces.
+"""
+
+import re
+
+# Characters the original replace chain handled, with its exact output
+_LEGACY_REPLACEMENTS = {
+    '\\': '\\textbackslash\\{\\}',
+    '○': '\\textbullet',  # Unicode bullet
+    '●': '\\textbullet',  # Black circle
+    '•': '\\textbullet',  # Bullet
+    '◦': '\\textbullet',  # White bullet
+    '▪': '\\textbullet',  # Black small square
+    '▫': '\\textbullet',  # White small square
+    '–': '--',           # En dash
+    '—': '---',          # Em dash
+    '‘': "'",            # Left single quotation mark
+    '’': "'",            # Right single quotation mark
+    '“': '"',            # Left double quotation mark
+    '”': '"',            # Right double quotation mark
+    '…': '...',          # Horizontal ellipsis
+    '°': '\\textdegree', # Degree symbol
+    '±': '\\textpm',     # Plus-minus
+    '×': '\\texttimes',  # Multiplication sign
+    '÷': '\\textdiv',    # Division sign
+    '€': '\\texteuro',   # Euro sign
+    '£': '\\textsterling', # Pound sign
+    '¥': '\\textyen',    # Yen sign
+    '©': '\\textcopyright', # Copyright
+    '®': '\\textregistered', # Registered trademark
+    '™': '\\texttrademark', # Trademark
+    '&': '\\&',
+    '%': '\\%',
+    '$': '\\$',
+    '#': '\\#',
+    '^': '\\textasciicircum\\{\\}',
+    '_': '\\_',
+    '{': '\\{',
+    '}': '\\}',
+    '~': '\\textasciitilde{}',
+}
+
+# Characters from uploaded PDFs/DOCX files that used to pass through and break
+# pdflatex (inputenc has no definition for them, or they are invisible)
+_UPLOAD_REPLACEMENTS = {
+    '': '\\textbullet{}',  # Symbol-font bullet from Word exports
+    '': '\\textbullet{}',  # Wingdings square bullet
+    '': '\\textbullet{}',  # Wingdings arrow bullet
+    '‣': '\\textbullet{}',  # Triangular bullet
+    '⁃': '\\textbullet{}',  # Hyphen bullet
+    '∙': '\\textbullet{}',  # Bullet operator
+    '■': '\\textbullet{}',  # Black square
+    '►': '\\textbullet{}',  # Black right-pointing pointer
+    '➢': '\\textbullet{}',  # Arrowhead bullet
+    '✓': '\\textbullet{}',  # Check mark
+    '✔': '\\textbullet{}',  # Heavy check mark
+    '·': '\\textperiodcentered{}',  # Middle dot
+    ' ': ' ',   # No-break space
+    ' ': ' ',   # En space
+    ' ': ' ',   # Em space
+    ' ': ' ',   # Thin space
+    ' ': ' ',   # Narrow no-break space
+    '­': '',    # Soft hyphen
+    '​': '',    # Zero-width space
+    '‌': '',    # Zero-width non-joiner
+    '‍': '',    # Zero-width joiner
+    '⁠': '',    # Word joiner
+    '﻿': '',    # Byte order mark
+    '�': '',    # Replacement character from broken decodes
+    '‐': '-',   # Hyphen
+    '‑': '-',   # Non-breaking hyphen
+    '‒': '--',  # Figure dash
+    '−': '-',   # Minus sign
+    '′': "'",   # Prime
+    '″': "''",  # Double prime
+    '‚': ',',   # Single low quotation mark
+    '„': ',,',  # Double low quotation mark
+    '→': '$\\rightarrow$',
+    '←': '$\\leftarrow$',
+    '≤': '$\\leq$',
+    '≥': '$\\geq$',
+    '≈': '$\\approx$',
+    'ﬀ': 'ff',
+    'ﬁ': 'fi',
+    'ﬂ': 'fl',
+    'ﬃ': 'ffi',
+    'ﬄ': 'ffl',
+}
+
+# C0 control characters (other than tab and newlines) that PDF extraction leaves behind
+_CONTROL_CHARACTERS = {chr(code): '' for code in range(32) if chr(code) not in '\t\n\r'}
+
+LATEX_ESCAPE_TABLE = str.maketrans({**_CONTROL_CHARACTERS, **_UPLOAD_REPLACEMENTS, **_LEGACY_REPLACEMENTS})
+
+# Most CV strings contain nothing to escape; a C-level scan lets them skip translate()
+_NEEDS_ESCAPING = re.compile('[' + ''.join(re.escape(chr(code)) for code in LATEX_ESCAPE_TABLE) + ']')
+
+
+def clean_text_for_latex(text):
+    """Clean text to be LaTeX-safe"""
+    if not text:
+        return ""
+
+    # Handle case where text might be a list
+    if isinstance(text, list):
+        return [clean_text_for_latex(item) for item in text]
+
+    text = str(text)
+    if _NEEDS_ESCAPING.search(text) is None:
+        return text
+    return text.translate(LATEX_ESCAPE_TABLE)
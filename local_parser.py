@@ -0,0 +1,331 @@
+import re
+
+# Fields of the CV parse schema, in the order Gemini is asked for them
+PARSE_FIELDS = ('name', 'email', 'phone', 'linkedin', 'github', 'website', 'address', 'education', 'experience',
+                'projects', 'skills', 'certifications', 'awards', 'languages', 'custom_sections')
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_RE = re.compile(r'(?<![\w/])[+(]?\d[\d\s().-]{6,20}\d(?![\w/])')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/[^\s|,;]+', re.IGNORECASE)
+GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[^\s|,;]+', re.IGNORECASE)
+URL_RE = re.compile(r'(?:https?://|www\.)[^\s|,;]+', re.IGNORECASE)
+# Everything above in one pattern, to strip contact details from the header in a single scan
+CONTACT_RE = re.compile('|'.join(pattern.pattern for pattern in (EMAIL_RE, LINKEDIN_RE, GITHUB_RE, URL_RE, PHONE_RE)), re.IGNORECASE)
+
+_HEADING_NOISE_RE = re.compile(r'[^a-z]+')
+_BULLET_RE = re.compile(r'^[•●○◦▪■∙·*>–—-]+\s*')
+_LEFTOVER_RE = re.compile(r'^[\s|•·,;:/()-]*$')
+_CONTACT_LABEL_RE = re.compile(r'\b(?:e-?mail|phone|mobile|cell|tel|contact)\s*:?', re.IGNORECASE)
+_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z.'\- ]{1,60}$")
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b|\b(?:present|current)\b', re.IGNORECASE)
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+'
+_DATE_RANGE_RE = re.compile(rf'[(\[]?\s*(?:{_MONTH})?(?:19|20)\d{{2}}(?:\s*(?:-|–|—|to)\s*(?:(?:{_MONTH})?(?:19|20)\d{{2}}|present|current|now))?\s*[)\]]?', re.IGNORECASE)
+_DEGREE_RE = re.compile(r'\b(?:bachelor|master|ph\.?\s?d|doctor|associate|diploma|degree|b\.?sc|m\.?sc|b\.?s|m\.?s|mba|b\.?tech|m\.?tech|'
+                        r'b\.?a|m\.?a|hsc|ssc|intermediate|matric|a[ -]levels?|o[ -]levels?|high school)\b', re.IGNORECASE)
+_GPA_RE = re.compile(r'\b(?:c?gpa|grade)\s*:?\s*([\d.]+(?:\s*/\s*[\d.]+)?)', re.IGNORECASE)
+# Unlisted headings: a short all-caps line such as "VOLUNTEER WORK"
+_CAPS_HEADING_RE = re.compile(r'^[A-Z][A-Z &/-]{2,38}[A-Z]:?$')
+# Any short line in title case or capitals ("Notable Projects", "Acme Corp") may be a heading
+_TITLE_HEADING_RE = re.compile(r"^[A-Z][A-Za-z'-]*(?:\s+(?:[A-Z][A-Za-z'-]*|&|/|and|of|the|for|in))*:?$")
+_LABELED_RE = re.compile(r'^([^:]{2,40}):\s*(.+)$')
+_ITEM_SPLIT_RE = re.compile(r'\s*[,;|•·]\s*')
+_SKILL_CATEGORIES = (
+    (re.compile(r'framework', re.IGNORECASE), 'frameworks'),
+    (re.compile(r'librar', re.IGNORECASE), 'libraries'),
+    (re.compile(r'database|\bdbs?\b|storage', re.IGNORECASE), 'databases'),
+    (re.compile(r'tool|software|platform|devops|cloud', re.IGNORECASE), 'tools'),
+    (re.compile(r'language|programming', re.IGNORECASE), 'languages'),
+)
+
+# Normalized heading text -> schema field. Summaries, interests and the like become custom sections.
+SECTION_HEADINGS = {heading: field for field, headings in {
+    'education': ('education', 'academic background', 'academics', 'educational background', 'education and training',
+                  'qualifications', 'academic qualifications', 'educational qualifications'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'relevant experience', 'internships', 'internship experience', 'career history'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects', 'selected projects', 'portfolio'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core skills', 'skills and tools', 'technologies',
+               'tech stack', 'core competencies', 'competencies', 'skills and abilities', 'technical expertise'),
+    'certifications': ('certifications', 'certificates', 'certification', 'licenses and certifications',
+                       'certifications and training', 'courses', 'training', 'courses and certifications'),
+    'awards': ('awards', 'honors', 'honours', 'awards and honors', 'honors and awards', 'achievements',
+               'accomplishments', 'awards and achievements'),
+    'languages': ('languages', 'spoken languages', 'language skills', 'language proficiency'),
+    'custom_sections': ('summary', 'professional summary', 'profile', 'professional profile', 'about me', 'objective',
+                        'career objective', 'profile summary', 'career summary', 'personal profile', 'soft skills', 'interests', 'hobbies', 'hobbies and interests', 'publications',
+                        'volunteering', 'volunteer experience', 'leadership', 'activities', 'extracurricular activities',
+                        'references', 'declaration', 'personal details', 'personal information'),
+}.items() for heading in headings}
+# Words that make an unlisted title-case heading a section of their field, e.g. "Notable Projects"
+HEADING_KEYWORDS = {
+    'projects': 'projects', 'certifications': 'certifications', 'certificates': 'certifications',
+    'licenses': 'certifications', 'licences': 'certifications', 'courses': 'certifications',
+    'awards': 'awards', 'honors': 'awards', 'honours': 'awards', 'achievements': 'awards',
+    'experience': 'experience', 'education': 'education', 'skills': 'skills',
+    'volunteer': 'custom_sections', 'volunteering': 'custom_sections', 'publications': 'custom_sections',
+    'interests': 'custom_sections', 'activities': 'custom_sections', 'leadership': 'custom_sections',
+}
+
+# How sure we are that a field is right when the CV has no trace of it
+ABSENT_CONFIDENCE = {'email': 0.95, 'phone': 0.9, 'linkedin': 0.9, 'github': 0.9, 'website': 0.75, 'name': 0.0,
+                     'address': 0.0, 'education': 0.5, 'experience': 0.5, 'projects': 0.8, 'skills': 0.5,
+                     'certifications': 0.8, 'awards': 0.8, 'languages': 0.8, 'custom_sections': 0.8}
+# ...and when a line that looks like a heading could be hiding it under an unrecognized title
+HIDDEN_CONFIDENCE = 0.5
+
+
+def _looks_like_heading(line):
+    return len(line) <= 48 and len(line.split()) <= 4 and bool(_TITLE_HEADING_RE.match(line) or _CAPS_HEADING_RE.match(line))
+
+
+def _heading_field(line, in_sections):
+    """Schema field for a section heading line, or None when the line is content"""
+    if len(line) > 48:
+        return None
+    words = _HEADING_NOISE_RE.sub(' ', line.lower().replace('&', ' and ')).split()
+    field = SECTION_HEADINGS.get(' '.join(words))
+    # Only after the first known heading: the name and job title at the top look like headings too
+    if field is None and in_sections and _looks_like_heading(line):
+        field = next((HEADING_KEYWORDS[word] for word in words if word in HEADING_KEYWORDS), None)
+        if field is None and _CAPS_HEADING_RE.match(line):
+            return 'custom_sections'
+    return field
+
+
+def _strip_bullet(line):
+    return _BULLET_RE.sub('', line).strip()
+
+
+def _phone(text):
+    for match in PHONE_RE.finditer(text):
+        digits = sum(char.isdigit() for char in match.group())
+        if 9 <= digits <= 15 and not _DATE_RANGE_RE.fullmatch(match.group()):
+            return match.group().strip()
+    return None
+
+
+class LocalParse:
+    """
+    Result of parse_cv_locally.
+
+    `data` holds the best-effort value of every field found, `confidence`
+    how likely each field (or its absence) is to match what Gemini would
+    extract, and each block of lines remembers which fields it backs so the
+    text behind low-confidence fields can be sent to Gemini on its own.
+    """
+
+    def __init__(self, data, confidence, blocks):
+        self.data = data
+        self.confidence = confidence
+        self.blocks = blocks
+
+    def uncertain_fields(self, min_confidence):
+        return [field for field in PARSE_FIELDS if self.confidence[field] < min_confidence]
+
+    def excerpt(self, fields):
+        """The lines of the CV behind `fields`, in document order"""
+        wanted = set(fields)
+        return '\n'.join(line for block_fields, lines in self.blocks if wanted.intersection(block_fields) for line in lines)
+
+    def merge(self, gemini_data, fields):
+        """Local values for the confident fields and Gemini's for `fields`, in schema order"""
+        merged = {}
+        for field in PARSE_FIELDS:
+            value = gemini_data.get(field) if field in fields else self.data.get(field)
+            if value:
+                merged[field] = value
+        return merged
+
+
+def _parse_header(lines, data, confidence):
+    """Name and address lines left over once the contact details are taken out"""
+    leftover = []
+    for line in lines:
+        rest = _CONTACT_LABEL_RE.sub('', CONTACT_RE.sub('', line))
+        if _LEFTOVER_RE.match(rest):
+            continue
+        rest = rest.strip(' |•·,;:-')
+        if 'name' not in data and _NAME_RE.match(rest) and 2 <= len(rest.split()) <= 5 and rest.lower() not in ('curriculum vitae', 'resume'):
+            data['name'] = rest
+            confidence['name'] = 0.9
+            continue
+        leftover.append(rest)
+    return leftover
+
+
+def _parse_skills(lines):
+    skills = {}
+    labeled = 0
+    for line in lines:
+        line = _strip_bullet(line)
+        labeled_match = _LABELED_RE.match(line)
+        if labeled_match:
+            labeled += 1
+            label, line = labeled_match.groups()
+            category = next((name for pattern, name in _SKILL_CATEGORIES if pattern.search(label)), 'other')
+        else:
+            category = 'other'
+        skills.setdefault(category, []).extend(item for item in _ITEM_SPLIT_RE.split(line) if item)
+    # "Category: a, b, c" lines map straight onto the schema; free text needs Gemini to categorize and split
+    short_items = all(len(item.split()) <= 4 for items in skills.values() for item in items)
+    return skills, 0.9 if lines and labeled == len(lines) and short_items else 0.5
+
+
+def _parse_items(lines):
+    items = [item for line in lines for item in _ITEM_SPLIT_RE.split(_strip_bullet(line)) if item]
+    return items, 0.85 if items and all(len(item.split()) <= 3 for item in items) else 0.5
+
+
+def _parse_list(lines):
+    items = [_strip_bullet(line) for line in lines if _strip_bullet(line)]
+    return items, 0.85 if items and all(len(item) <= 120 for item in items) else 0.5
+
+
+def _parse_education(lines):
+    entries = []
+    for line in lines:
+        text = _strip_bullet(line)
+        date = _DATE_RANGE_RE.search(text)
+        gpa = _GPA_RE.search(text)
+        if entries and gpa:
+            entries[-1]['gpa'] = gpa.group(1)
+        elif entries and date and len(date.group().strip()) >= len(text) - 2:
+            entries[-1]['date'] = date.group().strip(' ()[]')
+        elif _DEGREE_RE.search(text) and (not entries or 'degree' in entries[-1]):
+            entries.append({'degree': text})
+        elif not entries or ('institution' in entries[-1] and 'degree' in entries[-1]):
+            entries.append({'institution': text})
+        elif 'institution' not in entries[-1]:
+            entries[-1]['institution'] = text
+        elif 'degree' not in entries[-1]:
+            entries[-1]['degree'] = text
+        else:
+            entries[-1]['details'] = f"{entries[-1].get('details', '')} {text}".strip()
+    return entries
+
+
+def _parse_experience(lines):
+    entries = []
+    for line in lines:
+        text = _strip_bullet(line)
+        is_bullet = text != line.strip()
+        if not is_bullet and (not entries or _YEAR_RE.search(text) or entries[-1]['description']):
+            date = _DATE_RANGE_RE.search(text)
+            title = (text[:date.start()] + text[date.end():]).strip(' |,-–—') if date else text
+            entries.append({'title': title or text, 'description': []})
+            if date:
+                entries[-1]['date'] = date.group().strip(' ()[]')
+        elif not is_bullet and 'company' not in entries[-1]:
+            entries[-1]['company'] = text
+        else:
+            entries[-1]['description'].append(text)
+    return entries
+
+
+def _parse_projects(lines):
+    projects = []
+    for line in lines:
+        text = _strip_bullet(line)
+        if text == line.strip() or not projects:
+            projects.append({'title': text, 'description': ''})
+        else:
+            projects[-1]['description'] = f"{projects[-1]['description']} {text}".strip()
+    return projects
+
+
+def _parse_certifications(lines):
+    return [{'name': _strip_bullet(line)} for line in lines if _strip_bullet(line)]
+
+
+# Structured sections are only parsed well enough to stand in when Gemini is unavailable
+_SECTION_PARSERS = {
+    'skills': _parse_skills,
+    'languages': _parse_items,
+    'awards': _parse_list,
+    'education': lambda lines: (_parse_education(lines), 0.4),
+    'experience': lambda lines: (_parse_experience(lines), 0.4),
+    'projects': lambda lines: (_parse_projects(lines), 0.4),
+    'certifications': lambda lines: (_parse_certifications(lines), 0.4),
+}
+# Fields that come from a headed section and can be missed when the heading is not recognized
+_SECTION_FIELDS = tuple(_SECTION_PARSERS) + ('custom_sections',)
+
+
+def parse_cv_locally(text):
+    """
+    Parse CV text without Gemini, in one pass over its lines.
+
+    Contact details come from precompiled patterns over the whole text, and
+    each line is either a known section heading (a dictionary lookup of its
+    normalized text, or a short title-case line naming a section, such as
+    "Notable Projects") or content of the current section; lines before the
+    first heading form the header. A field with no section is only trusted
+    as absent when no line could be an unrecognized heading for it.
+
+    Returns:
+        LocalParse: values, per-field confidence and the line blocks behind them
+    """
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    header = []
+    sections = []  # (field, heading line, content lines)
+    for line in lines:
+        field = _heading_field(line, bool(sections))
+        if field:
+            sections.append((field, line, []))
+        elif sections:
+            sections[-1][2].append(line)
+        else:
+            header.append(line)
+
+    data = {}
+    confidence = dict(ABSENT_CONFIDENCE)
+    email = EMAIL_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    github = GITHUB_RE.search(text)
+    website = next((match.group() for match in URL_RE.finditer(text)
+                    if 'linkedin.com' not in match.group().lower() and 'github.com' not in match.group().lower()), None)
+    for field, value, found_confidence in (('email', email and email.group(), 1.0), ('phone', _phone('\n'.join(header)) or _phone(text), 0.9),
+                                           ('linkedin', linkedin and linkedin.group(), 0.95), ('github', github and github.group(), 0.95),
+                                           ('website', website, 0.85)):
+        if value:
+            data[field] = value.rstrip('.')
+            confidence[field] = found_confidence
+    if 'linkedin' not in data and 'linkedin' in text.lower():
+        confidence['linkedin'] = 0.3  # e.g. "LinkedIn: janedoe" without a URL
+
+    leftover = _parse_header(header, data, confidence)
+    # The header also stands in for any section whose heading was not recognized
+    section_fields = {field for field, _, _ in sections}
+    absent = tuple(field for field in _SECTION_FIELDS if field not in section_fields)
+    blocks = [(tuple(field for field in PARSE_FIELDS if field not in section_fields or field == 'custom_sections'), leftover)]
+    if len(leftover) > 2:
+        # e.g. a summary paragraph, or a whole section above the first recognized heading
+        for field in absent:
+            confidence[field] = min(confidence[field], HIDDEN_CONFIDENCE)
+
+    custom_sections = []
+    for field, heading, content in sections:
+        # An unrecognized heading (with content below it) leaves its section inside this one,
+        # so Gemini gets this text for the absent fields too
+        hidden = absent if any(_looks_like_heading(line) for line in content[:-1]) else ()
+        blocks.append(((field,) + hidden, [heading] + content))
+        for absent_field in hidden:
+            confidence[absent_field] = min(confidence[absent_field], HIDDEN_CONFIDENCE)
+        if field == 'custom_sections':
+            custom_sections.append({'title': heading.strip(' :'), 'content': '\n'.join(content)})
+            confidence[field] = 0.4
+            continue
+        if not content:
+            continue
+        value, section_confidence = _SECTION_PARSERS[field](content)
+        if field in data:
+            # A second section of the same kind, e.g. "Experience" and "Internships"
+            data[field] = ({**data[field], **{key: data[field].get(key, []) + items for key, items in value.items()}}
+                           if isinstance(value, dict) else data[field] + value)
+            section_confidence = min(section_confidence, confidence[field])
+        elif value:
+            data[field] = value
+        confidence[field] = section_confidence
+    if custom_sections:
+        data['custom_sections'] = custom_sections
+    return LocalParse({field: data[field] for field in PARSE_FIELDS if data.get(field)}, confidence, blocks)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import threading
+import time
+
+from db import connect
+
+
+def normalize_text(text):
+    """Collapse whitespace so re-extracted copies of the same CV hash identically"""
+    return ' '.join(text.split())
+
+
+class ParseCache:
+    """
+    Persistent cache of Gemini CV parse results.
+
+    Keyed on a hash of the normalized extracted text plus the prompt version,
+    so changing the prompt invalidates old entries. Entries expire after
+    `ttl` seconds and the least recently used are evicted past `max_entries`.
+    """
+
+    def __init__(self, db_path, ttl=30 * 24 * 3600, max_entries=5000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        connect(self.db_path).execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        connect(self.db_path).execute('CREATE INDEX IF NOT EXISTS idx_parse_cache_access ON parse_cache (last_access)')
+
+    @staticmethod
+    def key_for(text, prompt_version):
+        payload = f"{prompt_version}\n{normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, text, prompt_version):
+        """Return the cached parse for `text`, or None"""
+        key = self.key_for(text, prompt_version)
+        conn = connect(self.db_path)
+        now = time.time()
+        row = conn.execute('SELECT value, created_at FROM parse_cache WHERE key = ?', (key,)).fetchone()
+
+        if row is not None and self.ttl and now - row['created_at'] > self.ttl:
+            conn.execute('DELETE FROM parse_cache WHERE key = ?', (key,))
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        conn.execute('UPDATE parse_cache SET last_access = ? WHERE key = ?', (now, key))
+        return json.loads(row['value'])
+
+    def put(self, text, prompt_version, parsed_data):
+        now = time.time()
+        connect(self.db_path).execute(
+            'INSERT OR REPLACE INTO parse_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)',
+            (self.key_for(text, prompt_version), json.dumps(parsed_data, ensure_ascii=False), now, now),
+        )
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries and the least recently used ones beyond max_entries"""
+        conn = connect(self.db_path)
+        removed = 0
+        if self.ttl:
+            removed += conn.execute('DELETE FROM parse_cache WHERE created_at < ?', (time.time() - self.ttl,)).rowcount
+        removed += conn.execute(
+            'DELETE FROM parse_cache WHERE key IN ('
+            '  SELECT key FROM parse_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?'
+            ')',
+            (self.max_entries,),
+        ).rowcount
+        with self._lock:
+            self.evictions += removed
+
+    def stats(self):
+        row = connect(self.db_path).execute(
+            'SELECT COUNT(*) AS entries, COALESCE(SUM(LENGTH(value)), 0) AS size FROM parse_cache'
+        ).fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': row['entries'],
+                'size_bytes': row['size'],
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+            }
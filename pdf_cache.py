@@ -0,0 +1,157 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+
+
+class PDFCompileCache:
+    """Content-addressed on-disk cache of compiled PDFs.
+
+    Entries are keyed on the SHA-256 of the LaTeX source, so compiling the
+    exact same document twice only costs a hardlink (or copy) of the cached
+    bytes. The cache is bounded by total size and entry age.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, max_age=7 * 24 * 3600):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(latex_content):
+        """Return the cache key for a LaTeX document"""
+        return hashlib.sha256(latex_content.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _is_expired(self, path, now=None):
+        now = now or time.time()
+        return self.max_age and now - os.path.getmtime(path) > self.max_age
+
+    def fetch(self, latex_content, dest_path):
+        """
+        Materialize the cached PDF for `latex_content` at `dest_path`.
+
+        Returns:
+            bool: True on a cache hit, False if the document must be compiled
+        """
+        entry_path = self._entry_path(self.key_for(latex_content))
+        try:
+            if self._is_expired(entry_path):
+                os.remove(entry_path)
+                raise FileNotFoundError(entry_path)
+
+            size = os.path.getsize(entry_path)
+            _place_file(entry_path, dest_path)
+            # Record the access time explicitly so LRU eviction works on noatime mounts
+            os.utime(entry_path, (time.time(), os.path.getmtime(entry_path)))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+        return True
+
+    def store(self, latex_content, pdf_path):
+        """Add a freshly compiled PDF to the cache"""
+        entry_path = self._entry_path(self.key_for(latex_content))
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            # Always copy into the cache: the output file may be replaced later
+            shutil.copyfile(pdf_path, tmp_path)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"⚠️ Could not store PDF in compile cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        total = 0
+        with self._lock:
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith('.pdf'):
+                    continue
+                path = os.path.join(self.cache_dir, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if self.max_age and now - st.st_mtime > self.max_age:
+                    self._remove(path)
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+                total += st.st_size
+
+            entries.sort()
+            while entries and total > self.max_bytes:
+                _, size, path = entries.pop(0)
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            self.evictions += 1
+        except OSError:
+            pass
+
+    def stats(self):
+        """Return hit/miss counters and current cache size for monitoring"""
+        entries = 0
+        size = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.pdf'):
+                try:
+                    size += os.path.getsize(os.path.join(self.cache_dir, filename))
+                    entries += 1
+                except OSError:
+                    pass
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'evictions': self.evictions,
+                'entries': entries,
+                'size_bytes': size,
+                'max_bytes': self.max_bytes,
+                'max_age_seconds': self.max_age,
+            }
+
+
+def _place_file(src_path, dest_path):
+    """Hardlink (or copy, across filesystems) src to dest, replacing dest atomically"""
+    os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        try:
+            os.link(src_path, tmp_path)
+        except OSError:
+            shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
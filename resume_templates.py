@@ -0,0 +1,128 @@
+import os
+import threading
+
+import jinja2
+
+from latex_escape import clean_text_for_latex
+
+
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'latex_templates')
+
+# Style every other style falls back to for the templates it does not override
+DEFAULT_STYLE = 'jake'
+
+# Templates making up one resume, in document order (the body sections sit between preamble and footer)
+SECTION_TEMPLATES = (
+    'preamble', 'heading', 'summary', 'education', 'experience', 'projects',
+    'skills', 'certifications', 'awards', 'languages', 'custom_sections', 'footer',
+)
+
+
+class LatexRaw(str):
+    """A string that is already valid LaTeX and must not be escaped again"""
+
+
+def _finalize(value):
+    # Every \VAR{} is escaped unless it was marked raw
+    if isinstance(value, LatexRaw):
+        return value
+    return clean_text_for_latex(value)
+
+
+def _url(value):
+    value = value or ''
+    return LatexRaw(value if value.startswith('http') else 'https://' + value)
+
+
+def create_environment(template_folder=TEMPLATE_FOLDER, auto_reload=False):
+    """
+    Jinja2 environment with LaTeX-safe delimiters.
+
+    `{{ }}`/`{% %}` clash with LaTeX braces, so templates use \\VAR{...},
+    \\BLOCK{...} and \\#{...} instead. Output is escaped with
+    clean_text_for_latex by default; the `raw` filter opts out.
+    """
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_folder),
+        block_start_string='\\BLOCK{',
+        block_end_string='}',
+        variable_start_string='\\VAR{',
+        variable_end_string='}',
+        comment_start_string='\\#{',
+        comment_end_string='}',
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=False,
+        autoescape=False,
+        finalize=_finalize,
+        auto_reload=auto_reload,
+        cache_size=-1,
+        extensions=['jinja2.ext.do'],
+    )
+    env.filters['latex'] = lambda value: LatexRaw(clean_text_for_latex(value))
+    env.filters['raw'] = LatexRaw
+    env.filters['url'] = _url
+    env.tests['list'] = lambda value: isinstance(value, list)
+    return env
+
+
+class LatexTemplates:
+    """
+    Resume styles under `template_folder`, one directory per style.
+
+    Templates are compiled once by preload() and kept in the environment's
+    cache; with auto_reload (development) a template is recompiled when its
+    file's mtime changes. A style only needs the templates it changes, the
+    rest come from DEFAULT_STYLE.
+    """
+
+    def __init__(self, template_folder=TEMPLATE_FOLDER, auto_reload=False):
+        self.template_folder = template_folder
+        self.auto_reload = auto_reload
+        self.env = create_environment(template_folder, auto_reload)
+        self._sources = {}
+        self._sources_lock = threading.Lock()
+
+    def styles(self):
+        return sorted(
+            name for name in os.listdir(self.template_folder)
+            if os.path.isdir(os.path.join(self.template_folder, name))
+        )
+
+    def get(self, style, section):
+        return self.env.select_template([f'{style}/{section}.tex', f'{DEFAULT_STYLE}/{section}.tex'])
+
+    def preload(self):
+        """Compile every section template of every style; returns the number of templates"""
+        loaded = 0
+        for style in self.styles():
+            for section in SECTION_TEMPLATES:
+                self.get(style, section)
+                loaded += 1
+        return loaded
+
+    def render(self, style, section, **context):
+        return self.get(style, section).render(**context)
+
+    def static_source(self, path):
+        """
+        Contents of a plain (non-Jinja) template file such as 1.tex.
+
+        Read once and kept in memory; with auto_reload the file is re-read
+        when its mtime changes. Returns None if the file does not exist.
+        """
+        try:
+            mtime = os.path.getmtime(path) if self.auto_reload or path not in self._sources else None
+        except OSError:
+            return None
+
+        with self._sources_lock:
+            cached = self._sources.get(path)
+            if cached is not None and (mtime is None or cached[0] == mtime):
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        with self._sources_lock:
+            self._sources[path] = (mtime, source)
+        return source
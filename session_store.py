@@ -0,0 +1,297 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from db import connect
+
+
+class MemorySessionStore:
+    """
+    Per-process session state with LRU eviction and a TTL.
+
+    Values are kept JSON-encoded, so readers get their own copy (as with the
+    SQLite store) and the memory cap counts real bytes. Entries expire `ttl`
+    seconds after they were written; past `max_entries` entries or
+    `max_bytes` of values the least recently used ones are evicted.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, namespace, ttl=24 * 3600, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # key -> (value json, written_at)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+
+    def _expired(self, written_at, now):
+        return self.ttl and now - written_at > self.ttl
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def get(self, key, default=None):
+        """Return the value stored under `key`, or `default` if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1], now):
+                self._remove(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            self._stats['hits'] += 1
+            self._entries.move_to_end(key)
+            value = entry[0]
+        return json.loads(value)
+
+    def set(self, key, value):
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (encoded, time.time())
+            self._size += len(encoded)
+            self._stats['sets'] += 1
+            self._evict()
+
+    def update(self, key, fields):
+        """Merge `fields` into the dict stored under `key`; returns False if there is none"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1], time.time()):
+                return False
+            value = json.loads(entry[0])
+            value.update(fields)
+            encoded = json.dumps(value, ensure_ascii=False)
+            self._size += len(encoded) - len(entry[0])
+            # An update does not extend the entry's lifetime
+            self._entries[key] = (encoded, entry[1])
+            self._evict()
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _evict(self):
+        now = time.time()
+        while self._entries:
+            key, (_, written_at) = next(iter(self._entries.items()))
+            if self._expired(written_at, now):
+                self._stats['expirations'] += 1
+            elif len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._stats['evictions'] += 1
+            else:
+                break
+            self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, backend=self.backend, namespace=self.namespace, entries=len(self._entries),
+                        size_bytes=self._size, max_entries=self.max_entries, max_bytes=self.max_bytes,
+                        ttl_seconds=self.ttl)
+
+
+class SQLiteSessionStore:
+    """
+    Session state shared by every worker process through one SQLite table.
+
+    Same interface and limits as MemorySessionStore; each namespace is
+    evicted on its own. Triggers keep each namespace's entry count and size
+    in session_totals, so a write only looks at the oldest entries when the
+    namespace is over a cap, and then only at as many as it must drop.
+    Reads record their access time at most every `touch_interval` seconds,
+    so polling a session does not take the write lock each time; LRU order
+    is exact to within that interval. Counters are per process.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, db_path, namespace, ttl=24 * 3600, max_entries=10000, max_bytes=64 * 1024 * 1024,
+                 touch_interval=60):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+
+        conn = connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                written_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_session_state_access ON session_state (namespace, last_access)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_session_state_written ON session_state (namespace, written_at)')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_totals'").fetchone() is None:
+                conn.execute("""
+                    CREATE TABLE session_totals (
+                        namespace TEXT PRIMARY KEY,
+                        entries INTEGER NOT NULL,
+                        size INTEGER NOT NULL
+                    )
+                """)
+                # Databases from before the totals table already hold entries
+                conn.execute('INSERT INTO session_totals SELECT namespace, COUNT(*), SUM(size) FROM session_state GROUP BY namespace')
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_state_inserted AFTER INSERT ON session_state BEGIN
+                    INSERT INTO session_totals VALUES (new.namespace, 1, new.size)
+                    ON CONFLICT (namespace) DO UPDATE SET entries = entries + 1, size = size + new.size;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_state_deleted AFTER DELETE ON session_state BEGIN
+                    UPDATE session_totals SET entries = entries - 1, size = size - old.size WHERE namespace = old.namespace;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_state_resized AFTER UPDATE OF size ON session_state BEGIN
+                    UPDATE session_totals SET size = size + new.size - old.size WHERE namespace = new.namespace;
+                END
+            """)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key, default=None):
+        """Return the value stored under `key`, or `default` if it is missing or expired"""
+        conn = connect(self.db_path)
+        now = time.time()
+        row = conn.execute('SELECT value, written_at, last_access FROM session_state WHERE namespace = ? AND key = ?',
+                           (self.namespace, key)).fetchone()
+        if row is not None and self.ttl and now - row['written_at'] > self.ttl:
+            conn.execute('DELETE FROM session_state WHERE namespace = ? AND key = ?', (self.namespace, key))
+            self._count('expirations')
+            row = None
+        if row is None:
+            self._count('misses')
+            return default
+        self._count('hits')
+        if now - row['last_access'] >= self.touch_interval:
+            conn.execute('UPDATE session_state SET last_access = ? WHERE namespace = ? AND key = ?',
+                         (now, self.namespace, key))
+        return json.loads(row['value'])
+
+    def set(self, key, value):
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete would not fire the totals trigger
+        connect(self.db_path).execute(
+            'INSERT INTO session_state (namespace, key, value, size, written_at, last_access) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+            'written_at = excluded.written_at, last_access = excluded.last_access',
+            (self.namespace, key, encoded, len(encoded), now, now),
+        )
+        self._count('sets')
+        self.evict()
+
+    def update(self, key, fields):
+        """Merge `fields` into the dict stored under `key`; returns False if there is none"""
+        conn = connect(self.db_path)
+        # Read-modify-write under the write lock so concurrent updates from other workers are not lost
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT value, written_at FROM session_state WHERE namespace = ? AND key = ?',
+                               (self.namespace, key)).fetchone()
+            if row is None or (self.ttl and time.time() - row['written_at'] > self.ttl):
+                conn.execute('COMMIT')
+                return False
+            value = json.loads(row['value'])
+            value.update(fields)
+            encoded = json.dumps(value, ensure_ascii=False)
+            conn.execute('UPDATE session_state SET value = ?, size = ? WHERE namespace = ? AND key = ?',
+                         (encoded, len(encoded), self.namespace, key))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self.evict()
+        return True
+
+    def delete(self, key):
+        connect(self.db_path).execute('DELETE FROM session_state WHERE namespace = ? AND key = ?',
+                                      (self.namespace, key))
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones beyond the entry and size caps"""
+        conn = connect(self.db_path)
+        if self.ttl:
+            expired = conn.execute('DELETE FROM session_state WHERE namespace = ? AND written_at < ?',
+                                   (self.namespace, time.time() - self.ttl)).rowcount
+            if expired:
+                self._count('expirations', expired)
+        totals = conn.execute('SELECT entries, size FROM session_totals WHERE namespace = ?', (self.namespace,)).fetchone()
+        if totals is None:
+            return
+        excess_entries = totals['entries'] - self.max_entries
+        excess_bytes = totals['size'] - self.max_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+
+        # Walk the (namespace, last_access) index from the oldest entry only as far as the overflow
+        keys = []
+        freed = 0
+        oldest = conn.execute('SELECT key, size FROM session_state WHERE namespace = ? ORDER BY last_access',
+                              (self.namespace,))
+        for row in oldest:
+            if len(keys) >= excess_entries and freed >= excess_bytes:
+                break
+            keys.append(row['key'])
+            freed += row['size']
+        oldest.close()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            evicted = sum(conn.execute('DELETE FROM session_state WHERE namespace = ? AND key = ?',
+                                       (self.namespace, key)).rowcount for key in keys)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if evicted:
+            self._count('evictions', evicted)
+
+    def stats(self):
+        row = connect(self.db_path).execute(
+            'SELECT entries, size FROM session_totals WHERE namespace = ?', (self.namespace,),
+        ).fetchone()
+        with self._lock:
+            return dict(self._stats, backend=self.backend, namespace=self.namespace,
+                        entries=row['entries'] if row else 0, size_bytes=row['size'] if row else 0,
+                        max_entries=self.max_entries, max_bytes=self.max_bytes, ttl_seconds=self.ttl,
+                        touch_interval=self.touch_interval)
+
+
+def create_session_store(backend, namespace, db_path=None, **limits):
+    """Build the store for `namespace`: 'sqlite' shares state across worker processes, 'memory' does not"""
+    if backend == 'memory':
+        return MemorySessionStore(namespace, **limits)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(db_path, namespace, **limits)
+    raise ValueError(f"Unknown session store backend: {backend}")
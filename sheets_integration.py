@@ -1,40 +1,160 @@
+import argparse
 import os
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-import pickle
+import google_auth_httplib2
+import httplib2
 import json
+import random
+import threading
+import uuid
 from datetime import datetime
+from google_credentials import GoogleCredentials
 
-# If modifying these scopes, delete the file token.pickle.
+# If modifying these scopes, delete token.pickle and run `python -m google_credentials login` again.
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
-def get_google_sheets_service():
-    """Get or create Google Sheets service with credentials."""
-    creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+# Timeout and retry budget for Sheets API calls
+SHEETS_TIMEOUT = int(os.getenv('SHEETS_TIMEOUT', 30))
+SHEETS_NUM_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+
+# Credentials are loaded and refreshed in the background; nothing here opens a browser
+credentials = GoogleCredentials(
+    SCOPES,
+    service_account_file=os.getenv('GOOGLE_SERVICE_ACCOUNT_FILE'),
+    token_file=os.getenv('GOOGLE_TOKEN_FILE', 'token.pickle'),
+    refresh_margin=int(os.getenv('GOOGLE_TOKEN_REFRESH_MARGIN', 300)),
+)
+
+# One Sheets service per process, rebuilt when the credentials object is replaced
+_service = None
+_service_pid = None
+_service_creds = None
+_service_lock = threading.Lock()
 
-    return build('sheets', 'v4', credentials=creds)
+def get_google_sheets_service(wait=0):
+    """
+    Get this process's Google Sheets service, building it on first use.
+    
+    Raises CredentialsUnavailable when no valid token is loaded; `wait` seconds
+    may be spent waiting for the first load in a freshly started process.
+    """
+    global _service, _service_pid, _service_creds
+    creds = credentials.get(wait)
+    with _service_lock:
+        # httplib2 connections do not survive fork, so every gunicorn worker builds its own
+        if _service is None or _service_pid != os.getpid() or _service_creds is not creds:
+            # The discovery client speaks httplib2, so give it the same timeout as other outbound calls
+            authorized_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=SHEETS_TIMEOUT))
+            _service = build('sheets', 'v4', http=authorized_http, cache_discovery=False)
+            _service_pid = os.getpid()
+            _service_creds = creds
+        return _service
+
+def _cell_text(value):
+    """Cell text for a CV field; lists such as experience descriptions become one line per item"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(_cell_text(item) for item in value if item)
+    return str(value)
+
+def cv_to_rows(cv_data, timestamp=None):
+    """
+    Rows written to the sheet for one CV: basic info, education, experience and skills blocks.
+    
+    Args:
+        cv_data (dict): The parsed CV data
+        timestamp (str): When the CV was received (defaults to now)
+    
+    Returns:
+        list: Rows of cell values
+    """
+    timestamp = timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Basic information
+    basic_info = [
+        timestamp,
+        cv_data.get('name', ''),
+        cv_data.get('email', ''),
+        cv_data.get('phone', ''),
+        cv_data.get('linkedin', ''),
+        cv_data.get('github', ''),
+        cv_data.get('website', ''),
+        cv_data.get('address', '')
+    ]
+    
+    # Education
+    education_rows = []
+    for edu in cv_data.get('education', []):
+        education_rows.append([
+            edu.get('degree', ''),
+            edu.get('institution', ''),
+            edu.get('date', ''),
+            edu.get('location', ''),
+            edu.get('gpa', ''),
+            edu.get('details', '')
+        ])
+    
+    # Experience
+    experience_rows = []
+    for exp in cv_data.get('experience', []):
+        experience_rows.append([
+            exp.get('title', ''),
+            exp.get('company', ''),
+            exp.get('date', ''),
+            exp.get('location', ''),
+            _cell_text(exp.get('description', ''))
+        ])
+    
+    # Skills
+    skills = cv_data.get('skills', {})
+    skills_row = [
+        ', '.join(skills.get('languages', [])),
+        ', '.join(skills.get('frameworks', [])),
+        ', '.join(skills.get('tools', [])),
+        ', '.join(skills.get('databases', [])),
+        ', '.join(skills.get('other', []))
+    ]
+    
+    return [
+        ['Timestamp', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 'Website', 'Address'],
+        basic_info,
+        [''],
+        ['Education'],
+        ['Degree', 'Institution', 'Date', 'Location', 'GPA', 'Details']
+    ] + education_rows + [
+        [''],
+        ['Experience'],
+        ['Title', 'Company', 'Date', 'Location', 'Description']
+    ] + experience_rows + [
+        [''],
+        ['Skills'],
+        ['Languages', 'Frameworks', 'Tools', 'Databases', 'Other'],
+        skills_row
+    ]
+
+def append_rows(spreadsheet_id, values, service=None):
+    """
+    Append rows to Sheet1 in one values().append call.
+    
+    Returns:
+        int: Number of rows the API reports as written
+    
+    Raises whatever the Sheets client raises once its own retries are used up.
+    """
+    service = service or get_google_sheets_service()
+    result = service.spreadsheets().values().append(
+        spreadsheetId=spreadsheet_id,
+        range='Sheet1!A1',  # Start from A1
+        valueInputOption='RAW',
+        insertDataOption='INSERT_ROWS',
+        body={'values': values}
+    ).execute(num_retries=SHEETS_NUM_RETRIES)
+    return result.get('updates', {}).get('updatedRows', 0)
 
 def save_cv_to_sheets(cv_data, spreadsheet_id):
     """
-    Save CV data to Google Sheets.
+    Save CV data to Google Sheets right away (uploads go through the SheetsOutbox instead).
     
     Args:
         cv_data (dict): The parsed CV data
@@ -44,90 +164,289 @@ def save_cv_to_sheets(cv_data, spreadsheet_id):
         bool: True if successful, False otherwise
     """
     try:
-        service = get_google_sheets_service()
-        
-        # Prepare the data for the sheet
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Basic information
-        basic_info = [
-            timestamp,
-            cv_data.get('name', ''),
-            cv_data.get('email', ''),
-            cv_data.get('phone', ''),
-            cv_data.get('linkedin', ''),
-            cv_data.get('github', ''),
-            cv_data.get('website', ''),
-            cv_data.get('address', '')
-        ]
-        
-        # Education
-        education_rows = []
-        for edu in cv_data.get('education', []):
-            education_rows.append([
-                edu.get('degree', ''),
-                edu.get('institution', ''),
-                edu.get('date', ''),
-                edu.get('location', ''),
-                edu.get('gpa', ''),
-                edu.get('details', '')
-            ])
-        
-        # Experience
-        experience_rows = []
-        for exp in cv_data.get('experience', []):
-            experience_rows.append([
-                exp.get('title', ''),
-                exp.get('company', ''),
-                exp.get('date', ''),
-                exp.get('location', ''),
-                exp.get('description', '')
-            ])
-        
-        # Skills
-        skills = cv_data.get('skills', {})
-        skills_row = [
-            ', '.join(skills.get('languages', [])),
-            ', '.join(skills.get('frameworks', [])),
-            ', '.join(skills.get('tools', [])),
-            ', '.join(skills.get('databases', [])),
-            ', '.join(skills.get('other', []))
-        ]
-        
-        # Prepare the batch update
-        values = [
-            ['Timestamp', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 'Website', 'Address'],
-            basic_info,
-            [''],
-            ['Education'],
-            ['Degree', 'Institution', 'Date', 'Location', 'GPA', 'Details']
-        ] + education_rows + [
-            [''],
-            ['Experience'],
-            ['Title', 'Company', 'Date', 'Location', 'Description']
-        ] + experience_rows + [
-            [''],
-            ['Skills'],
-            ['Languages', 'Frameworks', 'Tools', 'Databases', 'Other'],
-            skills_row
-        ]
-        
-        body = {
-            'values': values
-        }
-        
-        # Append the data to the sheet
-        result = service.spreadsheets().values().append(
-            spreadsheetId=spreadsheet_id,
-            range='Sheet1!A1',  # Start from A1
-            valueInputOption='RAW',
-            insertDataOption='INSERT_ROWS',
-            body=body
-        ).execute()
-        
-        print(f"✅ CV data saved to Google Sheets: {result.get('updates', {}).get('updatedRows', 0)} rows updated")
+        updated_rows = append_rows(spreadsheet_id, cv_to_rows(cv_data))
+        print(f"✅ CV data saved to Google Sheets: {updated_rows} rows updated")
         return True
         
     except Exception as e:
         print(f"❌ Error saving CV data to Google Sheets: {e}")
-        return False 
+        return False
+
+# Export layouts. 'blocks' appends the ~20-row block of save_cv_to_sheets per CV to Sheet1;
+# 'columnar' writes one row per CV to the CVs tab and one row per education/experience entry
+# to the Entries tab, keyed by CV ID, so the sheet grows with the number of CVs.
+SHEETS_LAYOUTS = ('blocks', 'columnar')
+CV_TAB = 'CVs'
+ENTRIES_TAB = 'Entries'
+CV_COLUMNS = [
+    'CV ID', 'Timestamp', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 'Website', 'Address', 'Summary',
+    'Latest Title', 'Latest Company', 'Degree', 'Institution', 'Education Entries', 'Experience Entries',
+    'Languages', 'Frameworks', 'Tools', 'Libraries', 'Databases', 'Other Skills',
+]
+ENTRY_COLUMNS = ['CV ID', 'Type', 'Position', 'Title', 'Organization', 'Date', 'Location', 'GPA', 'Details']
+TAB_HEADERS = {CV_TAB: CV_COLUMNS, ENTRIES_TAB: ENTRY_COLUMNS}
+
+# sheetId of each tab per (spreadsheet, title); appendCells addresses tabs by ID
+_sheet_ids = {}
+
+def cv_to_columnar(cv_data, cv_id, timestamp=None):
+    """
+    The columnar export of one CV.
+    
+    Returns:
+        dict: {'CVs': [one row], 'Entries': [one row per education and experience entry]}
+    """
+    timestamp = timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    education = cv_data.get('education') or []
+    experience = cv_data.get('experience') or []
+    skills = cv_data.get('skills') or {}
+    first_job = experience[0] if experience else {}
+    first_school = education[0] if education else {}
+    
+    cv_row = [cv_id, timestamp] + [_cell_text(cv_data.get(key)) for key in
+                                   ('name', 'email', 'phone', 'linkedin', 'github', 'website', 'address', 'summary')]
+    cv_row += [
+        _cell_text(first_job.get('title')),
+        _cell_text(first_job.get('company')),
+        _cell_text(first_school.get('degree')),
+        _cell_text(first_school.get('institution')),
+        len(education),
+        len(experience),
+    ]
+    cv_row += [', '.join(skills.get(key) or []) for key in ('languages', 'frameworks', 'tools', 'libraries', 'databases', 'other')]
+    
+    entry_rows = []
+    for position, edu in enumerate(education, 1):
+        entry_rows.append([cv_id, 'education', position, _cell_text(edu.get('degree')), _cell_text(edu.get('institution')),
+                           _cell_text(edu.get('date')), _cell_text(edu.get('location')), _cell_text(edu.get('gpa')),
+                           _cell_text(edu.get('details'))])
+    for position, exp in enumerate(experience, 1):
+        entry_rows.append([cv_id, 'experience', position, _cell_text(exp.get('title')), _cell_text(exp.get('company')),
+                           _cell_text(exp.get('date')), _cell_text(exp.get('location')), '',
+                           _cell_text(exp.get('description'))])
+    return {CV_TAB: [cv_row], ENTRIES_TAB: entry_rows}
+
+def export_payload(cv_data, layout='blocks', cv_id=None, timestamp=None):
+    """The SheetsOutbox payload exporting one CV in `layout`"""
+    if layout == 'columnar':
+        return {'layout': 'columnar', 'tabs': cv_to_columnar(cv_data, cv_id or str(uuid.uuid4()), timestamp)}
+    return {'layout': 'blocks', 'rows': cv_to_rows(cv_data, timestamp)}
+
+def _row_data(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append({'userEnteredValue': {'numberValue': value}})
+        elif value in ('', None):
+            cells.append({})  # Leaves the cell blank and keeps the request small
+        else:
+            cells.append({'userEnteredValue': {'stringValue': _cell_text(value)}})
+    return {'values': cells}
+
+def _tab_ids(service, spreadsheet_id, titles, create=True):
+    """
+    sheetIds of the `titles` tabs, creating the missing ones unless `create` is False.
+    
+    A new tab and its frozen header row are added in the same batchUpdate,
+    which the API applies atomically, so a tab never exists without its header.
+    
+    Returns:
+        dict: {title: sheetId} of the tabs that exist
+    """
+    if any((spreadsheet_id, title) not in _sheet_ids for title in titles):
+        spreadsheet = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields='sheets.properties(sheetId,title)'
+        ).execute(num_retries=SHEETS_NUM_RETRIES)
+        for sheet in spreadsheet.get('sheets', []):
+            _sheet_ids[(spreadsheet_id, sheet['properties']['title'])] = sheet['properties']['sheetId']
+        missing = [title for title in titles if (spreadsheet_id, title) not in _sheet_ids]
+        if missing and create:
+            # The header rows have to address the new tabs, so their sheetIds are chosen here
+            used = {sheet_id for (cached_spreadsheet, _), sheet_id in _sheet_ids.items() if cached_spreadsheet == spreadsheet_id}
+            requests = []
+            for title in missing:
+                sheet_id = random.randint(1, 2 ** 31 - 1)
+                while sheet_id in used:
+                    sheet_id = random.randint(1, 2 ** 31 - 1)
+                used.add(sheet_id)
+                requests.append({'addSheet': {'properties': {'sheetId': sheet_id, 'title': title, 'gridProperties': {'frozenRowCount': 1}}}})
+                if title in TAB_HEADERS:
+                    requests.append({'appendCells': {'sheetId': sheet_id, 'rows': [_row_data(TAB_HEADERS[title])], 'fields': 'userEnteredValue'}})
+            service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={'requests': requests}).execute(
+                num_retries=SHEETS_NUM_RETRIES)
+            for request in requests:
+                if 'addSheet' in request:
+                    properties = request['addSheet']['properties']
+                    _sheet_ids[(spreadsheet_id, properties['title'])] = properties['sheetId']
+    return {title: _sheet_ids[(spreadsheet_id, title)] for title in titles if (spreadsheet_id, title) in _sheet_ids}
+
+def write_columnar(spreadsheet_id, tabs, service=None):
+    """
+    Append rows to the columnar tabs with a single batchUpdate of appendCells requests.
+    
+    Args:
+        tabs (dict): Rows per tab title, e.g. {'CVs': [...], 'Entries': [...]}
+    
+    Returns:
+        int: Number of rows written
+    """
+    service = service or get_google_sheets_service()
+    tabs = {title: rows for title, rows in tabs.items() if rows}
+    if not tabs:
+        return 0
+    try:
+        sheet_ids = _tab_ids(service, spreadsheet_id, list(tabs))
+        requests = [{'appendCells': {
+            'sheetId': sheet_ids[title],
+            'rows': [_row_data(row) for row in rows],
+            'fields': 'userEnteredValue',
+        }} for title, rows in tabs.items()]
+        service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={'requests': requests}).execute(
+            num_retries=SHEETS_NUM_RETRIES)
+    except Exception:
+        # A tab may have been renamed or deleted; look the IDs up again on the next attempt
+        for key in [key for key in _sheet_ids if key[0] == spreadsheet_id]:
+            del _sheet_ids[key]
+        raise
+    return sum(len(rows) for rows in tabs.values())
+
+def write_payloads(spreadsheet_id, payloads, service=None):
+    """
+    Write queued export payloads: all 'blocks' payloads in one values().append and
+    all 'columnar' ones in one batchUpdate. Plain row lists (outbox entries queued
+    before layouts existed) are written as blocks.
+    
+    Returns:
+        int: Number of rows written
+    """
+    block_rows = []
+    tabs = {}
+    for payload in payloads:
+        if isinstance(payload, list):
+            block_rows.extend(payload)
+        elif payload.get('layout') == 'columnar':
+            for title, rows in payload['tabs'].items():
+                tabs.setdefault(title, []).extend(rows)
+        else:
+            block_rows.extend(payload['rows'])
+    
+    # Only the outbox flusher and the CLI write payloads, so waiting for a freshly started refresher is fine
+    service = service or get_google_sheets_service(wait=SHEETS_TIMEOUT)
+    written = 0
+    if block_rows:
+        written += append_rows(spreadsheet_id, block_rows, service=service)
+    if tabs:
+        written += write_columnar(spreadsheet_id, tabs, service=service)
+    return written
+
+def parse_block_rows(values):
+    """
+    Read CVs back from rows written in the 'blocks' layout.
+    
+    Returns:
+        list: (timestamp, cv_data) per CV block, in sheet order
+    """
+    cvs = []
+    cv_data = None
+    section = None
+    index = 0
+    while index < len(values):
+        row = [_cell_text(cell) for cell in values[index]]
+        index += 1
+        if row[:2] == ['Timestamp', 'Name']:
+            basic = (values[index] if index < len(values) else []) + [''] * 8
+            index += 1
+            cv_data = {key: _cell_text(value) for key, value in zip(
+                ('name', 'email', 'phone', 'linkedin', 'github', 'website', 'address'), basic[1:8])}
+            cv_data.update(education=[], experience=[], skills={})
+            cvs.append((_cell_text(basic[0]), cv_data))
+            section = None
+            continue
+        if cv_data is None or not any(row):
+            continue
+        if len(row) == 1 and row[0] in ('Education', 'Experience', 'Skills'):
+            section = row[0].lower()
+            index += 1  # Column header row
+            continue
+        row += [''] * 6
+        if section == 'education':
+            cv_data['education'].append(dict(zip(('degree', 'institution', 'date', 'location', 'gpa', 'details'), row)))
+        elif section == 'experience':
+            entry = dict(zip(('title', 'company', 'date', 'location'), row))
+            entry['description'] = [line for line in row[4].split('\n') if line.strip()]
+            cv_data['experience'].append(entry)
+        elif section == 'skills':
+            cv_data['skills'] = {key: [item.strip() for item in value.split(',') if item.strip()]
+                                 for key, value in zip(('languages', 'frameworks', 'tools', 'databases', 'other'), row)}
+            section = None
+    return cvs
+
+def _migrated_cv_ids(service, spreadsheet_id):
+    """CV IDs already in the CVs tab (an empty set while the tab does not exist)"""
+    if CV_TAB not in _tab_ids(service, spreadsheet_id, [CV_TAB], create=False):
+        return set()
+    values = service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=f"'{CV_TAB}'!A2:A"
+    ).execute(num_retries=SHEETS_NUM_RETRIES).get('values', [])
+    return {row[0] for row in values if row}
+
+def migrate_blocks_to_columnar(spreadsheet_id, source_range='Sheet1', batch_size=200, dry_run=False, clear=False):
+    """
+    Rewrite CVs exported in the 'blocks' layout into the columnar tabs.
+    
+    CV IDs are derived from each block's timestamp, name and email, so the
+    same CV always gets the same ID; CVs whose ID is already in the CVs tab
+    are skipped, which makes an interrupted migration safe to run again. A
+    CV's row and its entries go out in the same batchUpdate. The source range
+    is only cleared when `clear` is set and every batch was written.
+    
+    Returns:
+        int: Number of CVs found in the source range
+    """
+    service = get_google_sheets_service(wait=SHEETS_TIMEOUT)
+    values = service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=source_range
+    ).execute(num_retries=SHEETS_NUM_RETRIES).get('values', [])
+    cvs = parse_block_rows(values)
+    migrated = _migrated_cv_ids(service, spreadsheet_id)
+    pending = []
+    for timestamp, cv_data in cvs:
+        cv_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{timestamp}|{cv_data['name']}|{cv_data['email']}"))
+        if cv_id not in migrated:
+            migrated.add(cv_id)  # the same block exported twice is migrated once
+            pending.append((cv_id, timestamp, cv_data))
+    print(f"📄 Found {len(cvs)} CVs in {len(values)} rows of {source_range}, {len(pending)} not migrated yet")
+    if dry_run:
+        return len(cvs)
+    
+    for start in range(0, len(pending), batch_size):
+        tabs = {}
+        for cv_id, timestamp, cv_data in pending[start:start + batch_size]:
+            for title, rows in cv_to_columnar(cv_data, cv_id, timestamp).items():
+                tabs.setdefault(title, []).extend(rows)
+        written = write_columnar(spreadsheet_id, tabs, service=service)
+        print(f"✅ Wrote CVs {start + 1}-{min(start + batch_size, len(pending))} ({written} rows)")
+    
+    if clear and cvs:
+        service.spreadsheets().values().clear(spreadsheetId=spreadsheet_id, range=source_range, body={}).execute(
+            num_retries=SHEETS_NUM_RETRIES)
+        print(f"🧹 Cleared {source_range}")
+    return len(cvs)
+
+def main():
+    parser = argparse.ArgumentParser(description='Google Sheets export tools')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    migrate = subcommands.add_parser('migrate', help='Rewrite the blocks layout into the columnar CVs/Entries tabs')
+    migrate.add_argument('--spreadsheet', default=os.getenv('GOOGLE_SHEETS_SPREADSHEET_ID'), help='spreadsheet ID')
+    migrate.add_argument('--source', default='Sheet1', help='range holding the blocks layout')
+    migrate.add_argument('--batch-size', type=int, default=200, help='CVs per batchUpdate')
+    migrate.add_argument('--dry-run', action='store_true', help='only count the CVs that would be migrated')
+    migrate.add_argument('--clear', action='store_true', help='clear the source range after migrating')
+    args = parser.parse_args()
+    
+    if not args.spreadsheet:
+        parser.error('--spreadsheet or GOOGLE_SHEETS_SPREADSHEET_ID is required')
+    migrate_blocks_to_columnar(args.spreadsheet, args.source, args.batch_size, args.dry_run, args.clear)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import threading
+import time
+
+from db import connect
+
+
+class SheetsOutbox:
+    """
+    Durable queue of CV exports waiting to be written to Google Sheets.
+
+    Requests only insert a JSON payload into a SQLite table; a flusher
+    thread (started lazily in each process) wakes every `flush_interval`
+    seconds, leases up to `max_batch` due entries and hands all of their
+    payloads to a single `write_fn(spreadsheet_id, payloads)` call per
+    spreadsheet, which returns the number of rows written. A failed flush
+    is retried with exponential backoff; after `max_attempts` the entries
+    are kept as failed for inspection. Leases let every gunicorn worker run
+    a flusher without sending the same entry twice: they are renewed every
+    `lease / 3` seconds while a flush is writing, however long its retries
+    take, and an entry leased by a worker that died is picked up again once
+    its lease runs out.
+    """
+
+    def __init__(self, db_path, write_fn, flush_interval=10, max_batch=100, max_attempts=8,
+                 backoff_base=5, backoff_max=600, lease=120):
+        self.db_path = db_path
+        self.write_fn = write_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+
+        self._flusher_pid = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'flushes': 0, 'sent_entries': 0, 'sent_rows': 0, 'failed_flushes': 0, 'last_error': None}
+
+        conn = connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sheets_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spreadsheet_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                leased_until REAL NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        """)
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(sheets_outbox)')]
+        if 'rows' in columns:
+            # The first version stored plain row lists; write_fn still accepts those payloads
+            conn.execute('ALTER TABLE sheets_outbox RENAME COLUMN rows TO payload')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_sheets_outbox_due ON sheets_outbox (next_attempt_at)')
+
+    def enqueue(self, spreadsheet_id, payload):
+        """Queue a JSON-serializable export `payload` for the spreadsheet; returns the outbox entry ID"""
+        now = time.time()
+        entry_id = connect(self.db_path).execute(
+            'INSERT INTO sheets_outbox (spreadsheet_id, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?)',
+            (spreadsheet_id, json.dumps(payload, ensure_ascii=False), now, now),
+        ).lastrowid
+        with self._lock:
+            self._stats['enqueued'] += 1
+        self.start()
+        return entry_id
+
+    def start(self):
+        """Start this process's flusher if it is not running, so entries queued before a restart are sent"""
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork, so start them lazily in each process
+        if self._flusher_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_loop, name='sheets-outbox', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                while self.flush() == self.max_batch:
+                    pass  # A full batch means more may be due right away
+            except Exception as e:
+                print(f"❌ Sheets outbox flush failed: {e}")
+
+    def _lease_due(self):
+        conn = connect(self.db_path)
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            entries = conn.execute(
+                'SELECT id, spreadsheet_id, payload, attempts FROM sheets_outbox '
+                'WHERE next_attempt_at <= ? AND leased_until < ? AND attempts < ? ORDER BY id LIMIT ?',
+                (now, now, self.max_attempts, self.max_batch),
+            ).fetchall()
+            if entries:
+                conn.execute(
+                    f"UPDATE sheets_outbox SET leased_until = ? WHERE id IN ({','.join('?' * len(entries))})",
+                    (now + self.lease, *(entry['id'] for entry in entries)),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return entries
+
+    def _renew_leases(self, ids, done):
+        # Entries released after a failed write (leased_until = 0) or deleted after a good one are left alone
+        placeholders = ','.join('?' * len(ids))
+        while not done.wait(max(0.05, self.lease / 3)):
+            try:
+                connect(self.db_path).execute(
+                    f'UPDATE sheets_outbox SET leased_until = ? WHERE leased_until > 0 AND id IN ({placeholders})',
+                    (time.time() + self.lease, *ids),
+                )
+            except Exception as e:
+                print(f"⚠️ Could not renew Sheets outbox leases: {e}")
+
+    def flush(self):
+        """Send every due entry now, one write per spreadsheet; returns how many entries were leased"""
+        entries = self._lease_due()
+        if not entries:
+            return 0
+        done = threading.Event()
+        threading.Thread(target=self._renew_leases, args=([entry['id'] for entry in entries], done),
+                         name='sheets-outbox-lease', daemon=True).start()
+        try:
+            self._write(entries)
+        finally:
+            done.set()
+        return len(entries)
+
+    def _write(self, entries):
+        by_spreadsheet = {}
+        for entry in entries:
+            by_spreadsheet.setdefault(entry['spreadsheet_id'], []).append(entry)
+
+        conn = connect(self.db_path)
+        for spreadsheet_id, batch in by_spreadsheet.items():
+            ids = [entry['id'] for entry in batch]
+            placeholders = ','.join('?' * len(ids))
+            payloads = [json.loads(entry['payload']) for entry in batch]
+            try:
+                written_rows = self.write_fn(spreadsheet_id, payloads) or 0
+            except Exception as e:
+                attempts = batch[0]['attempts'] + 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                conn.execute(
+                    f'UPDATE sheets_outbox SET attempts = attempts + 1, next_attempt_at = ?, leased_until = 0, '
+                    f'last_error = ? WHERE id IN ({placeholders})',
+                    (time.time() + delay, str(e)[:500], *ids),
+                )
+                print(f"⚠️ Sheets export of {len(batch)} CVs failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+                with self._lock:
+                    self._stats['failed_flushes'] += 1
+                    self._stats['last_error'] = str(e)[:500]
+                continue
+
+            conn.execute(f'DELETE FROM sheets_outbox WHERE id IN ({placeholders})', ids)
+            print(f"✅ Exported {len(batch)} CVs ({written_rows} rows) to Google Sheets")
+            with self._lock:
+                self._stats['flushes'] += 1
+                self._stats['sent_entries'] += len(batch)
+                self._stats['sent_rows'] += written_rows
+
+    def stats(self):
+        self.start()
+        row = connect(self.db_path).execute(
+            'SELECT COUNT(*) AS entries, COALESCE(SUM(attempts >= ?), 0) AS failed, MIN(created_at) AS oldest '
+            'FROM sheets_outbox',
+            (self.max_attempts,),
+        ).fetchone()
+        with self._lock:
+            return dict(self._stats,
+                        pending=row['entries'] - row['failed'],
+                        failed=row['failed'],
+                        oldest_age_seconds=round(time.time() - row['oldest'], 1) if row['oldest'] else 0,
+                        flush_interval=self.flush_interval, max_batch=self.max_batch, lease=self.lease)
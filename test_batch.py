@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+
+from batch import BatchConverter, BatchJobs, read_zip
+from test_text_extraction import make_docx, make_pdf
+
+
+def _zip(members):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return out.getvalue()
+
+
+def test_read_zip_skips_unsupported_and_excess_files():
+    data = _zip({'a.pdf': b'1', 'b.docx': b'2', 'notes.txt': b'3', '__MACOSX/._a.pdf': b'4', 'c.pdf': b'5', 'big.pdf': b'x' * 20})
+    documents, skipped = read_zip(data, max_files=2, max_file_bytes=10)
+    assert documents == [('a.pdf', b'1'), ('b.docx', b'2')]
+    assert [(entry['file'], entry['error']) for entry in skipped] == [
+        ('notes.txt', 'Not a PDF or DOCX file'),
+        ('c.pdf', 'Batch limit of 2 files reached'),
+        ('big.pdf', 'Batch limit of 2 files reached'),
+    ]
+
+
+def test_batch_streams_resumes_and_manifest(tmp_path):
+    saved = {}
+
+    def save(cv_id, parsed_data, metadata):
+        saved[cv_id] = (parsed_data, metadata)
+        return True
+
+    def compile_pdf(latex, pdf_filename):
+        if 'Broken' in latex:
+            return False
+        (tmp_path / pdf_filename).write_bytes(b'%PDF ' + latex.encode())
+        return True
+
+    converter = BatchConverter(
+        parse_fn=lambda text: {'name': text.split('\n')[0]},
+        render_fn=lambda parsed_data, style: f"{style}: {parsed_data['name']}",
+        save_fn=save,
+        compile_fn=compile_pdf,
+        output_folder=str(tmp_path),
+        extract_workers=1,
+        gemini_workers=2,
+    )
+    documents = [
+        ('cohort/Jane Doe.docx', make_docx(['Jane Doe', 'Python developer'])),
+        ('cohort/john.pdf', make_pdf([['John Smith - Data Engineer with SQL and Spark']])),
+        ('broken.docx', make_docx(['Broken Resume'])),
+        ('empty.pdf', b'not a pdf'),
+    ]
+    try:
+        archive_bytes = b''.join(converter.stream_zip(documents, 'jake', skipped=[{'file': 'x.txt', 'status': 'skipped'}]))
+    finally:
+        converter.close()
+
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        manifest = {entry['file']: entry for entry in json.loads(archive.read('manifest.json'))}
+        assert archive.read('Jane_Doe.tex') == b'jake: Jane Doe'
+        assert archive.read('Jane_Doe.pdf') == b'%PDF jake: Jane Doe'
+        assert archive.read('john.tex').startswith(b'jake: John Smith')
+        assert 'broken.pdf' not in archive.namelist()
+
+    assert manifest['cohort/Jane Doe.docx']['status'] == 'ok'
+    assert manifest['broken.docx']['status'] == 'no_pdf'
+    assert manifest['broken.docx']['tex_file'] == 'broken.tex'
+    assert manifest['empty.pdf']['status'] == 'failed'
+    assert manifest['empty.pdf']['stage'] == 'extract'
+    assert manifest['x.txt']['status'] == 'skipped'
+
+    cv_id = manifest['cohort/Jane Doe.docx']['cv_id']
+    assert saved[cv_id] == ({'name': 'Jane Doe'}, {'source': 'batch', 'original_filename': 'cohort/Jane Doe.docx', 'style': 'jake'})
+    assert os.path.exists(tmp_path / f'resume_{cv_id}.tex')
+    stats = converter.stats()
+    assert (stats['documents'], stats['ok'], stats['no_pdf'], stats['failed']) == (4, 2, 1, 1)
+
+
+def _converter(tmp_path, compile_fn, **kwargs):
+    return BatchConverter(
+        parse_fn=lambda text: {'name': text.split('\n')[0]},
+        render_fn=lambda parsed_data, style: f"{style}: {parsed_data['name']}",
+        save_fn=lambda cv_id, parsed_data, metadata: True,
+        compile_fn=compile_fn,
+        output_folder=str(tmp_path),
+        extract_workers=1,
+        **kwargs,
+    )
+
+
+def test_hung_documents_are_reported_as_timed_out(tmp_path):
+    release = threading.Event()
+
+    def compile_pdf(latex, pdf_filename):
+        if 'Stuck' in latex:
+            release.wait(5)
+            return False
+        return True
+
+    converter = _converter(tmp_path, compile_pdf, result_timeout=1)
+    documents = [('ok.docx', make_docx(['Jane Doe'])), ('stuck.docx', make_docx(['Stuck Resume']))]
+    try:
+        results = {result['file']: result for result in converter.convert(documents, 'jake')}
+    finally:
+        release.set()
+        converter.close()
+
+    assert results['ok.docx']['status'] == 'ok'
+    assert (results['stuck.docx']['status'], results['stuck.docx']['stage']) == ('failed', 'timeout')
+
+
+def test_batch_jobs_build_the_zip_in_the_background(tmp_path):
+    release = threading.Event()
+
+    def compile_pdf(latex, pdf_filename):
+        release.wait(5)
+        (tmp_path / pdf_filename).write_bytes(b'%PDF')
+        return True
+
+    converter = _converter(tmp_path, compile_pdf)
+    jobs = BatchJobs(str(tmp_path / 'batch_jobs.sqlite3'), converter)
+    try:
+        batch_id = jobs.submit([('a.docx', make_docx(['Jane Doe'])), ('b.docx', make_docx(['John Smith']))], 'jake',
+                               skipped=[{'file': 'x.txt', 'status': 'skipped'}])
+        job = jobs.get(batch_id)
+        assert (job['status'], job['total'], job['skipped']) == ('running', 2, 1)
+
+        release.set()
+        deadline = time.monotonic() + 10
+        while jobs.get(batch_id)['status'] == 'running' and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        converter.close()
+
+    job = jobs.get(batch_id)
+    assert (job['status'], job['completed'], job['ok'], job['failed']) == ('done', 2, 2, 0)
+    with zipfile.ZipFile(tmp_path / job['zip_filename']) as archive:
+        manifest = json.loads(archive.read('manifest.json'))
+    assert sorted(entry['file'] for entry in manifest) == ['a.docx', 'b.docx', 'x.txt']
+    assert not os.path.exists(tmp_path / f"{job['zip_filename']}.tmp")
+    assert jobs.get('missing') is None and jobs.stats() == {'done': 1}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import time
+
+from compile_jobs import CompileJobQueue
+from db import connect
+
+
+def _wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_jobs_run_in_background_and_report_status(tmp_path):
+    """Submitted jobs are compiled by worker threads and their outcome is persisted"""
+    compiled = []
+
+    def fake_compile(latex_content, pdf_filename):
+        compiled.append(pdf_filename)
+        return 'broken' not in latex_content
+
+    queue = CompileJobQueue(str(tmp_path / 'jobs.sqlite3'), fake_compile, concurrency=1, poll_interval=0.05)
+    ok_id = queue.submit('\\documentclass{article}', 'ok.pdf')
+    bad_id = queue.submit('broken', 'bad.pdf')
+
+    assert _wait_for(queue, ok_id)['status'] == 'done'
+    failed = _wait_for(queue, bad_id)
+    assert failed['status'] == 'failed'
+    assert failed['error'] == 'PDF compilation failed'
+    assert compiled == ['ok.pdf', 'bad.pdf']
+    assert queue.get('missing') is None
+
+
+def test_orphaned_running_jobs_are_requeued(tmp_path):
+    """A job left running by a worker process that no longer exists is picked up again"""
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    queue = CompileJobQueue(db_path, lambda latex, filename: True, concurrency=1, poll_interval=0.05)
+    connect(db_path).execute(
+        "INSERT INTO compile_jobs (id, status, latex_content, pdf_filename, attempts, owner_pid, created_at, heartbeat_at) "
+        "VALUES ('orphan', 'running', 'x', 'orphan.pdf', 1, 999999999, ?, ?)",
+        (time.time(), time.time()),
+    )
+
+    queue.submit('y', 'new.pdf')
+    job = _wait_for(queue, 'orphan')
+    assert job['status'] == 'done'
+    assert job['attempts'] == 2
+
+
+def test_slow_compiles_keep_their_heartbeat(tmp_path):
+    """A compile running longer than stale_after is not requeued and compiled twice"""
+    calls = []
+
+    def slow_compile(latex_content, pdf_filename):
+        calls.append(pdf_filename)
+        time.sleep(0.6)
+        return True
+
+    queue = CompileJobQueue(str(tmp_path / 'jobs.sqlite3'), slow_compile, concurrency=2,
+                            stale_after=0.2, poll_interval=0.02)
+    job_id = queue.submit('x', 'slow.pdf')
+    job = _wait_for(queue, job_id)
+    assert (job['status'], job['attempts']) == ('done', 1)
+    assert calls == ['slow.pdf']
+
+
+def test_workers_start_without_a_new_submit(tmp_path):
+    """Jobs queued before a restart are compiled once anyone polls their status"""
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    CompileJobQueue(db_path, lambda latex, filename: True)
+    connect(db_path).execute(
+        "INSERT INTO compile_jobs (id, status, latex_content, pdf_filename, created_at) VALUES ('left', 'queued', 'x', 'left.pdf', ?)",
+        (time.time(),),
+    )
+
+    restarted = CompileJobQueue(db_path, lambda latex, filename: True, poll_interval=0.05)
+    assert _wait_for(restarted, 'left')['status'] == 'done'
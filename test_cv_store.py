@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import json
+
+from cv_store import CVStore, decode_cursor, encode_cursor
+
+
+def _document(cv_id, name, updated_at):
+    return {
+        'id': cv_id,
+        'created_at': '2024-01-01 00:00:00',
+        'updated_at': updated_at,
+        'metadata': {},
+        'data': {'name': name, 'email': f'{cv_id}@example.com'},
+    }
+
+
+def test_crud_and_listing_order(tmp_path):
+    """Listing is ordered by updated_at and paginates; updates move a CV to the front"""
+    store = CVStore(str(tmp_path / 'cvs.sqlite3'))
+    store.save(_document('a', 'Ada', '2024-01-01 10:00:00'))
+    store.save(_document('b', 'Bob', '2024-01-02 10:00:00'))
+    store.save(_document('c', 'Cy', '2024-01-03 10:00:00'))
+
+    assert [cv['id'] for cv in store.list()] == ['c', 'b', 'a']
+    assert [cv['id'] for cv in store.list(limit=2, after=('2024-01-03 10:00:00', 'c'))] == ['b', 'a']
+
+    assert store.update('a', {'name': 'Ada L', 'email': 'ada@example.com'}, '2024-01-04 10:00:00')
+    assert not store.update('missing', {}, '2024-01-04 10:00:00')
+    assert store.list(limit=1)[0] == {
+        'id': 'a', 'name': 'Ada L', 'email': 'ada@example.com',
+        'created_at': '2024-01-01 00:00:00', 'updated_at': '2024-01-04 10:00:00',
+    }
+    assert store.load('a')['data']['name'] == 'Ada L'
+
+    assert store.delete('b')
+    assert store.load('b') is None
+    assert store.count() == 2
+
+
+def test_migrate_folder_is_idempotent(tmp_path):
+    """JSON files are imported once; unreadable files are reported and skipped"""
+    folder = tmp_path / 'cv_data'
+    folder.mkdir()
+    (folder / 'x.json').write_text(json.dumps(_document('x', 'Xena', '2024-02-01 00:00:00')), encoding='utf-8')
+    (folder / 'broken.json').write_text('{not json', encoding='utf-8')
+
+    store = CVStore(str(tmp_path / 'cvs.sqlite3'))
+    assert not store.is_migrated()
+    assert store.migrate_folder(str(folder)) == (1, 0, 1)
+    assert store.is_migrated()
+    assert store.migrate_folder(str(folder)) == (0, 1, 1)
+    assert store.load('x')['data']['name'] == 'Xena'
+
+
+def test_keyset_pages_with_prefix_filters(tmp_path):
+    """Pages follow each other without gaps or repeats; prefix filters ignore case"""
+    store = CVStore(str(tmp_path / 'cvs.sqlite3'))
+    for index in range(7):
+        # Duplicate timestamps exercise the id tie-breaker
+        store.save(_document(f'cv{index}', f'{"Anna" if index % 2 else "bob"} {index}', f'2024-03-0{index // 2 + 1}'))
+
+    seen = []
+    after = None
+    while True:
+        page = store.list(limit=3, after=after)
+        seen += [cv['id'] for cv in page]
+        if len(page) < 3:
+            break
+        after = (page[-1]['updated_at'], page[-1]['id'])
+    assert seen == [cv['id'] for cv in store.list()]
+    assert len(set(seen)) == 7
+
+    anna = store.list(sort='name', descending=False, name_prefix='an')
+    assert [cv['name'] for cv in anna] == ['Anna 1', 'Anna 3', 'Anna 5']
+    assert [cv['id'] for cv in store.list(sort='email', descending=False, email_prefix='CV6')] == ['cv6']
+
+    cursor = encode_cursor('name', False, 'Anna 1', 'cv1')
+    assert decode_cursor(cursor, 'name', False) == ('Anna 1', 'cv1')
+    try:
+        decode_cursor(cursor, 'updated_at', True)
+        assert False, 'cursor for another sort order was accepted'
+    except ValueError:
+        pass
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from google_credentials import CredentialsUnavailable, GoogleCredentials
+
+
+class FakeToken:
+    """Stands in for google.oauth2 user credentials; pickled into token files"""
+
+    def __init__(self, expires_in, refresh_token='refresh', fail=False):
+        self.token = 'old'
+        self.expiry = datetime.utcnow() + timedelta(seconds=expires_in)
+        self.refresh_token = refresh_token
+        self.fail = fail
+
+    @property
+    def valid(self):
+        return self.token is not None and self.expiry > datetime.utcnow()
+
+    def refresh(self, request):
+        if self.fail:
+            raise RuntimeError('invalid_grant')
+        self.token = 'new'
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def _manager(token_file, **kwargs):
+    return GoogleCredentials(['scope'], token_file=str(token_file), refresh_margin=300,
+                             check_interval=600, request_factory=lambda: None, **kwargs)
+
+
+def test_refreshes_before_expiry_and_saves_token(tmp_path):
+    token_file = tmp_path / 'token.pickle'
+    token_file.write_bytes(pickle.dumps(FakeToken(expires_in=120)))
+    manager = _manager(token_file)
+
+    # Still valid, but inside the margin: refreshed ahead of time and written back
+    assert manager.refresh_if_due() == 600
+    assert pickle.loads(token_file.read_bytes()).token == 'new'
+    stats = manager.stats()
+    assert (stats['source'], stats['valid'], stats['refreshes'], stats['refresh_failures']) == ('user_token', True, 1, 0)
+    assert stats['last_refresh_ms'] is not None and stats['expires_in_seconds'] > 3000
+
+    # Far from expiry: nothing to do until the next check
+    assert manager.refresh_if_due() == 600
+    assert manager.stats()['refreshes'] == 1
+
+
+def test_get_never_refreshes_and_failures_back_off(tmp_path):
+    token_file = tmp_path / 'token.pickle'
+    token_file.write_bytes(pickle.dumps(FakeToken(expires_in=-60, fail=True)))
+    manager = _manager(token_file, retry_base=5)
+
+    assert manager.refresh_if_due() == 5
+    assert manager.refresh_if_due() == 10
+    stats = manager.stats()
+    assert (stats['refresh_failures'], stats['consecutive_failures'], stats['valid']) == (2, 2, False)
+    assert 'invalid_grant' in stats['last_error']
+    with pytest.raises(CredentialsUnavailable, match='invalid_grant'):
+        manager.get()
+
+    # A token file replaced by `login` is picked up on the next check
+    token_file.write_bytes(pickle.dumps(FakeToken(expires_in=3600)))
+    manager._token_mtime = None  # mtime resolution may hide a rewrite within the same tick
+    manager.refresh_if_due()
+    assert manager.get().token == 'old'
+    assert (manager.stats()['consecutive_failures'], manager.stats()['last_error']) == (0, None)
+
+
+def test_missing_credentials_never_start_a_login(tmp_path):
+    manager = _manager(tmp_path / 'missing.pickle')
+    with pytest.raises(CredentialsUnavailable, match='google_credentials login'):
+        manager.get(wait=5)
+    assert manager.stats()['source'] is None
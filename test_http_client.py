@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import HTTPClient
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    responses_left = []
+
+    def do_GET(self):
+        status = self.responses_left.pop(0) if self.responses_left else 200
+        body = str(status).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_retries_transient_errors_and_records_metrics():
+    """429/5xx responses are retried with backoff and every attempt shows up in the host stats"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+    host = f'127.0.0.1:{server.server_port}'
+    try:
+        client = HTTPClient(pool_maxsize=2, max_retries=2, backoff_factor=0.01)
+
+        _FlakyHandler.responses_left = [503, 429]
+        assert client.get(url).status_code == 200
+
+        _FlakyHandler.responses_left = [500, 500, 500]
+        assert client.get(url).status_code == 500
+
+        _FlakyHandler.responses_left = [502]
+        assert client.get(url, retry=False).status_code == 502
+
+        stats = client.stats()[host]
+        assert stats['requests'] == 7
+        assert stats['retries'] == 4
+        assert stats['status_codes'] == {503: 1, 429: 1, 200: 1, 500: 3, 502: 1}
+        assert stats['pool']['maxsize'] == 2
+        assert stats['pool']['in_flight'] == 0
+        assert sum(stats['latency_seconds']['buckets'].values()) == 7
+    finally:
+        server.shutdown()
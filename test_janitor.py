@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+from janitor import Janitor, SweepRule
+
+
+def _touch(path, age):
+    with open(path, 'w') as f:
+        f.write('x' * 10)
+    then = time.time() - age
+    os.utime(path, (then, then))
+
+
+def test_sweep_expires_matching_files_oldest_first_within_cap(tmp_path):
+    sessions = tmp_path / 'temp_sessions'
+    output = tmp_path / 'output'
+    sessions.mkdir()
+    output.mkdir()
+    for index in range(5):
+        _touch(str(sessions / f'old{index}.json'), 7200 + index)
+    _touch(str(sessions / 'fresh.json'), 10)
+    _touch(str(sessions / 'notes.txt'), 7200)
+    _touch(str(output / 'Jane_resume.pdf'), 7200)
+    _touch(str(output / 'resume_42.pdf'), 7200)
+
+    janitor = Janitor([
+        SweepRule(str(sessions), 3600, patterns=['*.json']),
+        SweepRule(str(output), 3600, patterns=['*.pdf'], exclude=['resume_*']),
+        SweepRule(str(tmp_path / 'missing'), 3600),
+    ], max_deletes=3)
+
+    report = janitor.sweep()
+    assert report['deleted'] == 3
+    assert report['backlog'] == 3
+    # The oldest go first: old4, old3, old2
+    assert sorted(os.listdir(sessions)) == ['fresh.json', 'notes.txt', 'old0.json', 'old1.json']
+    assert report['directories'][str(sessions)] == {'files': 4, 'bytes': 40, 'ttl_seconds': 3600}
+
+    report = janitor.sweep()
+    assert report['deleted'] == 3
+    assert report['backlog'] == 0
+    assert sorted(os.listdir(sessions)) == ['fresh.json', 'notes.txt']
+    assert os.listdir(output) == ['resume_42.pdf']
+
+    stats = janitor.stats()
+    assert (stats['sweeps'], stats['deleted'], stats['deleted_bytes']) == (2, 6, 60)
+    assert not stats['running']
+
+
+def test_disabled_janitor_never_starts():
+    janitor = Janitor([], interval=0)
+    janitor.start()
+    assert not janitor.stats()['running']
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import os
+import stat
+import sys
+import time
+
+from latex_backends import LocalLatexBackend, OnlineCompileBackend, select_backend
+
+FAKE_PDFLATEX = """#!%s
+import os, sys
+args = sys.argv[1:]
+if '-ini' in args:
+    jobname = [a for a in args if a.startswith('-jobname=')][0].split('=', 1)[1]
+    open(jobname + '.fmt', 'w').write('fmt')
+    sys.exit(0)
+source = open(args[-1]).read()
+fmt = [a for a in args if a.startswith('-fmt=')]
+if 'FAIL' in source or (fmt and 'STALE' in source):
+    sys.exit(1)
+with open(args[-1][:-4] + '.pdf', 'w') as f:
+    f.write('%%PDF-fake ' + os.environ['TEXMFVAR'] + (' with-format' if fmt else ''))
+""" % sys.executable
+
+
+def _fake_engine(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    engine = bin_dir / 'pdflatex'
+    engine.write_text(FAKE_PDFLATEX)
+    engine.chmod(engine.stat().st_mode | stat.S_IEXEC)
+    return bin_dir, str(engine)
+
+
+def test_local_backend_compiles_in_worker_slots(tmp_path):
+    """The local backend writes the engine's PDF to the output folder using a slot's own TEXMFVAR"""
+    _, engine = _fake_engine(tmp_path)
+    backend = LocalLatexBackend('pdflatex', engine, tmp_path / 'output', workers=1,
+                                timeout=10, scratch_root=str(tmp_path / 'scratch'))
+
+    assert backend.compile('\\documentclass{article}', 'cv.pdf')
+    pdf = (tmp_path / 'output' / 'cv.pdf').read_text()
+    assert pdf.startswith('%PDF-fake')
+    assert os.path.join('worker-0', 'texmf-var') in pdf
+
+    assert not backend.compile('FAIL', 'broken.pdf')
+    assert not (tmp_path / 'output' / 'broken.pdf').exists()
+    assert backend.describe()['failures'] == 1
+
+
+def test_select_backend_falls_back_to_online(tmp_path, monkeypatch):
+    """latexonline.cc is only used when no local engine is installed"""
+    monkeypatch.setenv('PATH', str(tmp_path))
+    backend = select_backend(lambda latex, filename: True, tmp_path)
+    assert isinstance(backend, OnlineCompileBackend)
+
+    bin_dir, _ = _fake_engine(tmp_path)
+    monkeypatch.setenv('PATH', str(bin_dir))
+    backend = select_backend(lambda latex, filename: True, tmp_path, scratch_root=str(tmp_path / 's'))
+    assert backend.name == 'local'
+    assert select_backend(lambda latex, filename: True, tmp_path, preference='online').name == 'online'
+
+
+def test_local_backend_uses_precompiled_preamble(tmp_path):
+    """Documents whose preamble was registered compile with the dumped format, with a plain retry on failure"""
+    _, engine = _fake_engine(tmp_path)
+    backend = LocalLatexBackend('pdflatex', engine, tmp_path / 'output', workers=1,
+                                timeout=10, scratch_root=str(tmp_path / 'scratch'))
+    preamble = '\\documentclass{article}\n'
+    assert backend.register_preamble(preamble + '\\begin{document}\n')
+
+    assert backend.compile(preamble + '\\begin{document}Hi\\end{document}', 'a.pdf')
+    assert (tmp_path / 'output' / 'a.pdf').read_text().endswith('with-format')
+
+    assert backend.compile('\\documentclass{report}\n\\begin{document}Hi\\end{document}', 'b.pdf')
+    assert not (tmp_path / 'output' / 'b.pdf').read_text().endswith('with-format')
+
+    assert backend.compile(preamble + '\\begin{document}STALE\\end{document}', 'c.pdf')
+    assert backend.describe()['precompiled_formats'] == 0
+    assert backend.describe()['format_compiles'] == 1
+
+
+def test_worker_slots_are_per_process(tmp_path, monkeypatch):
+    """Forked gunicorn workers sharing scratch_root get their own slot directories"""
+    _, engine = _fake_engine(tmp_path)
+    backend = LocalLatexBackend('pdflatex', engine, tmp_path / 'output', workers=1,
+                                timeout=10, scratch_root=str(tmp_path / 'scratch'))
+    assert backend.compile('\\documentclass{article}', 'parent.pdf')
+    parent_dir = backend.scratch_dir
+    assert os.path.basename(parent_dir).startswith(f'cvlatex-{os.getpid()}-')
+
+    monkeypatch.setattr(os, 'getpid', lambda: 999999)
+    assert backend.compile('\\documentclass{article}', 'child.pdf')
+    assert backend.scratch_dir != parent_dir
+    assert backend.scratch_dir in (tmp_path / 'output' / 'child.pdf').read_text()
+    assert os.path.dirname(backend.scratch_dir) == str(tmp_path / 'scratch')
+
+
+def test_formats_are_found_on_disk_or_dumped_lazily(tmp_path):
+    """A process that did not dump a format itself (e.g. a worker forked from the master) still uses it"""
+    _, engine = _fake_engine(tmp_path)
+    preamble = '\\documentclass{article}\n'
+    document = preamble + '\\begin{document}Hi\\end{document}'
+    master = LocalLatexBackend('pdflatex', engine, tmp_path / 'output', workers=1,
+                               timeout=10, scratch_root=str(tmp_path / 'scratch'))
+    assert master.register_preamble(document)
+    # Only the final .fmt is left behind; the private jobname's files are moved or removed
+    assert os.listdir(master.formats_dir) == [os.path.basename(master._fmt_path(next(iter(master._formats))))]
+
+    worker = LocalLatexBackend('pdflatex', engine, tmp_path / 'output', workers=1,
+                               timeout=10, scratch_root=str(tmp_path / 'scratch'))
+    assert worker.compile(document, 'a.pdf')
+    assert (tmp_path / 'output' / 'a.pdf').read_text().endswith('with-format')
+
+    other = '\\documentclass{report}\n\\begin{document}Hi\\end{document}'
+    worker.expect_preambles([other])
+    assert worker.compile(other, 'b.pdf')  # the first miss compiles plainly and dumps in the background
+    for _ in range(100):
+        if len(os.listdir(worker.formats_dir)) == 2 and not worker._dumping:
+            break
+        time.sleep(0.05)
+    assert worker.compile(other, 'c.pdf')
+    assert (tmp_path / 'output' / 'c.pdf').read_text().endswith('with-format')
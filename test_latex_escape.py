@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import random
+
+from latex_escape import _UPLOAD_REPLACEMENTS, _LEGACY_REPLACEMENTS, clean_text_for_latex
+
+
+def legacy_clean_text_for_latex(text):
+    """The original replace-chain escaper, kept verbatim as the reference implementation"""
+    if not text:
+        return ""
+    
+    # Handle case where text might be a list
+    if isinstance(text, list):
+        return [legacy_clean_text_for_latex(item) for item in text]
+    
+    # Convert to string if not already
+    text = str(text)
+    
+    # First handle backslashes to avoid conflicts
+    text = text.replace('\\', '\\textbackslash{}')
+    
+    # Replace problematic Unicode characters
+    replacements = {
+        '○': '\\textbullet',  # Unicode bullet
+        '●': '\\textbullet',  # Black circle
+        '•': '\\textbullet',  # Bullet
+        '◦': '\\textbullet',  # White bullet
+        '▪': '\\textbullet',  # Black small square
+        '▫': '\\textbullet',  # White small square
+        '–': '--',           # En dash
+        '—': '---',          # Em dash
+        '‘': "'",            # Left single quotation mark
+        '’': "'",            # Right single quotation mark
+        '“': '"',            # Left double quotation mark
+        '”': '"',            # Right double quotation mark
+        '…': '...',          # Horizontal ellipsis
+        '°': '\\textdegree', # Degree symbol
+        '±': '\\textpm',     # Plus-minus
+        '×': '\\texttimes',  # Multiplication sign
+        '÷': '\\textdiv',    # Division sign
+        '€': '\\texteuro',   # Euro sign
+        '£': '\\textsterling', # Pound sign
+        '¥': '\\textyen',    # Yen sign
+        '©': '\\textcopyright', # Copyright
+        '®': '\\textregistered', # Registered trademark
+        '™': '\\texttrademark', # Trademark
+    }
+    
+    # Apply replacements
+    for unicode_char, latex_replacement in replacements.items():
+        text = text.replace(unicode_char, latex_replacement)
+    
+    # Escape special LaTeX characters (excluding backslash which we handled first)
+    latex_special_chars = {
+        '&': '\\&',
+        '%': '\\%',
+        '$': '\\$',
+        '#': '\\#',
+        '^': '\\textasciicircum{}',
+        '_': '\\_',
+        '{': '\\{',
+        '}': '\\}',
+        '~': '\\textasciitilde{}',
+    }
+    
+    for char, replacement in latex_special_chars.items():
+        text = text.replace(char, replacement)
+    
+    return text
+
+
+def _random_text(rng, alphabet):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+
+
+def test_matches_legacy_escaper_on_random_text():
+    """Random mixes of special, replaced and ordinary characters escape exactly as before"""
+    rng = random.Random(20240611)
+    alphabet = list(_LEGACY_REPLACEMENTS) + list('abcXYZ 019\n\t.,;:!?@*()[]<>|/-+=\'"`') + ['é', 'ß', 'Ж', '中', '😀']
+    for _ in range(5000):
+        text = _random_text(rng, alphabet)
+        assert clean_text_for_latex(text) == legacy_clean_text_for_latex(text), repr(text)
+
+    for value in (None, '', 0, 42, 3.5, ['a_b', '#1', ''], [], True):
+        assert clean_text_for_latex(value) == legacy_clean_text_for_latex(value), repr(value)
+
+
+def test_upload_characters_are_made_latex_safe():
+    """Characters that used to pass through untouched are mapped to LaTeX-safe text"""
+    assert clean_text_for_latex('\uf0b7 Led team\u00a0of\u200b 5') == '\\textbullet{} Led team of 5'
+    assert clean_text_for_latex('ef\ufb01cient \u2212 10\u00ad%') == 'efficient - 10\\%'
+    assert clean_text_for_latex('p\x00age\x0c 2') == 'page 2'
+    # Replacement output is never escaped a second time
+    for char, replacement in _UPLOAD_REPLACEMENTS.items():
+        assert clean_text_for_latex(char) == replacement
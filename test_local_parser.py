@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from local_parser import PARSE_FIELDS, parse_cv_locally
+
+CV_TEXT = """JANE DOE
+Email: jane.doe@example.com | +92 303 5901289 | linkedin.com/in/janedoe | https://jane.dev
+Nishat Colony, Lahore
+PROFILE SUMMARY
+Engineer who likes APIs.
+Education
+BSc Computer Science
+Virtual University of Pakistan
+2016 - 2020
+CGPA: 3.6/4
+WORK EXPERIENCE
+Backend Developer | Jan 2021 - Present
+Acme Corp
+• Built REST APIs
+• Cut latency by 40%
+Technical Skills:
+Programming Languages: Python, SQL
+Frameworks & Libraries: Flask, React
+Tools: Git, Docker
+LANGUAGES
+English, Urdu
+VOLUNTEER WORK
+Taught coding at weekends
+"""
+
+
+def test_contacts_sections_and_confidence():
+    local = parse_cv_locally(CV_TEXT)
+    data = local.data
+    assert (data['name'], data['email'], data['phone']) == ('JANE DOE', 'jane.doe@example.com', '+92 303 5901289')
+    assert (data['linkedin'], data['website']) == ('linkedin.com/in/janedoe', 'https://jane.dev')
+    assert data['skills'] == {'languages': ['Python', 'SQL'], 'frameworks': ['Flask', 'React'], 'tools': ['Git', 'Docker']}
+    assert data['languages'] == ['English', 'Urdu']
+    assert data['education'] == [{'degree': 'BSc Computer Science', 'institution': 'Virtual University of Pakistan',
+                                  'date': '2016 - 2020', 'gpa': '3.6/4'}]
+    assert data['experience'] == [{'title': 'Backend Developer', 'date': 'Jan 2021 - Present', 'company': 'Acme Corp',
+                                   'description': ['Built REST APIs', 'Cut latency by 40%']}]
+    assert [section['title'] for section in data['custom_sections']] == ['PROFILE SUMMARY', 'VOLUNTEER WORK']
+    assert list(data) == [field for field in PARSE_FIELDS if field in data]
+
+    # Contacts, labeled skills and short language lists are kept; structure and free text go to Gemini.
+    # "Acme Corp" could be an unrecognized heading, so the sections the CV seems to lack are checked too.
+    assert local.uncertain_fields(0.8) == ['address', 'education', 'experience', 'projects', 'certifications',
+                                           'awards', 'custom_sections']
+
+
+def test_excerpt_holds_only_uncertain_text():
+    local = parse_cv_locally(CV_TEXT)
+    excerpt = local.excerpt(local.uncertain_fields(0.8))
+    assert excerpt.startswith('Nishat Colony, Lahore\nPROFILE SUMMARY\n')
+    assert 'WORK EXPERIENCE\nBackend Developer' in excerpt and 'VOLUNTEER WORK' in excerpt
+    for kept in ('jane.doe@example.com', 'JANE DOE', 'Programming Languages', 'English, Urdu'):
+        assert kept not in excerpt
+
+    merged = local.merge({'address': 'Lahore', 'email': 'ignored@example.com', 'experience': []},
+                         ['address', 'education', 'experience', 'custom_sections'])
+    assert (merged['email'], merged['address'], merged['skills']['tools']) == ('jane.doe@example.com', 'Lahore', ['Git', 'Docker'])
+    assert 'experience' not in merged and 'education' not in merged
+
+
+def test_free_text_skills_and_missing_headings_stay_uncertain():
+    local = parse_cv_locally('John Smith\njohn@example.com\nSkills\nStrong communication and leadership, Python\n'
+                             'Worked at Initech from 2019 to 2021 building billing systems')
+    assert local.data['name'] == 'John Smith'
+    assert 'phone' not in local.data and local.confidence['phone'] >= 0.8
+    assert {'skills', 'education', 'experience', 'address'} <= set(local.uncertain_fields(0.8))
+    assert 'Worked at Initech' in local.excerpt(['skills'])
+
+
+def test_unlisted_title_case_headings_are_not_trusted_as_absent():
+    local = parse_cv_locally('Jane Doe\njane@example.com\nExperience\nBackend Developer 2021 - 2023\n• Built APIs\n'
+                             'Notable Projects\nCV Converter\n• Flask app\nCertifications & Licenses\nAWS Solutions Architect\n'
+                             'Side Work\nTaught coding at weekends\nLanguages\nEnglish, Urdu')
+    assert local.data['projects'] == [{'title': 'CV Converter', 'description': 'Flask app'}]
+    assert local.data['certifications'][0] == {'name': 'AWS Solutions Architect'}
+    assert local.data['languages'] == ['English', 'Urdu']
+
+    # "Side Work" is not a known heading: its lines stay in certifications, and Gemini gets them for the missing fields
+    assert {'awards', 'custom_sections'} <= set(local.uncertain_fields(0.8))
+    assert 'Taught coding at weekends' in local.excerpt(['awards'])
+    assert 'English, Urdu' not in local.excerpt(['custom_sections'])
+
+    # With every section headed and nothing that looks like a heading, missing sections stay missing
+    local = parse_cv_locally('Jane Doe\njane@example.com\nSkills\nLanguages: Python, SQL\nLanguages\nEnglish, Urdu')
+    assert not {'projects', 'certifications', 'awards', 'custom_sections'} & set(local.uncertain_fields(0.8))
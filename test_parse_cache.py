@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+from parse_cache import ParseCache
+
+
+def test_whitespace_insensitive_hits_and_prompt_versioning(tmp_path):
+    """Re-extracted text with different whitespace hits; a new prompt version misses"""
+    cache = ParseCache(str(tmp_path / 'parse.sqlite3'))
+    parsed = {'personal_info': {'name': 'Jane Doe'}, 'skills': ['Python']}
+
+    assert cache.get('Jane Doe\nPython', 1) is None
+    cache.put('Jane Doe\nPython', 1, parsed)
+
+    assert cache.get('  Jane   Doe\r\n\nPython ', 1) == parsed
+    assert cache.get('Jane Doe\nPython', 2) is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['entries'] == 1
+
+
+def test_evicts_least_recently_used_and_expired(tmp_path):
+    """Entries beyond max_entries go oldest-access first; expired entries are never served"""
+    cache = ParseCache(str(tmp_path / 'parse.sqlite3'), max_entries=2)
+    cache.put('a', 1, {'n': 'a'})
+    cache.put('b', 1, {'n': 'b'})
+    assert cache.get('a', 1) == {'n': 'a'}
+    cache.put('c', 1, {'n': 'c'})
+
+    assert cache.get('b', 1) is None
+    assert cache.get('a', 1) == {'n': 'a'}
+    assert cache.stats()['evictions'] == 1
+
+    cache.ttl = -1
+    assert cache.get('c', 1) is None
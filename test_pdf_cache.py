@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+from pdf_cache import PDFCompileCache
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_cache_hit_materializes_pdf(tmp_path):
+    """A stored PDF is served for identical LaTeX and counted as a hit"""
+    cache = PDFCompileCache(tmp_path / 'cache')
+    compiled = tmp_path / 'compiled.pdf'
+    _write(compiled, b'%PDF-1.4 resume')
+
+    assert not cache.fetch('\\documentclass{article}', str(tmp_path / 'a.pdf'))
+    cache.store('\\documentclass{article}', str(compiled))
+
+    dest = tmp_path / 'out' / 'b.pdf'
+    assert cache.fetch('\\documentclass{article}', str(dest))
+    assert dest.read_bytes() == b'%PDF-1.4 resume'
+    assert not cache.fetch('\\documentclass{report}', str(dest))
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['bytes_saved'] == len(b'%PDF-1.4 resume')
+
+
+def test_cache_evicts_by_size_and_age(tmp_path):
+    """Oldest entries are dropped past max_bytes and anything past max_age is a miss"""
+    cache = PDFCompileCache(tmp_path / 'cache', max_bytes=25, max_age=3600)
+    for i in range(3):
+        compiled = tmp_path / f'{i}.pdf'
+        _write(compiled, b'x' * 10)
+        cache.store(f'doc {i}', str(compiled))
+        entry = cache._entry_path(cache.key_for(f'doc {i}'))
+        os.utime(entry, (time.time() - 100 + i, time.time()))
+    cache.evict()
+
+    assert cache.stats()['entries'] == 2
+    assert not cache.fetch('doc 0', str(tmp_path / 'dest.pdf'))
+
+    entry = cache._entry_path(cache.key_for('doc 2'))
+    os.utime(entry, (time.time(), time.time() - 7200))
+    assert not cache.fetch('doc 2', str(tmp_path / 'dest.pdf'))
+    assert not os.path.exists(entry)
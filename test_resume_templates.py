@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+from resume_templates import LatexTemplates, TEMPLATE_FOLDER, DEFAULT_STYLE
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_variables_are_escaped_unless_raw(tmp_path):
+    """\\VAR{} output goes through clean_text_for_latex; the raw filter opts out"""
+    _write(str(tmp_path / 'jake' / 'heading.tex'), '\\VAR{value} / \\VAR{value|raw}\n')
+    templates = LatexTemplates(str(tmp_path))
+    assert templates.render('jake', 'heading', value='50% & $5_x') == '50\\% \\& \\$5\\_x / 50% & $5_x'
+
+
+def test_styles_fall_back_to_default_style(tmp_path):
+    """A style only overrides the templates it ships; a reload picks up edits in development"""
+    _write(str(tmp_path / 'jake' / 'preamble.tex'), 'jake preamble\n')
+    _write(str(tmp_path / 'jake' / 'footer.tex'), 'jake footer\n')
+    override = str(tmp_path / 'tiny' / 'preamble.tex')
+    _write(override, 'tiny preamble\n')
+    templates = LatexTemplates(str(tmp_path), auto_reload=True)
+
+    assert templates.styles() == ['jake', 'tiny']
+    assert templates.render('tiny', 'preamble') == 'tiny preamble'
+    assert templates.render('tiny', 'footer') == 'jake footer'
+
+    _write(override, 'tiny preamble v2\n')
+    later = time.time() + 5
+    os.utime(override, (later, later))
+    assert templates.render('tiny', 'preamble') == 'tiny preamble v2'
+
+
+def test_bundled_styles_render_the_same_body():
+    """Every bundled style compiles and differs from the default only in its preamble"""
+    templates = LatexTemplates()
+    assert templates.preload() == len(templates.styles()) * 12
+    heading = {'name': 'Jane Doe', 'email': 'jane@example.com', 'github': 'github.com/jane'}
+    body = templates.render(DEFAULT_STYLE, 'heading', heading=heading)
+    assert '\\href{https://github.com/jane}{\\underline{GitHub}}' in body
+    for style in templates.styles():
+        assert templates.render(style, 'heading', heading=heading) == body
+        assert templates.render(style, 'preamble').rstrip().endswith('\\begin{document}')
+
+
+def test_static_source_is_read_once(tmp_path):
+    path = str(tmp_path / '1.tex')
+    _write(path, 'v1')
+    templates = LatexTemplates(TEMPLATE_FOLDER)
+    assert templates.static_source(path) == 'v1'
+    _write(path, 'v2')
+    assert templates.static_source(path) == 'v1'
+    assert templates.static_source(str(tmp_path / 'missing.tex')) is None
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import sqlite3
+
+import pytest
+
+from session_store import create_session_store
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(namespace='review_data', **limits):
+        if request.param == 'sqlite':
+            limits.setdefault('touch_interval', 0)  # exact LRU order for these tests
+        return create_session_store(request.param, namespace, db_path=str(tmp_path / 'sessions.sqlite3'), **limits)
+    return make
+
+
+def test_values_round_trip_and_update_in_place(make_store):
+    """Readers get copies; update() merges fields into the stored dict"""
+    store = make_store()
+    store.set('s1', {'rating': 70, 'pdf_pending': True})
+
+    value = store.get('s1')
+    value['rating'] = 0
+    assert store.get('s1') == {'rating': 70, 'pdf_pending': True}
+
+    assert store.update('s1', {'pdf_pending': False})
+    assert store.get('s1') == {'rating': 70, 'pdf_pending': False}
+    assert not store.update('missing', {'pdf_pending': False})
+    assert store.get('missing', 'default') == 'default'
+
+    store.delete('s1')
+    assert store.get('s1') is None
+    stats = store.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (3, 2, 0)
+
+
+def test_evicts_least_recently_used_past_entry_and_byte_caps(make_store):
+    store = make_store(max_entries=2)
+    store.set('a', 'cv a')
+    store.set('b', 'cv b')
+    assert store.get('a') == 'cv a'
+    store.set('c', 'cv c')
+    assert store.get('b') is None
+    assert store.get('a') == 'cv a'
+    assert store.stats()['evictions'] == 1
+
+    sized = make_store('cv_text', max_bytes=25)
+    sized.set('x', 'x' * 10)
+    sized.set('y', 'y' * 10)
+    assert sized.get('x') == 'x' * 10
+    assert sized.stats()['size_bytes'] == 24
+    sized.set('z', 'z' * 10)
+    assert sized.get('y') is None
+    assert sized.get('x') and sized.get('z')
+
+
+def test_expired_entries_are_never_served(make_store):
+    store = make_store()
+    store.set('s1', {'rating': 70})
+    store.ttl = -1
+    assert store.get('s1') is None
+    assert not store.update('s1', {'rating': 80})
+    assert store.stats()['expirations'] == 1
+
+
+def test_sqlite_namespaces_are_shared_and_separate(tmp_path):
+    """Stores opened on the same file (as other workers do) see each other's writes, per namespace"""
+    path = str(tmp_path / 'sessions.sqlite3')
+    worker_a = create_session_store('sqlite', 'review_data', db_path=path)
+    worker_b = create_session_store('sqlite', 'review_data', db_path=path)
+    other = create_session_store('sqlite', 'cv_text', db_path=path, max_entries=1)
+
+    worker_a.set('s1', {'rating': 70})
+    other.set('s1', 'text')
+    other.set('s2', 'text')
+    assert worker_b.get('s1') == {'rating': 70}
+    assert other.get('s1') is None
+    assert worker_b.stats()['entries'] == 1
+
+
+def test_updates_respect_the_byte_cap(make_store):
+    store = make_store(max_bytes=40)
+    store.set('a', {'text': 'x'})
+    store.set('b', {'text': 'y'})
+    assert store.update('b', {'text': 'y' * 20})
+    assert store.get('a') is None and store.stats()['size_bytes'] <= 40
+
+
+def test_sqlite_totals_follow_every_write_and_reads_touch_sparingly(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite3')
+    store = create_session_store('sqlite', 'review_data', db_path=path, touch_interval=60)
+    store.set('a', 'x' * 10)
+    store.set('a', 'x' * 20)
+    store.set('b', 'y')
+    store.update('c', {})
+    store.delete('b')
+    assert (store.stats()['entries'], store.stats()['size_bytes']) == (1, 22)
+
+    # A read within the touch interval does not write
+    conn = sqlite3.connect(path)
+    before = conn.execute('SELECT last_access FROM session_state').fetchone()
+    assert store.get('a') == 'x' * 20
+    assert conn.execute('SELECT last_access FROM session_state').fetchone() == before
+
+    # Stores opened on an older database count the entries already there
+    conn.execute('DROP TABLE session_totals')
+    conn.commit()
+    assert create_session_store('sqlite', 'review_data', db_path=str(path)).stats()['entries'] == 1
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import pytest
+
+import sheets_integration
+from sheets_integration import ENTRY_COLUMNS, cv_to_columnar, cv_to_rows, export_payload, parse_block_rows, write_payloads
+
+CV = {
+    'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '555', 'summary': 'Engineer',
+    'education': [{'degree': 'BSc', 'institution': 'MIT', 'date': '2014', 'gpa': '3.9'}],
+    'experience': [{'title': 'Dev', 'company': 'Acme', 'date': '2015-2020', 'description': ['Built APIs', 'Led team']},
+                   {'title': 'Intern', 'company': 'Initech', 'description': []}],
+    'skills': {'languages': ['Python', 'SQL'], 'tools': ['Git']},
+}
+
+
+class _Call:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self, num_retries=0):
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+def _cell_values(row_data):
+    return [next(iter(cell['userEnteredValue'].values())) if cell else '' for cell in row_data['values']]
+
+
+class FakeSheets:
+    """Records Sheets API requests and keeps each tab's rows; the spreadsheet starts with only Sheet1"""
+
+    def __init__(self, source_values=()):
+        self.requests = []
+        self.appended = []
+        self.gets = 0
+        self.tabs = {'Sheet1': 0}
+        self.cells = {}
+        self.source_values = list(source_values)
+        self.fail_appends = 0
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def tab_rows(self, title):
+        return self.cells.get(self.tabs[title], [])
+
+    def get(self, spreadsheetId, fields=None, range=None):
+        if range is None:
+            self.gets += 1
+            return _Call({'sheets': [{'properties': {'sheetId': sheet_id, 'title': title}} for title, sheet_id in self.tabs.items()]})
+        if range == "'CVs'!A2:A":
+            return _Call({'values': [row[:1] for row in self.tab_rows('CVs')[1:]]})
+        return _Call({'values': self.source_values})
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        self.appended.append(body['values'])
+        return _Call({'updates': {'updatedRows': len(body['values'])}})
+
+    def batchUpdate(self, spreadsheetId, body):
+        # Like the API, a batchUpdate is applied completely or not at all
+        if self.fail_appends and not any('addSheet' in request for request in body['requests']):
+            self.fail_appends -= 1
+            return _Call(Exception('503 backend error'))
+        self.requests.append(body['requests'])
+        replies = []
+        for request in body['requests']:
+            if 'addSheet' in request:
+                properties = request['addSheet']['properties']
+                self.tabs[properties['title']] = properties['sheetId']
+                replies.append({'addSheet': {'properties': properties}})
+            else:
+                self.cells.setdefault(request['appendCells']['sheetId'], []).extend(
+                    _cell_values(row) for row in request['appendCells']['rows'])
+                replies.append({})
+        return _Call({'replies': replies})
+
+
+def test_columnar_layout_is_one_row_per_cv():
+    tabs = cv_to_columnar(CV, 'cv-1', '2024-01-01 10:00:00')
+    (cv_row,) = tabs['CVs']
+    assert len(cv_row) == len(sheets_integration.CV_COLUMNS)
+    assert cv_row[:4] == ['cv-1', '2024-01-01 10:00:00', 'Jane Doe', 'jane@example.com']
+    assert cv_row[10:16] == ['Dev', 'Acme', 'BSc', 'MIT', 1, 2]
+    assert cv_row[16] == 'Python, SQL'
+    assert tabs['Entries'][1] == ['cv-1', 'experience', 1, 'Dev', 'Acme', '2015-2020', '', '', 'Built APIs\nLed team']
+    assert all(len(row) == len(ENTRY_COLUMNS) for row in tabs['Entries'])
+
+
+def test_write_payloads_batches_both_layouts(monkeypatch):
+    monkeypatch.setattr(sheets_integration, '_sheet_ids', {})
+    service = FakeSheets()
+    payloads = [export_payload(CV, 'columnar', 'cv-1'), export_payload(CV, 'columnar', 'cv-2'),
+                export_payload(CV, 'blocks'), [['queued before layouts']]]
+
+    written = write_payloads('sheet', payloads, service=service)
+    # Tabs are created together with their frozen headers, then every CV goes out in one batchUpdate
+    add_tabs, append_cells = service.requests
+    assert [list(request) for request in add_tabs] == [['addSheet'], ['appendCells']] * 2
+    assert [request['addSheet']['properties']['title'] for request in add_tabs[::2]] == ['CVs', 'Entries']
+    assert [(request['appendCells']['sheetId'], len(request['appendCells']['rows'])) for request in append_cells] == [
+        (service.tabs['CVs'], 2), (service.tabs['Entries'], 6)]
+    assert service.tab_rows('CVs')[0] == sheets_integration.CV_COLUMNS
+    assert len(service.appended) == 1
+    assert written == 2 + 6 + len(service.appended[0])  # header rows are not counted
+
+    write_payloads('sheet', payloads[:1], service=service)
+    assert service.gets == 1
+    assert [len(request['appendCells']['rows']) for request in service.requests[-1]] == [1, 3]
+
+
+def test_tabs_keep_their_header_when_the_first_append_fails(monkeypatch):
+    monkeypatch.setattr(sheets_integration, '_sheet_ids', {})
+    service = FakeSheets()
+    service.fail_appends = 1
+    payload = export_payload(CV, 'columnar', 'cv-1')
+    with pytest.raises(Exception, match='503'):
+        write_payloads('sheet', [payload], service=service)
+
+    write_payloads('sheet', [payload], service=service)
+    assert [row[0] for row in service.tab_rows('CVs')] == ['CV ID', 'cv-1']
+    assert [row[0] for row in service.tab_rows('Entries')] == ['CV ID', 'cv-1', 'cv-1', 'cv-1']
+
+
+def test_migration_skips_cvs_already_migrated(monkeypatch):
+    monkeypatch.setattr(sheets_integration, '_sheet_ids', {})
+    blocks = cv_to_rows(CV, '2024-01-01 10:00:00') + cv_to_rows({'name': 'John'}, '2024-01-02 09:00:00')
+    service = FakeSheets(blocks)
+    monkeypatch.setattr(sheets_integration, 'get_google_sheets_service', lambda wait=0: service)
+
+    # The first run stops after one batch
+    writes = []
+    real_write_columnar = sheets_integration.write_columnar
+
+    def write_once(spreadsheet_id, tabs, service=None):
+        if writes:
+            raise RuntimeError('quota exceeded')
+        writes.append(tabs)
+        return real_write_columnar(spreadsheet_id, tabs, service=service)
+
+    monkeypatch.setattr(sheets_integration, 'write_columnar', write_once)
+    with pytest.raises(RuntimeError):
+        sheets_integration.migrate_blocks_to_columnar('sheet', batch_size=1)
+    assert len(service.tab_rows('CVs')) == 2
+
+    monkeypatch.setattr(sheets_integration, 'write_columnar', real_write_columnar)
+    assert sheets_integration.migrate_blocks_to_columnar('sheet', batch_size=1) == 2
+    assert sheets_integration.migrate_blocks_to_columnar('sheet', batch_size=1) == 2
+    assert [row[2] for row in service.tab_rows('CVs')] == ['Name', 'Jane Doe', 'John']
+    assert len({row[0] for row in service.tab_rows('CVs')}) == 3
+
+
+def test_block_rows_parse_back_for_migration():
+    values = cv_to_rows(CV, '2024-01-01 10:00:00') + cv_to_rows({'name': 'John'}, '2024-01-02 09:00:00')
+    # The Sheets API returns blank rows as [] and drops trailing empty cells
+    values = [[cell for cell in row if cell != ''] if not any(row) else row for row in values]
+
+    (first_time, first), (second_time, second) = parse_block_rows(values)
+    assert first_time == '2024-01-01 10:00:00'
+    assert (first['name'], first['email']) == ('Jane Doe', 'jane@example.com')
+    assert first['education'][0]['gpa'] == '3.9'
+    assert first['experience'][0]['description'] == ['Built APIs', 'Led team']
+    assert len(first['experience']) == 2
+    assert first['skills']['languages'] == ['Python', 'SQL']
+    assert (second_time, second['name'], second['experience']) == ('2024-01-02 09:00:00', 'John', [])
+    assert cv_to_columnar(first, 'x', first_time)['CVs'][0][2:4] == ['Jane Doe', 'jane@example.com']
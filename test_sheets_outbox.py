@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+from sheets_outbox import SheetsOutbox
+
+
+def test_flush_coalesces_entries_per_spreadsheet(tmp_path):
+    calls = []
+
+    def write(spreadsheet_id, payloads):
+        calls.append((spreadsheet_id, payloads))
+        return sum(len(rows) for rows in payloads)
+
+    outbox = SheetsOutbox(str(tmp_path / 'outbox.sqlite3'), write, flush_interval=3600)
+    outbox.enqueue('sheet-a', [['Jane'], ['Python']])
+    outbox.enqueue('sheet-a', [['John']])
+    outbox.enqueue('sheet-b', [['Ana']])
+
+    assert outbox.flush() == 3
+    assert sorted(calls) == [('sheet-a', [[['Jane'], ['Python']], [['John']]]), ('sheet-b', [[['Ana']]])]
+    assert outbox.flush() == 0
+
+    stats = outbox.stats()
+    assert (stats['pending'], stats['sent_entries'], stats['sent_rows'], stats['flushes']) == (0, 3, 4, 2)
+
+
+def test_failed_appends_back_off_and_stop_after_max_attempts(tmp_path):
+    outcomes = [Exception('503 backend error'), None]
+
+    def write(spreadsheet_id, payloads):
+        outcome = outcomes.pop(0) if outcomes else Exception('quota exceeded')
+        if outcome:
+            raise outcome
+
+    outbox = SheetsOutbox(str(tmp_path / 'outbox.sqlite3'), write, flush_interval=3600, backoff_base=0, max_attempts=2)
+    outbox.enqueue('sheet-a', [['Jane']])
+    outbox.flush()
+    assert outbox.stats()['pending'] == 1
+    assert outbox.stats()['last_error'] == '503 backend error'
+
+    outbox.flush()
+    assert outbox.stats()['pending'] == 0
+
+    outbox.enqueue('sheet-a', [['John']])
+    outbox.flush()
+    outbox.flush()
+    assert outbox.flush() == 0
+    stats = outbox.stats()
+    assert (stats['pending'], stats['failed'], stats['failed_flushes']) == (0, 1, 3)
+
+
+def test_leases_outlive_slow_writes(tmp_path):
+    db_path = str(tmp_path / 'outbox.sqlite3')
+    started, release = threading.Event(), threading.Event()
+
+    def slow_write(spreadsheet_id, payloads):
+        started.set()
+        release.wait(5)
+        return 1
+
+    outbox = SheetsOutbox(db_path, slow_write, flush_interval=3600, lease=0.3)
+    other = SheetsOutbox(db_path, lambda spreadsheet_id, payloads: 1, flush_interval=3600, lease=0.3)
+    outbox.enqueue('sheet-a', [['Jane']])
+    flusher = threading.Thread(target=outbox.flush)
+    flusher.start()
+    assert started.wait(5)
+
+    # Retries can take longer than the lease; another worker must not send the entry again meanwhile
+    time.sleep(1)
+    assert other.flush() == 0
+    release.set()
+    flusher.join(5)
+    assert outbox.stats()['sent_entries'] == 1 and other.stats()['pending'] == 0
+
+
+def test_flusher_starts_without_a_new_enqueue(tmp_path):
+    db_path = str(tmp_path / 'outbox.sqlite3')
+    SheetsOutbox(db_path, None, flush_interval=3600).enqueue('sheet-a', [['Jane']])  # queued before a restart
+    calls = []
+    outbox = SheetsOutbox(db_path, lambda spreadsheet_id, payloads: calls.append(payloads) or 1, flush_interval=0.05)
+    outbox.start()
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert calls == [[[['Jane']]]]
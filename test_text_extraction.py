@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import io
+import zipfile
+
+from docx import Document
+from docx.shared import Pt
+
+from text_extraction import PDFTextExtractor, extract_docx_text, looks_like_garbage
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages, broken_pages=()):
+    """
+    Minimal multi-page PDF with one Helvetica text line per entry of each page.
+
+    Pages listed in `broken_pages` leave the font out of their resources, like
+    some broken exports do: PyPDF2 then extracts replacement characters while
+    pdfplumber still recovers the text.
+    """
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for index, lines in enumerate(pages):
+        ops = ['BT', '/F1 10 Tf', '12 TL', '50 760 Td'] + [f'({_escape(line)}) Tj T*' for line in lines] + ['ET']
+        stream = '\n'.join(ops).encode('latin-1')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n'.encode('latin-1') + stream + b'\nendstream')
+        resources = '<< >>' if index in broken_pages else '<< /Font << /F1 3 0 R >> >>'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /CropBox [0 0 612 792] '
+                       f'/Resources {resources} /Contents {len(objects)} 0 R >>')
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + (body if isinstance(body, bytes) else body.encode('latin-1')) + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+def make_docx(paragraphs, table_rows=(), header=None):
+    """DOCX built with python-docx: body paragraphs, then a table of `table_rows`"""
+    document = Document()
+    if header:
+        document.sections[0].header.paragraphs[0].text = header
+    for text in paragraphs:
+        # Runs carry the font formatting Word writes on every run
+        run = document.add_paragraph().add_run(text)
+        run.font.name = 'Calibri'
+        run.font.size = Pt(10)
+    if table_rows:
+        table = document.add_table(rows=len(table_rows), cols=len(table_rows[0]))
+        for row, values in zip(table.rows, table_rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def cv_pages(count, lines_per_page=40):
+    return [
+        [f'Page {page} line {line}: Built data pipelines in Python & SQL for 12 teams (2019-2023).' for line in range(lines_per_page)]
+        for page in range(count)
+    ]
+
+
+def test_garbage_heuristic():
+    assert looks_like_garbage('')
+    assert looks_like_garbage('  \n 3 \n')
+    assert looks_like_garbage('�' * 60)
+    assert looks_like_garbage('(cid:12)(cid:7) ' * 20)
+    assert looks_like_garbage('ExperiencedSoftwareEngineerWithTenYearsOfPythonAndSQL')
+    assert not looks_like_garbage('Experienced software engineer with ten years of Python and SQL.')
+
+
+def test_fast_path_with_pdfplumber_fallback(tmp_path):
+    """Readable pages come from PyPDF2; a page whose text layer is garbage is re-read with pdfplumber"""
+    path = tmp_path / 'cv.pdf'
+    path.write_bytes(make_pdf([['Jane Doe - Senior Engineer', 'Built (parsers) & tools for 10 years'],
+                               ['Publications on resume parsing and layout analysis']], broken_pages={1}))
+    extractor = PDFTextExtractor(workers=1)
+
+    text = extractor.extract(str(path))
+    assert 'Built (parsers) & tools for 10 years' in text
+    assert 'Publications on resume parsing and layout analysis' in text
+    assert '�' not in text
+    assert extractor.stats()['fallback_pages'] == 1
+    assert extractor.extract(path.read_bytes()) == text
+    assert extractor.extract(io.BytesIO(path.read_bytes())) == text
+
+
+def test_parallel_extraction_matches_serial_and_caps_work():
+    pdf = make_pdf(cv_pages(8), broken_pages={5})
+    serial = PDFTextExtractor(workers=1).extract(pdf)
+
+    extractor = PDFTextExtractor(workers=2, parallel_min_pages=2)
+    try:
+        assert extractor.extract(pdf) == serial
+        assert 'Page 7 line 39' in serial
+
+        extractor.max_pages = 3
+        assert extractor.extract(pdf) == serial[:serial.index('Page 3 line 0')]
+
+        extractor.max_pages, extractor.max_chars = 30, 5000
+        assert len(extractor.extract(pdf)) == 5000
+
+        stats = extractor.stats()
+        assert stats['documents'] == 3
+        assert stats['truncated'] == 2
+        assert stats['pages'] < 8 + 3 + 8
+    finally:
+        extractor.close()
+
+
+_TEXT_BOX_DOCUMENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+    xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+    xmlns:v="urn:schemas-microsoft-com:vml">
+<w:body>
+  <w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>
+    <w:r><w:t>Jane Doe</w:t></w:r>
+    <w:r><mc:AlternateContent>
+      <mc:Choice Requires="wps"><w:drawing><wps:txbx><w:txbxContent>
+        <w:p><w:r><w:t>Skills: Python, SQL</w:t></w:r></w:p>
+      </w:txbxContent></wps:txbx></w:drawing></mc:Choice>
+      <mc:Fallback><w:pict><v:textbox><w:txbxContent>
+        <w:p><w:r><w:t>Skills: Python, SQL</w:t></w:r></w:p>
+      </w:txbxContent></v:textbox></w:pict></mc:Fallback>
+    </mc:AlternateContent></w:r>
+  </w:p>
+  <w:p><w:hyperlink r:id="rId9"><w:r><w:t>jane@example.com</w:t></w:r></w:hyperlink></w:p>
+</w:body>
+</w:document>"""
+
+
+def test_docx_extraction_covers_tables_headers_and_text_boxes():
+    docx = make_docx(['Summary\tline', '', 'End'], table_rows=[('Python', '5 years'), ('SQL', '')], header='Jane Doe | jane@x.com')
+    assert extract_docx_text(docx) == 'Jane Doe | jane@x.com\nSummary\tline\n\nEnd\nPython | 5 years\nSQL\n'
+
+    # Body paragraphs come out exactly as python-docx reads them
+    plain = make_docx(['First', 'Second \u2022 bullet', ''])
+    assert extract_docx_text(io.BytesIO(plain)) == ''.join(p.text + '\n' for p in Document(io.BytesIO(plain)).paragraphs)
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as archive:
+        archive.writestr('word/document.xml', _TEXT_BOX_DOCUMENT)
+    assert extract_docx_text(out.getvalue()) == 'Skills: Python, SQL\nJane Doe\njane@example.com\n'
@@ -0,0 +1,317 @@
+import concurrent.futures
+import io
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+
+import pdfplumber
+import PyPDF2
+from lxml import etree
+
+
+# Glyphs PDF text layers produce when a font has no usable Unicode mapping
+_UNMAPPED_GLYPH = re.compile(r'\(cid:\d+\)|[\ufffd\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _as_stream(source):
+    """Documents are passed around as a path, the raw bytes of the upload or a binary file"""
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def looks_like_garbage(text, min_chars=20):
+    """
+    True if a page's fast text-layer extraction is not worth keeping.
+
+    Catches the usual failure modes of PyPDF2 on CV exports: nothing
+    extracted (text drawn as images or vector paths), unmapped glyphs from
+    subset fonts, symbol soup, and words glued together because the PDF
+    positions words instead of emitting spaces.
+    """
+    visible = ''.join(text.split())
+    if len(visible) < min_chars:
+        return True
+    if len(_UNMAPPED_GLYPH.findall(text)) > len(visible) * 0.05:
+        return True
+    if sum(ch.isalnum() for ch in visible) < len(visible) * 0.5:
+        return True
+    words = text.split()
+    return len(visible) / len(words) > 25
+
+
+def _extract_pages(source, start, stop, max_chars, reader=None):
+    """
+    Extract pages [start, stop) with PyPDF2, re-extracting garbage pages with pdfplumber.
+
+    Stops early once `max_chars` characters have been collected. Runs in the
+    extraction process pool, so it only takes and returns picklable values.
+
+    Returns:
+        list: (text, used_fallback) per extracted page
+    """
+    reader = reader or PyPDF2.PdfReader(_as_stream(source))
+    plumber = None
+    pages = []
+    collected = 0
+    try:
+        for index in range(start, stop):
+            try:
+                text = reader.pages[index].extract_text() or ''
+            except Exception:
+                text = ''
+
+            used_fallback = looks_like_garbage(text)
+            if used_fallback:
+                try:
+                    if plumber is None:
+                        plumber = pdfplumber.open(_as_stream(source))
+                    layout_text = plumber.pages[index].extract_text() or ''
+                except Exception as e:
+                    print(f"⚠️ pdfplumber could not read page {index + 1}: {e}")
+                    layout_text = ''
+                # Keep whichever extraction recovered more text
+                if len(layout_text.strip()) >= len(text.strip()):
+                    text = layout_text
+
+            pages.append((text, used_fallback))
+            collected += len(text)
+            if collected >= max_chars:
+                break
+    finally:
+        if plumber is not None:
+            plumber.close()
+    return pages
+
+
+class PDFTextExtractor:
+    """
+    Page-level PDF text extraction.
+
+    Small documents are extracted in the calling thread; longer ones are
+    split into page ranges handled by a process pool, so layout analysis of
+    many pages neither serializes on the GIL nor blocks the request for
+    longer than `timeout`. Only the first `max_pages` pages and roughly
+    `max_chars` characters are extracted; the remaining work is cancelled.
+    """
+
+    def __init__(self, workers=2, max_pages=30, max_chars=100000, parallel_min_pages=4, timeout=30):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parallel_min_pages = parallel_min_pages
+        self.timeout = timeout
+
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._stats = {'documents': 0, 'pages': 0, 'fallback_pages': 0, 'truncated': 0, 'timeouts': 0, 'seconds': 0.0}
+
+    def _get_pool(self):
+        # Processes do not survive fork either, so every gunicorn worker starts its own pool lazily.
+        # The forkserver only imports this module, not the whole app.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def close(self):
+        """Shut down this process's extraction pool (a new one starts on demand)"""
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _extract_parallel(self, source, page_count, deadline):
+        chunk_size = max(1, math.ceil(page_count / (self.workers * 2)))
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_extract_pages, source, start, min(start + chunk_size, page_count), self.max_chars)
+            for start in range(0, page_count, chunk_size)
+        ]
+
+        pages = []
+        collected = 0
+        timed_out = False
+        try:
+            # Ranges are consumed in page order, so the cutoff keeps the start of the document
+            for future in futures:
+                if collected >= self.max_chars:
+                    break
+                try:
+                    chunk = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except concurrent.futures.TimeoutError:
+                    print(f"⚠️ PDF extraction hit the {self.timeout}s limit after {len(pages)} pages")
+                    timed_out = True
+                    break
+                pages.extend(chunk)
+                collected += sum(len(text) for text, _ in chunk)
+        except concurrent.futures.process.BrokenProcessPool as e:
+            # Pool processes could not start or were killed; finish the document in this thread
+            print(f"❌ PDF extraction worker died, extracting in-thread: {e}")
+            self.close()
+            pages.extend(_extract_pages(source, len(pages), page_count, self.max_chars - collected))
+        finally:
+            for future in futures:
+                future.cancel()
+        return pages, timed_out
+
+    def extract(self, source):
+        """
+        Return the text of the PDF at `source` (a path, the file's bytes or a binary file).
+
+        Raises whatever PyPDF2 raises for files that are not readable PDFs.
+        """
+        started = time.monotonic()
+        if hasattr(source, 'read'):
+            # Pool workers need picklable input, and PyPDF2/pdfplumber each want their own stream
+            source.seek(0)
+            source = source.read()
+        reader = PyPDF2.PdfReader(_as_stream(source))
+        total_pages = len(reader.pages)
+        page_count = min(total_pages, self.max_pages)
+
+        if self.workers > 1 and page_count >= self.parallel_min_pages:
+            pages, timed_out = self._extract_parallel(source, page_count, started + self.timeout)
+        else:
+            pages, timed_out = _extract_pages(source, 0, page_count, self.max_chars, reader=reader), False
+
+        text = ''.join(page_text + '\n' for page_text, _ in pages if page_text)
+        truncated = len(pages) < total_pages or len(text) > self.max_chars
+        text = text[:self.max_chars]
+
+        elapsed = time.monotonic() - started
+        fallback_pages = sum(1 for _, used_fallback in pages if used_fallback)
+        with self._lock:
+            self._stats['documents'] += 1
+            self._stats['pages'] += len(pages)
+            self._stats['fallback_pages'] += fallback_pages
+            self._stats['truncated'] += truncated
+            self._stats['timeouts'] += timed_out
+            self._stats['seconds'] += elapsed
+        print(f"📄 Extracted {len(pages)}/{total_pages} PDF pages ({fallback_pages} via pdfplumber) "
+              f"in {elapsed * 1000:.0f}ms{' [truncated]' if truncated else ''}")
+        return text
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, seconds=round(self._stats['seconds'], 3), workers=self.workers,
+                        max_pages=self.max_pages, max_chars=self.max_chars)
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Text boxes are stored twice: DrawingML in mc:Choice and a VML copy in mc:Fallback
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_PART = re.compile(r'word/(header|document|footer)(\d*)\.xml')
+_W_P, _W_R, _W_T, _W_TAB, _W_BR, _W_CR, _W_TC, _W_TR = (_W + tag for tag in ('p', 'r', 't', 'tab', 'br', 'cr', 'tc', 'tr'))
+# The only elements the extractor gets events for; lxml skips all other markup in C
+_DOCX_TAGS = [_W_P, _W_R, _W_TC, _W_TR, _MC_FALLBACK]
+
+
+def _docx_part_lines(stream):
+    """
+    Lines of one WordprocessingML part, read with lxml's streaming parser.
+
+    Every paragraph becomes a line, including paragraphs in tables and text
+    boxes (a text box's lines come before the rest of the paragraph that
+    anchors it). Table rows whose cells hold at most one line each become a
+    single `a | b | c` line; other rows list their cells' lines in order.
+    """
+    lines = []
+    paragraphs = []  # text pieces of each open paragraph (text boxes nest them)
+    cells = []  # lines of each open table cell
+    rows = []  # cells of each open table row
+    fallback_depth = 0
+
+    def emit(line):
+        (cells[-1] if cells else lines).append(line)
+
+    # Uploaded XML is untrusted: never resolve entities or touch the network
+    for event, elem in etree.iterparse(stream, events=('start', 'end'), tag=_DOCX_TAGS,
+                                       resolve_entities=False, no_network=True):
+        tag = elem.tag
+        if tag == _MC_FALLBACK:
+            fallback_depth += 1 if event == 'start' else -1
+            continue
+        if fallback_depth:
+            continue
+
+        if event == 'start':
+            if tag == _W_P:
+                paragraphs.append([])
+            elif tag == _W_TC:
+                cells.append([])
+            elif tag == _W_TR:
+                rows.append([])
+            continue
+
+        if tag == _W_R:
+            # Like python-docx, only a run's own children carry its text
+            if paragraphs:
+                pieces = paragraphs[-1]
+                for child in elem:
+                    child_tag = child.tag
+                    if child_tag == _W_T:
+                        pieces.append(child.text or '')
+                    elif child_tag == _W_TAB:
+                        pieces.append('\t')
+                    elif child_tag == _W_BR or child_tag == _W_CR:
+                        pieces.append('\n')
+        elif tag == _W_P:
+            emit(''.join(paragraphs.pop()))
+            # Drop what has been read so memory stays flat on long documents
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif tag == _W_TC:
+            cell = cells.pop()
+            if rows:
+                rows[-1].append(cell)
+        elif tag == _W_TR:
+            row = rows.pop()
+            if all(len(cell) <= 1 for cell in row):
+                emit(' | '.join(cell[0] for cell in row if cell and cell[0].strip()))
+            else:
+                for cell in row:
+                    for line in cell:
+                        emit(line)
+            elem.clear()
+    return lines
+
+
+def extract_docx_text(source):
+    """
+    Return the text of a DOCX file (a path, the file's bytes or a binary file).
+
+    Reads headers, the document body and footers straight from the zip with
+    a streaming XML parser instead of building python-docx's object model,
+    and also picks up tables, text boxes and hyperlinks. A header or footer
+    repeated for first/even pages is only included once.
+    """
+    with zipfile.ZipFile(_as_stream(source)) as archive:
+        parts = []
+        for name in archive.namelist():
+            match = _DOCX_PART.fullmatch(name)
+            if match:
+                kind, number = match.groups()
+                parts.append(((('header', 'document', 'footer').index(kind), int(number or 0)), name))
+
+        seen = set()
+        lines = []
+        for _, name in sorted(parts):
+            with archive.open(name) as stream:
+                part_lines = _docx_part_lines(stream)
+            key = tuple(part_lines)
+            if name != 'word/document.xml' and (key in seen or not any(line.strip() for line in part_lines)):
+                continue
+            seen.add(key)
+            lines.extend(part_lines)
+    return ''.join(line + '\n' for line in lines)